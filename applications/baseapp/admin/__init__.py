@@ -2,4 +2,5 @@
 # flake8: noqa
 
 from .user import UserAdmin
+from .filters import StatusListFilter
 from .base import CustomBaseModelAdmin, CustomBaseModelAdminWithSoftDelete
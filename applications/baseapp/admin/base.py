@@ -1,22 +1,64 @@
+import hashlib
 import logging
+from contextlib import nullcontext
 
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.contrib.admin import helpers
-from django.contrib.admin.utils import model_ngettext
+from django.contrib.admin.options import IS_POPUP_VAR
+from django.contrib.admin.utils import (
+    flatten_fieldsets,
+    model_ngettext,
+)
 from django.core.exceptions import PermissionDenied
 from django.db import models
 from django.forms import TextInput
+from django.http import HttpResponseRedirect, JsonResponse
+from django.shortcuts import get_object_or_404
 from django.template.response import TemplateResponse
+from django.urls import path, reverse
 from django.utils.translation import ugettext_lazy as _
 
+from ..forms.versioning import get_versioned_form
+from ..models import (
+    VersionConflict,
+    include_deleted_relations,
+)
+from ..models.base import SOFT_DELETE_BATCH_SIZE
+from ..models.cache import get_object_cache
+from ..models.counters import uses_status_counters
+from ..models.jobs import AdminJob, enqueue_job
+from ..models.versioning import (
+    VERSION_FIELD_NAME,
+    uses_versioning,
+)
 from ..utils import console
 from ..widgets import AdminImageFileWidget
+from .deletion import (
+    DELETION_SAMPLE_SIZE,
+    get_deletion_summary,
+)
+from .export import (
+    EXPORT_CHUNK_SIZE,
+    get_export_actions,
+    get_export_field_names,
+)
+from .filters import StatusListFilter
+from .pagination import (
+    ESTIMATED_COUNT_CACHE_TIMEOUT,
+    EstimatedCountChangeList,
+    EstimatedCountPaginator,
+    get_estimated_count,
+)
 
 __all__ = ['CustomBaseModelAdmin', 'CustomBaseModelAdminWithSoftDelete']
 
 console = console(source=__name__)
 logger = logging.getLogger('app')
 
+STATUS_COUNTS_CACHE_TIMEOUT = 30
+STATUS_COUNTS_KEY_PREFIX = 'baseapp.status_counts'
+HARD_DELETE_SUMMARY_THRESHOLD = 1000
+
 
 class CustomBaseModelAdmin(admin.ModelAdmin):
     """
@@ -25,7 +67,28 @@ class CustomBaseModelAdmin(admin.ModelAdmin):
 
     """
 
-    sticky_list_filter = ('status',)
+    sticky_list_filter = (('status', StatusListFilter),)
+
+    # show row counts of statuses in the status filter, one `GROUP BY`
+    # query per filter combination, cached for `status_counts_cache_timeout`
+    # seconds. Skipped above `estimated_count_threshold` rows
+    show_status_counts = True
+    status_counts_cache_timeout = STATUS_COUNTS_CACHE_TIMEOUT
+
+    # set False to show soft deleted rows of related managers (m2m widgets,
+    # readonly relations...) in admin views
+    filter_deleted_relations = True
+
+    # set a row count to skip exact `COUNT(*)`s of changelists above it,
+    # counts come from planner statistics and are shown as approximate
+    estimated_count_threshold = None
+    estimated_count_cache_timeout = ESTIMATED_COUNT_CACHE_TIMEOUT
+
+    # streaming export actions of selected rows, `list_display` fields are
+    # read with `iterator()` in chunks of `export_chunk_size`. Set `()` to
+    # hide them
+    export_formats = ('csv', 'jsonl')
+    export_chunk_size = EXPORT_CHUNK_SIZE
 
     formfield_overrides = {
         models.ImageField: {'widget': AdminImageFileWidget},
@@ -38,8 +101,173 @@ class CustomBaseModelAdmin(admin.ModelAdmin):
             list_filter = list(self.sticky_list_filter) + list(list_filter)
         return list_filter
 
+    def get_actions(self, request):
+        existing_actions = super().get_actions(request)
+        if self.actions is not None and IS_POPUP_VAR not in request.GET:
+            existing_actions.update(get_export_actions(self.export_formats))
+        return existing_actions
+
+    def get_export_field_names(self, request):
+        return get_export_field_names(self, request)
+
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        if self.estimated_count_threshold is None:
+            return super().get_paginator(
+                request, queryset, per_page, orphans=orphans, allow_empty_first_page=allow_empty_first_page
+            )
+        return EstimatedCountPaginator(
+            queryset,
+            per_page,
+            orphans=orphans,
+            allow_empty_first_page=allow_empty_first_page,
+            threshold=self.estimated_count_threshold,
+            cache_timeout=self.estimated_count_cache_timeout,
+        )
+
+    def get_changelist(self, request, **kwargs):
+        if self.estimated_count_threshold is None:
+            return super().get_changelist(request, **kwargs)
+        return EstimatedCountChangeList
+
+    def deleted_relations_context(self):
+        if self.filter_deleted_relations:
+            return nullcontext()
+        return include_deleted_relations()
+
+    def render_with_deleted_relations(self, view, *args, **kwargs):
+        with self.deleted_relations_context():
+            response = view(*args, **kwargs)
+            # template responses are rendered lazily...
+            if hasattr(response, 'render') and not response.is_rendered:
+                response.render()
+        return response
+
+    def changelist_view(self, request, extra_context=None):
+        return self.render_with_deleted_relations(super().changelist_view, request, extra_context=extra_context)
+
+    def changeform_view(self, request, object_id=None, form_url='', extra_context=None):
+        try:
+            return self.render_with_deleted_relations(
+                super().changeform_view, request, object_id=object_id, form_url=form_url, extra_context=extra_context
+            )
+        except VersionConflict:
+            # changed after the form is validated, nothing is saved...
+            self.message_user(request, self.get_conflict_message(), messages.ERROR)
+            return HttpResponseRedirect(request.get_full_path())
+
+    def get_conflict_message(self):
+        message = _('This %(name)s was changed by someone else while you were editing it, your changes are not saved.')
+        return message % dict(name=self.model._meta.verbose_name)  # pylint: disable=W0212
+
+    def get_form(self, request, obj=None, change=False, **kwargs):
+        if not uses_versioning(self.model):
+            return super().get_form(request, obj=obj, change=change, **kwargs)
+
+        # `version` is a form field, not a model form field...
+        if 'fields' not in kwargs:
+            kwargs['fields'] = flatten_fieldsets(self.get_fieldsets(request, obj))
+        if kwargs['fields'] is not None:
+            kwargs['fields'] = [field_name for field_name in kwargs['fields'] if field_name != VERSION_FIELD_NAME]
+        # stale forms are invalid...
+        return get_versioned_form(super().get_form(request, obj=obj, change=change, **kwargs))
+
+    def get_fieldsets(self, request, obj=None):
+        fieldsets = super().get_fieldsets(request, obj=obj)
+        if not uses_versioning(self.model) or not fieldsets:
+            return fieldsets
+        if VERSION_FIELD_NAME in flatten_fieldsets(fieldsets):
+            return fieldsets
+        (name, options), *rest = fieldsets
+        options = dict(options, fields=list(options.get('fields', [])) + [VERSION_FIELD_NAME])
+        return [(name, options)] + list(rest)
+
+    def get_status_counts(self, request, changelist=None, status_filter=None):
+        """
+        Returns `{status: count}` of rows which match the other filters and
+        the search of `changelist`, counted with a single `GROUP BY status`
+        and cached for `status_counts_cache_timeout` seconds per filter
+        combination. Unfiltered counts of models which have
+        `status_counters` come from the counter table. Returns `None` when
+        the rows to group are more than `estimated_count_threshold`.
+        """
+
+        if not self.show_status_counts:
+            return None
+        if changelist is None:
+            return self.model.objects.status_counts() if uses_status_counters(self.model) else None
+
+        status_params = status_filter.expected_parameters() if status_filter is not None else []
+        params = {key: value for key, value in changelist.get_filters_params().items() if key not in status_params}
+        if not params and not changelist.query and uses_status_counters(self.model):
+            return self.model.objects.status_counts()
+
+        cache = get_object_cache()
+        cache_key = self.get_status_counts_cache_key(request, params, changelist.query)
+        status_counts = cache.get(cache_key)
+        if status_counts is None:
+            queryset, use_distinct = self.get_status_counts_queryset(request, changelist, status_filter)
+            if self.estimated_count_threshold is not None:
+                count, __ = get_estimated_count(
+                    queryset, self.estimated_count_threshold, self.estimated_count_cache_timeout
+                )
+                if count > self.estimated_count_threshold:
+                    # too big to group...
+                    return None
+            status_counts = self.count_statuses(queryset, use_distinct)
+            cache.set(cache_key, status_counts, self.status_counts_cache_timeout)
+        return status_counts
+
+    def get_status_counts_cache_key(self, request, params, search_term):  # pylint: disable=W0613
+        # shared by every user, add `request.user` if `get_queryset()`
+        # depends on it...
+        key = repr((self.model._meta.label, sorted(params.items()), search_term))  # pylint: disable=W0212
+        return '{0}.{1}'.format(STATUS_COUNTS_KEY_PREFIX, hashlib.md5(key.encode()).hexdigest())
+
+    def get_status_counts_queryset(self, request, changelist, status_filter):
+        """
+        Returns `(queryset, use_distinct)`: rows of `changelist` without the
+        status filter.
+        """
+
+        queryset = changelist.root_queryset
+        for filter_spec in changelist.filter_specs:
+            if filter_spec is not status_filter:
+                queryset = filter_spec.queryset(request, queryset) or queryset
+        __, __, remaining_lookup_params, use_distinct = changelist.get_filters(request)
+        queryset = queryset.filter(**remaining_lookup_params)
+        queryset, search_use_distinct = self.get_search_results(request, queryset, changelist.query)
+        return queryset.order_by(), use_distinct or search_use_distinct
+
+    def count_statuses(self, queryset, use_distinct):
+        if not use_distinct:
+            return queryset.status_counts()
+        # joins of many to many lookups repeat rows...
+        counts = dict.fromkeys([status for status, __ in self.model.STATUS_CHOICES], 0)
+        counts.update(queryset.order_by().values_list('status').annotate(models.Count('pk', distinct=True)))
+        return counts
+
+
+def enqueue_action_job(modeladmin, request, action, queryset):
+    threshold = modeladmin.background_action_threshold
+    # reads at most one row past the threshold, the selection isn't counted...
+    if threshold is None or not queryset.order_by()[threshold:].exists():
+        return None
+    job = enqueue_job(action, queryset, user=request.user)
+    modeladmin.message_user(request, _('Selected records are queued, they are processed in the background'))
+    opts = modeladmin.model._meta  # pylint: disable=W0212
+    url = reverse(
+        'admin:{0}_{1}_job'.format(opts.app_label, opts.model_name),
+        args=[job.pk],
+        current_app=modeladmin.admin_site.name,
+    )
+    return HttpResponseRedirect(url)
+
 
 def recover_selected(modeladmin, request, queryset):
+    response = enqueue_action_job(modeladmin, request, 'undelete', queryset)
+    if response is not None:
+        return response
+
     number_of_rows_recovered, __ = queryset.undelete()  # __ = recovered_items
     if number_of_rows_recovered == 1:
         message_bit = _('1 record was')
@@ -47,18 +275,40 @@ def recover_selected(modeladmin, request, queryset):
         message_bit = _('%(number_of_rows)s records were') % dict(number_of_rows=number_of_rows_recovered)
     message = _('%(message_bit)s successfully marked as active') % dict(message_bit=message_bit)
     modeladmin.message_user(request, message)
+    return None
 
 
 def hard_delete_selected(modeladmin, request, queryset):
     opts = modeladmin.model._meta  # # pylint: disable=W0212
 
-    deletable_objects, model_count, perms_needed, protected = modeladmin.get_deleted_objects(queryset, request)
+    if request.POST.get('post'):
+        # confirmed, queued without counting the cascade again. Protected
+        # rows fail the job...
+        if not modeladmin.has_delete_permission(request):
+            raise PermissionDenied
+        response = enqueue_action_job(modeladmin, request, 'hard_delete', queryset)
+        if response is not None:
+            return response
+
+    count = queryset.count()
+    threshold = modeladmin.hard_delete_summary_threshold
+    summarized = threshold is not None and count > threshold
+    if summarized:
+        # no nested list of every cascaded object...
+        sample, model_count, perms_needed, protected = get_deletion_summary(
+            modeladmin, request, queryset, modeladmin.hard_delete_sample_size
+        )
+        deletable_objects = [sample]
+    else:
+        deletable_objects, model_count, perms_needed, protected = modeladmin.get_deleted_objects(queryset, request)
+        deletable_objects = [deletable_objects]
 
     if request.POST.get('post') and not protected:
         if perms_needed:
             raise PermissionDenied
-        if queryset.count():
-            number_of_rows_deleted, __ = queryset.hard_delete()  # __ = deleted_items
+        if count:
+            batch_size = modeladmin.hard_delete_batch_size if summarized else None
+            number_of_rows_deleted, __ = queryset.hard_delete(batch_size=batch_size)  # __ = deleted_items
             if number_of_rows_deleted == 1:
                 message_bit = _('1 record was')
             else:
@@ -77,9 +327,12 @@ def hard_delete_selected(modeladmin, request, queryset):
         **modeladmin.admin_site.each_context(request),
         'title': title,
         'objects_name': str(objects_name),
-        'deletable_objects': [deletable_objects],
+        'deletable_objects': deletable_objects,
         'model_count': dict(model_count).items(),
         'queryset': queryset,
+        'summarized': summarized,
+        'select_across': request.POST.get('select_across') == '1',
+        'selected': request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
         'perms_lacking': perms_needed,
         'protected': protected,
         'opts': opts,
@@ -96,12 +349,61 @@ class CustomBaseModelAdminWithSoftDelete(CustomBaseModelAdmin):
 
     hide_deleted_at = True
 
+    # hard delete confirmation of more rows shows per model counts and a
+    # sample instead of every object, rows are deleted in batches of
+    # `hard_delete_batch_size`. Set None to list every object
+    hard_delete_summary_threshold = HARD_DELETE_SUMMARY_THRESHOLD
+    hard_delete_sample_size = DELETION_SAMPLE_SIZE
+    hard_delete_batch_size = SOFT_DELETE_BATCH_SIZE
+
+    # recover / hard delete of more rows are queued as jobs which
+    # `manage.py run_admin_jobs` runs in batches, the action redirects to
+    # the progress page of the job. None runs every action in the request
+    background_action_threshold = None
+
+    # seconds between progress requests of the job page
+    job_poll_interval = 2
+
     def get_queryset(self, request):
         queryset = super().get_queryset(request)
         if request.GET:
             return queryset
         return queryset.all()
 
+    def get_urls(self):
+        opts = self.model._meta  # pylint: disable=W0212
+        urls = [
+            path(
+                'jobs/<int:job_id>/',
+                self.admin_site.admin_view(self.job_view),
+                name='{0}_{1}_job'.format(opts.app_label, opts.model_name),
+            )
+        ]
+        # before `<path:object_id>/` of the change view...
+        return urls + super().get_urls()
+
+    def job_view(self, request, job_id):
+        """
+        Progress page of a queued action, `?format=json` returns the
+        progress which the page polls.
+        """
+
+        if not self.has_view_or_change_permission(request):
+            raise PermissionDenied
+        job = get_object_or_404(AdminJob, pk=job_id, model_label=self.model._meta.label)  # pylint: disable=W0212
+        if request.GET.get('format') == 'json':
+            return JsonResponse(job.as_dict())
+
+        context = {
+            **self.admin_site.each_context(request),
+            'title': _('Job %(id)s') % dict(id=job.pk),
+            'job': job,
+            'poll_interval': self.job_poll_interval * 1000,
+            'opts': self.model._meta,  # pylint: disable=W0212
+        }
+        request.current_app = self.admin_site.name
+        return TemplateResponse(request, 'admin/admin_job.html', context)
+
     def get_exclude(self, request, obj=None):
         excluded = super().get_exclude(request, obj=obj)
         exclude = [] if excluded is None else list(excluded)
@@ -0,0 +1,79 @@
+# pylint: disable=W0212
+
+import logging
+from collections import Counter
+
+from django.db import models
+from django.db.models.deletion import (
+    get_candidate_relations_to_delete,
+)
+from django.utils.text import capfirst
+
+from ..utils import console
+
+__all__ = ['get_deletion_summary']
+
+console = console(source=__name__)
+logger = logging.getLogger('app')
+
+DELETION_SAMPLE_SIZE = 100
+
+
+def count_cascade(queryset, model_count, protected, sample_size, path=()):
+    """
+    Adds row counts of `queryset` and of its deletion cascade to
+    `model_count`, related rows are counted with `COUNT(*)` over subqueries
+    of their parents. Samples of rows which `PROTECT` the deletion are
+    added to `protected`. Rows which are reached on more than one path are
+    counted more than once, self relations are followed one level deep.
+    """
+
+    model = queryset.model
+    count = queryset.count()
+    if not count:
+        return
+    model_count[model] += count
+    if model in path:
+        # cycle of relations, counted once on the way...
+        return
+
+    for related in get_candidate_relations_to_delete(model._meta):
+        on_delete = related.field.remote_field.on_delete
+        if on_delete is models.DO_NOTHING:
+            continue
+        related_queryset = related.related_model._base_manager.using(queryset.db).filter(
+            **{'{0}__in'.format(related.field.name): queryset.values(related.field.target_field.attname)}
+        )
+        if on_delete is models.PROTECT:
+            protected.extend(format_object(obj) for obj in related_queryset[: sample_size - len(protected)])
+        elif on_delete is models.CASCADE:
+            count_cascade(related_queryset, model_count, protected, sample_size, path + (model,))
+
+
+def format_object(obj):
+    return '{0}: {1}'.format(capfirst(obj._meta.verbose_name), obj)
+
+
+def get_deletion_summary(modeladmin, request, queryset, sample_size=DELETION_SAMPLE_SIZE):
+    """
+    Summarized `get_deleted_objects()` of big selections. Returns
+    `(sample, model_count, perms_needed, protected)`: up to `sample_size`
+    selected objects, number of rows which would be deleted per model,
+    names of models which need delete permission and up to `sample_size`
+    protected objects. No object of the cascade is loaded, except the
+    samples.
+    """
+
+    model_count = Counter()
+    protected = []
+    count_cascade(queryset.order_by(), model_count, protected, sample_size)
+
+    perms_needed = set()
+    for model in model_count:
+        model_admin = modeladmin.admin_site._registry.get(model)
+        if model_admin is not None and not model_admin.has_delete_permission(request):
+            perms_needed.add(model._meta.verbose_name)
+
+    sample = [format_object(obj) for obj in queryset[:sample_size]]
+    model_count = {model._meta.verbose_name_plural: count for model, count in model_count.items()}
+    return sample, model_count, perms_needed, protected
@@ -0,0 +1,44 @@
+import logging
+
+from django.contrib import admin
+from django.utils.translation import ugettext_lazy as _
+
+from ..utils import console
+
+__all__ = ['StatusListFilter']
+
+console = console(source=__name__)
+logger = logging.getLogger('app')
+
+
+class StatusListFilter(admin.ChoicesFieldListFilter):
+    """
+
+    Choices filter of `status` field. Shows row counts of each status next
+    to its title when model admin's `get_status_counts()` returns them.
+    Counts follow the other active filters and the search.
+
+    """
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        super().__init__(field, request, params, model, model_admin, field_path)
+        self.request = request
+        self.model_admin = model_admin
+
+    def choices(self, changelist):
+        # counted while rendering, other filters are ready...
+        status_counts = self.model_admin.get_status_counts(self.request, changelist=changelist, status_filter=self)
+        yield {
+            'selected': self.lookup_val is None,
+            'query_string': changelist.get_query_string(remove=[self.lookup_kwarg, self.lookup_kwarg_isnull]),
+            'display': _('All'),
+        }
+        for lookup, title in self.field.flatchoices:
+            display = title
+            if status_counts is not None:
+                display = '{0} ({1})'.format(title, status_counts.get(lookup, 0))
+            yield {
+                'selected': str(lookup) == self.lookup_val,
+                'query_string': changelist.get_query_string({self.lookup_kwarg: lookup}, [self.lookup_kwarg_isnull]),
+                'display': display,
+            }
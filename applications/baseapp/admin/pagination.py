@@ -0,0 +1,144 @@
+import hashlib
+import logging
+
+from django.contrib.admin.options import (
+    IncorrectLookupParameters,
+)
+from django.contrib.admin.views.main import ChangeList
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import (
+    InvalidPage,
+    PageNotAnInteger,
+    Paginator,
+)
+from django.utils.functional import cached_property
+
+from ..models.cache import get_object_cache
+from ..models.indexes import estimate_count
+from ..utils import console
+
+__all__ = ['EstimatedCountChangeList', 'EstimatedCountPaginator', 'get_estimated_count']
+
+console = console(source=__name__)
+logger = logging.getLogger('app')
+
+ESTIMATED_COUNT_THRESHOLD = 100000
+ESTIMATED_COUNT_CACHE_TIMEOUT = 300
+ESTIMATED_COUNT_KEY_PREFIX = 'baseapp.count'
+
+
+def get_count_cache_key(queryset):
+    sql, params = queryset.query.sql_with_params()
+    digest = hashlib.md5(repr((queryset.db, sql, params)).encode()).hexdigest()
+    return '{0}.{1}'.format(ESTIMATED_COUNT_KEY_PREFIX, digest)
+
+
+def get_estimated_count(queryset, threshold=ESTIMATED_COUNT_THRESHOLD, cache_timeout=ESTIMATED_COUNT_CACHE_TIMEOUT):
+    """
+    Returns `(count, is_estimated)` of `queryset`. Counts above `threshold`
+    come from planner statistics (see `estimate_count()`). Without
+    statistics, exact counts above the threshold are cached for
+    `cache_timeout` seconds.
+    """
+
+    try:
+        estimate = estimate_count(queryset)
+        cache_key = get_count_cache_key(queryset.order_by()) if estimate is None else None
+    except EmptyResultSet:
+        return 0, False
+    if estimate is not None and estimate > threshold:
+        return estimate, True
+
+    cache = get_object_cache()
+    if cache_key is not None:
+        count = cache.get(cache_key)
+        if count is not None:
+            return count, True
+
+    count = queryset.count()
+    if cache_key is not None and count > threshold:
+        cache.set(cache_key, count, cache_timeout)
+    return count, False
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator which doesn't run `COUNT(*)` for querysets which have more
+    than `threshold` rows, see `get_estimated_count()`. `is_estimated` is
+    set when the count is not exact.
+    """
+
+    def __init__(
+        self,
+        object_list,
+        per_page,
+        orphans=0,
+        allow_empty_first_page=True,
+        threshold=ESTIMATED_COUNT_THRESHOLD,
+        cache_timeout=ESTIMATED_COUNT_CACHE_TIMEOUT,
+    ):
+        super().__init__(object_list, per_page, orphans=orphans, allow_empty_first_page=allow_empty_first_page)
+        self.threshold = threshold
+        self.cache_timeout = cache_timeout
+        self.is_estimated = False
+
+    @cached_property
+    def count(self):
+        count, self.is_estimated = get_estimated_count(self.object_list, self.threshold, self.cache_timeout)
+        return count
+
+    def validate_number(self, number):
+        if not self.is_estimated:
+            return super().validate_number(number)
+        # pages after an over estimate are empty, not invalid...
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('That page number is not an integer')
+        if number < 1:
+            return super().validate_number(number)
+        return number
+
+
+class EstimatedCountChangeList(ChangeList):
+    """
+    ChangeList of `CustomBaseModelAdmin` which has an
+    `estimated_count_threshold`. Full result count (`show_full_result_count`)
+    is estimated like the filtered count, `counts_estimated` is shown in
+    the templates.
+    """
+
+    def get_results(self, request):
+        paginator = self.model_admin.get_paginator(request, self.queryset, self.list_per_page)
+        result_count = paginator.count
+
+        full_result_count = None
+        full_is_estimated = False
+        if self.model_admin.show_full_result_count:
+            if not self.get_filters_params() and not self.query:
+                # no filters or search, same rows...
+                full_result_count, full_is_estimated = result_count, paginator.is_estimated
+            else:
+                full_result_count, full_is_estimated = get_estimated_count(
+                    self.root_queryset, paginator.threshold, paginator.cache_timeout
+                )
+        can_show_all = result_count <= self.list_max_show_all and not paginator.is_estimated
+        multi_page = result_count > self.list_per_page
+
+        if (self.show_all and can_show_all) or not multi_page:
+            result_list = self.queryset._clone()
+        else:
+            try:
+                result_list = paginator.page(self.page_num + 1).object_list
+            except InvalidPage:
+                raise IncorrectLookupParameters
+
+        self.result_count = result_count
+        self.show_full_result_count = self.model_admin.show_full_result_count
+        self.show_admin_actions = not self.show_full_result_count or bool(full_result_count)
+        self.full_result_count = full_result_count
+        self.result_list = result_list
+        self.can_show_all = can_show_all
+        self.multi_page = multi_page
+        self.paginator = paginator
+        self.counts_estimated = paginator.is_estimated or full_is_estimated
@@ -6,3 +6,6 @@ class BaseappConfig(AppConfig):
     name = 'baseapp'
     verbose_name = _('baseapp')
     verbose_name_plural = _('baseapp')
+
+    def ready(self):
+        from . import checks  # noqa: F401, pylint: disable=W0611,C0415
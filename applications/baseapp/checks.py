@@ -0,0 +1,104 @@
+# pylint: disable=W0212
+
+import logging
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import (  # pylint: disable=W0622
+    Tags,
+    Warning,
+    register,
+)
+from django.db import DatabaseError, router
+
+from .models import BaseModel
+from .models.cache import (
+    get_object_cache,
+    uses_generations,
+    uses_object_cache,
+)
+from .models.indexes import (
+    get_statistics_row_count,
+    has_status_indexes,
+)
+from .utils import console
+
+__all__ = ['check_object_cache', 'check_status_indexes']
+
+console = console(source=__name__)
+logger = logging.getLogger('app')
+
+STATUS_INDEXES_WARNING_ROWS = 100000
+
+# backends which aren't shared by other processes...
+PROCESS_LOCAL_CACHES = (LocMemCache, DummyCache)
+
+
+@register(Tags.database)
+def check_status_indexes(app_configs=None, **kwargs):  # pylint: disable=W0613
+    """
+    Warns about big `BaseModel` tables which don't have indexes of status
+    filters. Runs with `migrate` or `manage.py check --tag database`. Row
+    counts come from planner statistics, tables without statistics are
+    skipped (they are never counted).
+    """
+
+    warning_rows = getattr(settings, 'STATUS_INDEXES_WARNING_ROWS', STATUS_INDEXES_WARNING_ROWS)
+    if app_configs is None:
+        models = apps.get_models()
+    else:
+        models = [model for app_config in app_configs for model in app_config.get_models()]
+
+    errors = []
+    for model in models:
+        if not issubclass(model, BaseModel) or not model._meta.managed or model._meta.proxy:
+            continue
+        if has_status_indexes(model):
+            continue
+        try:
+            row_count = get_statistics_row_count(model, router.db_for_read(model))
+        except DatabaseError:
+            # not migrated yet...
+            continue
+        if row_count is not None and row_count >= warning_rows:
+            errors.append(
+                Warning(
+                    '{0} has about {1} rows but no indexes for status filters.'.format(model._meta.label, row_count),
+                    hint='Set `status_indexes = True` on the model and run makemigrations.',
+                    obj=model,
+                    id='baseapp.W001',
+                )
+            )
+    return errors
+
+
+@register(Tags.models)
+def check_object_cache(app_configs=None, **kwargs):  # pylint: disable=W0613
+    """
+    Warns about models which have `object_cache`, `queryset_cache` or
+    `snapshot` while `OBJECT_CACHE_ALIAS` is a process-local cache.
+    Generations and cached objects aren't shared, writes of other workers
+    are never seen.
+    """
+
+    if app_configs is None:
+        models = apps.get_models()
+    else:
+        models = [model for app_config in app_configs for model in app_config.get_models()]
+
+    cache = get_object_cache()
+    if not isinstance(cache, PROCESS_LOCAL_CACHES):
+        return []
+    alias = getattr(settings, 'OBJECT_CACHE_ALIAS', 'default')
+    return [
+        Warning(
+            '{0} is cached in the process-local cache {1!r}.'.format(model._meta.label, alias),
+            hint='Set `OBJECT_CACHE_ALIAS` to a cache which is shared by every worker (i.e. memcached, redis).',
+            obj=model,
+            id='baseapp.W002',
+        )
+        for model in models
+        if issubclass(model, BaseModel) and (uses_object_cache(model) or uses_generations(model))
+    ]
@@ -2,3 +2,4 @@
 # flake8: noqa
 
 from .user import UserChangeForm, UserCreationForm
+from .versioning import VersionedModelFormMixin
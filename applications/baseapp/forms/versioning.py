@@ -0,0 +1,48 @@
+# pylint: disable=R0903,W0212
+
+from django import forms
+from django.utils.translation import ugettext_lazy as _
+
+from ..models.versioning import VERSION_FIELD_NAME
+
+__all__ = ['VersionedModelFormMixin', 'get_versioned_form']
+
+
+class VersionedModelFormMixin:
+    """
+    Keeps the `version` of the edited object in a hidden field. Form is
+    invalid if the object is saved by someone else after the form is
+    rendered.
+    """
+
+    stale_message = _(
+        'This %(name)s was changed by someone else while you were editing it. '
+        'Reload the page to see the changes.'
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk is not None:
+            self.initial[VERSION_FIELD_NAME] = getattr(self.instance, VERSION_FIELD_NAME)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        version = cleaned_data.get(VERSION_FIELD_NAME)
+        if self.instance.pk is not None and version is not None:
+            if version != getattr(self.instance, VERSION_FIELD_NAME):
+                raise forms.ValidationError(
+                    self.stale_message, code='stale', params=dict(name=self.instance._meta.verbose_name)
+                )
+        return cleaned_data
+
+
+def get_versioned_form(form):
+    """
+    Returns a subclass of model form class `form` which has a hidden
+    `version` field.
+    """
+
+    if issubclass(form, VersionedModelFormMixin):
+        return form
+    attrs = {VERSION_FIELD_NAME: forms.IntegerField(widget=forms.HiddenInput, required=False)}
+    return type(form.__name__, (VersionedModelFormMixin, form), attrs)
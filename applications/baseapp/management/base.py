@@ -1,6 +1,10 @@
-# pylint: disable=W0223
+# pylint: disable=W0212,W0223
 
-from django.core.management.base import BaseCommand
+from django.apps import apps
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+)
 
 
 class CustomBaseCommand(BaseCommand):
@@ -23,3 +27,56 @@ class CustomBaseCommand(BaseCommand):
         switcher = {'s': 'SUCCESS', 'w': 'WARNING', 'e': 'ERROR', 'n': 'NOTICE'}.get(style, 's')
         writer = getattr(self.style, switcher)
         self.stdout.write(writer(text))
+
+
+class CustomModelsCommand(CustomBaseCommand):
+    """
+
+    CustomModelsCommand runs on `app_label.ModelName` arguments, all
+    subclasses of `model_class` which pass `uses_model()` by default.
+    `.report()` is a `progress` callback of batched model methods, shown
+    with `--verbosity 2`.
+
+    Usage:
+
+        class Command(CustomModelsCommand):
+            model_class = BaseModelWithSoftDelete
+
+            def handle(self, *args, **options):
+                self.verbosity = options['verbosity']
+                for model in self.get_models(options['models']):
+                    model.objects.purge_deleted(progress=self.report)
+
+    """
+
+    model_class = None
+    verbosity = 1
+
+    def uses_model(self, model):  # pylint: disable=R0201,W0613
+        return True
+
+    def check_model(self, label, model):
+        if not issubclass(model, self.model_class):
+            raise CommandError('{0} is not a {1}'.format(label, self.model_class.__name__))
+
+    def get_models(self, labels):
+        if not labels:
+            return [
+                model
+                for model in apps.get_models()
+                if issubclass(model, self.model_class) and not model._meta.proxy and self.uses_model(model)
+            ]
+
+        found_models = []
+        for label in labels:
+            try:
+                model = apps.get_model(label)
+            except (LookupError, ValueError) as err:
+                raise CommandError(err)
+            self.check_model(label, model)
+            found_models.append(model)
+        return found_models
+
+    def report(self, progress):
+        if self.verbosity > 1:
+            self.out('{label}: {total} rows, last pk: {last_pk}, {rate:.1f} rows/sec'.format(**progress), 'n')
@@ -0,0 +1,46 @@
+# pylint: disable=W0212
+
+import datetime
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import CommandError
+
+from ...models import BaseModelWithSoftDelete
+from ...models.base import SOFT_DELETE_BATCH_SIZE
+from ..base import CustomModelsCommand
+
+
+class Command(CustomModelsCommand):
+    model_class = BaseModelWithSoftDelete
+
+    help = (  # noqa: A003
+        'Moves soft deleted rows into `<table>_archive` tables. Works for models which '
+        'have `soft_delete_archive_after` set, `--days` overrides it.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('models', nargs='*', type=str, help='app_label.ModelName, default: all archived models')
+        parser.add_argument('--days', type=int, help='Archive rows soft deleted more than DAYS ago')
+        parser.add_argument('--batch-size', type=int, default=SOFT_DELETE_BATCH_SIZE, help='Rows per batch')
+        parser.add_argument('--sleep', type=float, default=0, help='Seconds to wait between batches')
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        older_than = None
+        if options['days'] is not None:
+            older_than = datetime.timedelta(days=options['days'])
+
+        for model in self.get_models(options['models']):
+            try:
+                total, counter = model.objects.archive_deleted(
+                    older_than=older_than or model.soft_delete_archive_after,
+                    batch_size=options['batch_size'],
+                    sleep=options['sleep'],
+                    progress=self.report,
+                )
+            except ImproperlyConfigured as err:
+                raise CommandError(err)
+            self.out('{0}: {1} rows archived {2}'.format(model._meta.label, total, counter))
+
+    def uses_model(self, model):
+        return model.soft_delete_archive_after is not None
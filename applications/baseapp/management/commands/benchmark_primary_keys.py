@@ -0,0 +1,85 @@
+# pylint: disable=W0212
+
+import time
+import uuid
+
+from django.apps.registry import Apps
+from django.db import connections, models, transaction
+from django.utils import timezone
+
+from ...models.bulk import batches
+from ...models.identifiers import TimeOrderedUUIDField
+from ..base import CustomBaseCommand
+
+BENCHMARK_ROWS = 100000
+BENCHMARK_BATCH_SIZE = 1000
+
+PRIMARY_KEYS = [
+    ('integer', lambda: models.AutoField(primary_key=True)),
+    ('uuid4', lambda: models.UUIDField(primary_key=True, default=uuid.uuid4)),
+    ('uuid7', lambda: TimeOrderedUUIDField(primary_key=True)),
+]
+
+
+def create_benchmark_model(name, pk_field):
+    meta = type('Meta', (), dict(app_label='baseapp', apps=Apps(), db_table='baseapp_benchmark_{0}'.format(name)))
+    attrs = {
+        '__module__': __name__,
+        'Meta': meta,
+        'id': pk_field,
+        'created_at': models.DateTimeField(),
+        'title': models.CharField(max_length=255),
+    }
+    return type('Benchmark{0}'.format(name.title()), (models.Model,), attrs)
+
+
+class Command(CustomBaseCommand):
+    help = (  # noqa: A003
+        'Compares insert throughput and primary key index size of integer, random UUID (v4) and '
+        'time-ordered UUID (v7) primary keys on temporary tables.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=BENCHMARK_ROWS, help='rows per table')
+        parser.add_argument('--batch-size', type=int, default=BENCHMARK_BATCH_SIZE, help='rows per insert')
+        parser.add_argument('--database', default='default', help='database alias')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        for name, pk_field in PRIMARY_KEYS:
+            model = create_benchmark_model(name, pk_field())
+            with connection.schema_editor() as schema_editor:
+                schema_editor.create_model(model)
+            try:
+                elapsed = self.insert_rows(model, options['rows'], options['batch_size'], options['database'])
+                index_size = self.get_index_size(model, connection)
+            finally:
+                with connection.schema_editor() as schema_editor:
+                    schema_editor.delete_model(model)
+
+            self.out(
+                '{0:<8} {1:>10.0f} rows/s  pk index: {2}'.format(
+                    name,
+                    options['rows'] / elapsed if elapsed else 0,
+                    'n/a' if index_size is None else '{0:.1f} KB'.format(index_size / 1024),
+                )
+            )
+
+    def insert_rows(self, model, rows, batch_size, using):
+        now = timezone.now()
+        started = time.perf_counter()
+        for batch in batches(range(rows), batch_size):
+            objs = [model(created_at=now, title='Row {0}'.format(i)) for i in batch]
+            with transaction.atomic(using=using):
+                model._base_manager.using(using).bulk_create(objs)
+        return time.perf_counter() - started
+
+    def get_index_size(self, model, connection):
+        if connection.vendor != 'postgresql':
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT pg_relation_size(indexrelid) FROM pg_index WHERE indrelid = %s::regclass AND indisprimary',
+                [model._meta.db_table],
+            )
+            return cursor.fetchone()[0]
@@ -0,0 +1,45 @@
+# pylint: disable=W0212
+
+import datetime
+
+from ...models import BaseModelWithSoftDelete
+from ...models.base import SOFT_DELETE_BATCH_SIZE
+from ..base import CustomModelsCommand
+
+
+class Command(CustomModelsCommand):
+    model_class = BaseModelWithSoftDelete
+
+    help = (  # noqa: A003
+        'Hard deletes soft deleted rows which are older than the retention of the model. '
+        'Retention comes from `soft_delete_retention` of the model or `--days` option.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('models', nargs='*', type=str, help='app_label.ModelName, default: all soft delete models')
+        parser.add_argument('--days', type=int, help='Purge rows soft deleted more than DAYS ago')
+        parser.add_argument('--batch-size', type=int, default=SOFT_DELETE_BATCH_SIZE, help='Rows per batch')
+        parser.add_argument('--sleep', type=float, default=0, help='Seconds to wait between batches')
+        parser.add_argument('--dry-run', action='store_true', help='Report only, do not delete anything')
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        older_than = None
+        if options['days'] is not None:
+            older_than = datetime.timedelta(days=options['days'])
+
+        for model in self.get_models(options['models']):
+            retention = older_than or model.soft_delete_retention
+            if retention is None:
+                self.out('{0}: skipped, no retention'.format(model._meta.label), 'w')
+                continue
+
+            total, counter = model.objects.purge_deleted(
+                older_than=retention,
+                batch_size=options['batch_size'],
+                sleep=options['sleep'],
+                dry_run=options['dry_run'],
+                progress=self.report,
+            )
+            action = 'would be deleted' if options['dry_run'] else 'deleted'
+            self.out('{0}: {1} rows {2} {3}'.format(model._meta.label, total, action, counter))
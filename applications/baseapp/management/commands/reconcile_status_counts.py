@@ -0,0 +1,39 @@
+# pylint: disable=W0212
+
+from django.core.management.base import CommandError
+from django.db import router
+
+from ...models import BaseModel
+from ...models.counters import (
+    reconcile_status_counts,
+    uses_status_counters,
+)
+from ..base import CustomModelsCommand
+
+
+class Command(CustomModelsCommand):
+    model_class = BaseModel
+
+    help = (  # noqa: A003
+        'Recounts rows per status and fixes `StatusCounter` rows of models which have '
+        '`status_counters` set. Run periodically to fix drift.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('models', nargs='*', type=str, help='app_label.ModelName, default: all counted models')
+
+    def handle(self, *args, **options):
+        for model in self.get_models(options['models']):
+            using = router.db_for_write(model)
+            drift = reconcile_status_counts(model, model._base_manager.using(using), using)
+            if drift:
+                self.out('{0}: fixed {1}'.format(model._meta.label, drift), 'w')
+            else:
+                self.out('{0}: ok'.format(model._meta.label))
+
+    def uses_model(self, model):
+        return uses_status_counters(model)
+
+    def check_model(self, label, model):
+        if not issubclass(model, BaseModel) or not uses_status_counters(model):
+            raise CommandError('{0} does not use status counters'.format(label))
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import CommandError
+
+from ...models.base import SOFT_DELETE_BATCH_SIZE
+from ...models.jobs import AdminJob, claim_job, run_job
+from ..base import CustomBaseCommand
+
+JOB_POLL_INTERVAL = 2.0
+
+
+class Command(CustomBaseCommand):
+    help = (  # noqa: A003
+        'Runs queued admin jobs (recover / hard delete of big selections) in batches. Waits for new jobs, '
+        'use `--once` to exit when the queue is empty.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='exit when the queue is empty')
+        parser.add_argument('--batch-size', type=int, default=SOFT_DELETE_BATCH_SIZE, help='rows per batch')
+        parser.add_argument('--interval', type=float, default=JOB_POLL_INTERVAL, help='seconds between polls')
+        parser.add_argument('--database', default=None, help='database alias')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+
+        try:
+            while True:
+                job = claim_job(using=options['database'])
+                if job is None:
+                    if options['once']:
+                        break
+                    time.sleep(options['interval'])
+                    continue
+
+                self.out('{0}: started'.format(job), 'n')
+                job = run_job(job, batch_size=options['batch_size'])
+                if job.status == AdminJob.STATUS_FAILED:
+                    self.out('{0}: {1}'.format(job, job.error), 'e')
+                else:
+                    self.out('{0}: {1} rows processed'.format(job, job.processed))
+        except KeyboardInterrupt:
+            pass
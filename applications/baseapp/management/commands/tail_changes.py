@@ -0,0 +1,56 @@
+import json
+import time
+
+from django.core.management.base import CommandError
+
+from ...models.outbox import (
+    CHANGE_FEED_BATCH_SIZE,
+    latest_change_id,
+    read_changes,
+)
+from ..base import CustomBaseCommand
+
+TAIL_INTERVAL = 1.0
+
+
+class Command(CustomBaseCommand):
+    help = (  # noqa: A003
+        'Prints change records of models which have `change_feed` set as JSON lines. Starts after the latest '
+        'record, use `--after` to resume from a cursor and `--follow` to wait for new records.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--after', type=int, default=None, help='cursor (record id), default: latest record')
+        parser.add_argument('--models', nargs='*', type=str, help='app_label.ModelName, default: all models')
+        parser.add_argument('--batch-size', type=int, default=CHANGE_FEED_BATCH_SIZE, help='records per query')
+        parser.add_argument('-f', '--follow', action='store_true', help='wait for new records')
+        parser.add_argument('--interval', type=float, default=TAIL_INTERVAL, help='seconds between polls')
+        parser.add_argument('--database', default=None, help='database alias')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+
+        cursor = options['after']
+        if cursor is None:
+            cursor = latest_change_id(using=options['database'])
+        try:
+            while True:
+                previous_cursor = cursor
+                records, cursor = read_changes(
+                    after=cursor,
+                    limit=options['batch_size'],
+                    model_labels=options['models'] or None,
+                    using=options['database'],
+                )
+                for record in records:
+                    self.stdout.write(json.dumps(record.as_dict()))
+                if cursor == previous_cursor:
+                    # nothing new (or a gap which is not settled yet)...
+                    if not options['follow']:
+                        break
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        # resume with --after...
+        self.stderr.write('cursor: {0}'.format(cursor))
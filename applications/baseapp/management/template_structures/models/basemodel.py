@@ -19,6 +19,9 @@ console = console(source=__name__)
 class {model_name_title}(BaseModel):
     title = models.CharField(max_length=255, verbose_name=_('title'))
 
+    # indexes for status filters, see baseapp.models.get_status_indexes
+    status_indexes = True
+
     class Meta:
         app_label = '{app_name}'
         verbose_name = _('{model_name}')
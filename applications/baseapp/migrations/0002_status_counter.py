@@ -0,0 +1,28 @@
+# Generated by Django 2.2.6 on 2026-10-18 07:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('baseapp', '0001_create_custom_user'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatusCounter',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_label', models.CharField(max_length=255, verbose_name='model')),
+                ('status', models.IntegerField(verbose_name='status')),
+                ('count', models.BigIntegerField(default=0, verbose_name='count')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='updated at')),
+            ],
+            options={
+                'verbose_name': 'status counter',
+                'verbose_name_plural': 'status counters',
+                'unique_together': {('model_label', 'status')},
+            },
+        ),
+    ]
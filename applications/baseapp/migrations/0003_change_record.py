@@ -0,0 +1,31 @@
+# Generated by Django 2.2.6 on 2026-10-18 07:55
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('baseapp', '0002_status_counter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeRecord',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('model_label', models.CharField(max_length=255, verbose_name='model')),
+                ('object_pk', models.CharField(max_length=64, null=True, verbose_name='object pk')),
+                (
+                    'action',
+                    models.PositiveSmallIntegerField(
+                        choices=[(1, 'save'), (2, 'delete'), (3, 'undelete'), (4, 'hard delete')],
+                        verbose_name='action',
+                    ),
+                ),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='created at')),
+            ],
+            options={'verbose_name': 'change record', 'verbose_name_plural': 'change records',},
+        ),
+    ]
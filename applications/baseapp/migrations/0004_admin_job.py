@@ -0,0 +1,51 @@
+# Generated by Django 2.2.6 on 2026-10-18 08:03
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('baseapp', '0003_change_record'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AdminJob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('action', models.CharField(max_length=64, verbose_name='action')),
+                ('model_label', models.CharField(max_length=255, verbose_name='model')),
+                ('selection', models.TextField(verbose_name='selection')),
+                (
+                    'status',
+                    models.PositiveSmallIntegerField(
+                        choices=[(0, 'pending'), (1, 'running'), (2, 'done'), (3, 'failed')],
+                        default=0,
+                        verbose_name='status',
+                    ),
+                ),
+                ('total', models.PositiveIntegerField(null=True, verbose_name='selected rows')),
+                ('processed', models.PositiveIntegerField(default=0, verbose_name='processed rows')),
+                ('last_pk', models.CharField(max_length=64, null=True, verbose_name='last pk')),
+                ('error', models.TextField(blank=True, verbose_name='error')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='created at')),
+                ('started_at', models.DateTimeField(null=True, verbose_name='started at')),
+                ('updated_at', models.DateTimeField(null=True, verbose_name='updated at')),
+                ('finished_at', models.DateTimeField(null=True, verbose_name='finished at')),
+                (
+                    'created_by',
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name='created by',
+                    ),
+                ),
+            ],
+            options={'verbose_name': 'admin job', 'verbose_name_plural': 'admin jobs',},
+        ),
+    ]
@@ -2,3 +2,4 @@
 # flake8: noqa
 
 from .html_debug import HtmlDebugMixin
+from .seek_pagination import SeekPaginationMixin
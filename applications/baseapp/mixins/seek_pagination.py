@@ -0,0 +1,59 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.http import Http404
+from django.utils.translation import ugettext_lazy as _
+
+from ..models.pagination import (
+    SEEK_PAGE_SIZE,
+    InvalidCursor,
+)
+
+__all__ = ['SeekPaginationMixin']
+
+
+class SeekPaginationMixin:
+    """
+    Keyset pagination for `TemplateView` subclasses. Set `seek_queryset`
+    or override `get_seek_queryset()`:
+
+        class PostListView(SeekPaginationMixin, TemplateView):
+            template_name = 'blog/posts.html'
+            seek_queryset = Post.objects.actives()
+            seek_size = 20
+
+    Adds `page`, `object_list` and `next_page_url` to the context.
+    `?after=` takes the signed cursor, tampered cursors raise `Http404`.
+    """
+
+    seek_queryset = None
+    seek_size = SEEK_PAGE_SIZE
+    seek_descending = False
+    seek_query_param = 'after'
+
+    def get_seek_queryset(self):
+        if self.seek_queryset is None:
+            raise ImproperlyConfigured(
+                '%(cls)s is missing a seek queryset. Define %(cls)s.seek_queryset or override '
+                '%(cls)s.get_seek_queryset().' % {'cls': self.__class__.__name__}
+            )
+        # fresh copy, all() filters deleted rows of soft delete querysets...
+        return self.seek_queryset.filter()
+
+    def get_next_page_url(self, page):
+        if not page.has_next:
+            return None
+        query = self.request.GET.copy()
+        query[self.seek_query_param] = page.next_cursor
+        return '?{0}'.format(query.urlencode())
+
+    def get_context_data(self, **kwargs):
+        kwargs = super().get_context_data(**kwargs)
+        try:
+            page = self.get_seek_queryset().seek(
+                after=self.request.GET.get(self.seek_query_param),
+                size=self.seek_size,
+                descending=self.seek_descending,
+            )
+        except InvalidCursor:
+            raise Http404(_('Invalid page'))
+        kwargs.update(page=page, object_list=page.object_list, next_page_url=self.get_next_page_url(page))
+        return kwargs
@@ -2,4 +2,11 @@
 # flake8: noqa
 
 from .base import BaseModel, BaseModelWithSoftDelete
+from .counters import StatusCounter
+from .identifiers import TimeOrderedUUIDField, uuid7
+from .indexes import get_status_indexes
+from .jobs import AdminJob
+from .outbox import ChangeRecord, read_changes
+from .related import include_deleted_relations
 from .user import User
+from .versioning import VersionConflict, retry_on_conflict
@@ -0,0 +1,120 @@
+# pylint: disable=W0212
+
+import logging
+
+from django.db import connections, models
+from django.db.models.fields.related import (
+    lazy_related_operation,
+)
+from django.db.models.signals import class_prepared
+
+from ..utils import console
+
+__all__ = ['get_archive_model', 'move_rows']
+
+console = console(source=__name__)
+logger = logging.getLogger('app')
+
+ARCHIVE_MODELS = {}
+
+
+def get_archive_model(model):
+    """
+    Returns generated `<table>_archive` model of given soft delete model or
+    `None` if archive is not enabled for the model.
+    """
+
+    return ARCHIVE_MODELS.get(model._meta.concrete_model)
+
+
+def archive_field(field):
+    """
+    Returns a plain data field for the archive table which has the same
+    column with `field`. Relations become plain columns without constraints,
+    auto fields become integers, unique constraints and auto values are
+    dropped.
+    """
+
+    if field.is_relation:
+        column_field = archive_field(field.target_field)
+        column_field.primary_key = False
+        column_field.null = field.null
+        column_field.db_index = True
+        column_field.db_column = field.column
+        return column_field
+
+    if isinstance(field, models.BigAutoField):
+        return models.BigIntegerField(primary_key=field.primary_key, db_column=field.db_column)
+    if isinstance(field, models.AutoField):
+        return models.IntegerField(primary_key=field.primary_key, db_column=field.db_column)
+
+    __, __, args, kwargs = field.deconstruct()
+    for keyword in ['unique', 'auto_now', 'auto_now_add', 'editable']:
+        kwargs.pop(keyword, None)
+    return field.__class__(*args, **kwargs)
+
+
+def create_archive_model(model):
+    """
+    Generates `<ModelName>Archive` model for `<table>_archive` shadow table.
+    Columns are in the same order with the original table so rows can be
+    moved with `INSERT ... SELECT`.
+    """
+
+    opts = model._meta
+    attrs = {
+        '__module__': model.__module__,
+        'Meta': type(
+            'Meta',
+            (),
+            dict(
+                app_label=opts.app_label,
+                db_table='{0}_archive'.format(opts.db_table),
+                managed=opts.managed,
+                verbose_name='{0} archive'.format(opts.verbose_name),
+                verbose_name_plural='{0} archive'.format(opts.verbose_name_plural),
+            ),
+        ),
+    }
+    for field in opts.concrete_fields:
+        attrs[field.attname] = archive_field(field)
+    return type('{0}Archive'.format(model.__name__), (models.Model,), attrs)
+
+
+def register_archive_model(sender, **kwargs):  # pylint: disable=W0613
+    if getattr(sender, 'soft_delete_archive_after', None) is None:
+        return
+    if sender._meta.abstract or sender._meta.proxy or sender in ARCHIVE_MODELS:
+        return
+
+    def register(model, *related_models):  # pylint: disable=W0613
+        ARCHIVE_MODELS[model] = create_archive_model(model)
+
+    # archive columns of relations need the related models...
+    related_models = [field.remote_field.model for field in sender._meta.concrete_fields if field.is_relation]
+    lazy_related_operation(register, sender, *related_models)
+
+
+class_prepared.connect(register_archive_model)
+
+
+def move_rows(queryset, target_model, using):
+    """
+    Moves rows of `queryset` into `target_model`'s table with a single
+    `INSERT ... SELECT` and deletes them from the source table. Both tables
+    must have the same columns. Returns number of moved rows.
+    """
+
+    connection = connections[using]
+    source_columns = [field.attname for field in queryset.model._meta.concrete_fields]
+    target_columns = ', '.join(connection.ops.quote_name(field.column) for field in target_model._meta.concrete_fields)
+
+    select_sql, select_params = queryset.values_list(*source_columns).query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'INSERT INTO {0} ({1}) {2}'.format(
+                connection.ops.quote_name(target_model._meta.db_table), target_columns, select_sql
+            ),
+            select_params,
+        )
+    return queryset._raw_delete(using=using)
@@ -1,15 +1,75 @@
-# pylint: disable=W0212,W0143,R0201
+# pylint: disable=W0212,W0143,R0201,R0913
 
 import logging
+import time
+import uuid
 from collections import Counter
+from contextlib import nullcontext
+from operator import attrgetter
 
+from django.core.exceptions import ImproperlyConfigured
 from django.db import models, router, transaction
-from django.db.models.deletion import Collector
+from django.db.models.deletion import (
+    Collector,
+    get_candidate_relations_to_delete,
+)
 from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
 
 from ..utils import console
-from .signals import post_undelete, pre_undelete
+from .archive import get_archive_model, move_rows
+from .bulk import (
+    BULK_BATCH_SIZE,
+    batches,
+    bulk_update_rows,
+    bulk_upsert_rows,
+)
+from .cache import (
+    OBJECT_CACHE_TIMEOUT,
+    QUERYSET_CACHE_TIMEOUT,
+    cached_get,
+    cached_get_many,
+    cached_queryset,
+    objects_changed,
+    uses_object_cache,
+)
+from .counters import (
+    change_status_counts,
+    count_by_status,
+    get_status_counts,
+    raw_delete_with_status_counts,
+    update_with_status_counts,
+    uses_status_counters,
+)
+from .outbox import (
+    ChangeRecord,
+    record_changes,
+    uses_change_feed,
+)
+from .pagination import SEEK_PAGE_SIZE, seek_page
+from .related import (
+    filters_deleted_relations,
+    include_deleted_relations,
+    live_prefetch_queryset,
+    with_deleted_relations,
+)
+from .signals import (
+    post_bulk_delete,
+    post_bulk_undelete,
+    post_undelete,
+    pre_bulk_delete,
+    pre_bulk_undelete,
+    pre_undelete,
+)
+from .snapshots import snapshots
+from .versioning import (
+    VERSION_FIELD_NAME,
+    VersionConflict,
+    get_version_field,
+    get_versions_filter,
+    uses_versioning,
+    version_increment,
+)
 
 __all__ = ['BaseModel', 'BaseModelWithSoftDelete']
 
@@ -17,6 +77,356 @@ console = console(source=__name__)
 logger = logging.getLogger('app')
 
 
+SOFT_DELETE_BATCH_SIZE = 500
+
+
+class SoftDeleteProgress:
+    """
+    Keeps counters of a soft delete / undelete operation and reports each
+    processed batch to the optional `callback`:
+
+        def report(progress):
+            print(progress)
+
+        # {'label': 'blog.Post', 'count': 1000, 'last_pk': 4512,
+        #  'total': 3000, 'elapsed': 1.52, 'rate': 1973.68,
+        #  'deleted_batch': UUID('...')}
+
+        Category.objects.deleted().undelete(batch_size=1000, progress=report)
+
+    `rate` is processed rows per second since the operation started.
+    `deleted_batch` is the batch of a soft delete (`None` for undelete),
+    pass it to `delete()` to resume an interrupted chunked delete.
+
+    """
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.counter = Counter()
+        self.started_at = time.monotonic()
+        self.deleted_batch = None
+
+    def add(self, label, count, last_pk=None):
+        self.counter[label] += count
+        if self.callback is None:
+            return
+        total = sum(self.counter.values())
+        elapsed = time.monotonic() - self.started_at
+        self.callback(
+            dict(
+                label=label,
+                count=count,
+                last_pk=last_pk,
+                total=total,
+                elapsed=elapsed,
+                rate=(total / elapsed) if elapsed else float(total),
+                deleted_batch=self.deleted_batch,
+            )
+        )
+
+    def result(self):
+        # empty fast deletes are not reported...
+        counter = {label: count for label, count in self.counter.items() if count}
+        return sum(counter.values()), counter
+
+
+def get_soft_delete_models(model):
+    """
+    Returns soft deletable models which can be reached from `model` via
+    deletion cascade, `model` included. Order follows the relation graph.
+    """
+
+    found_models = []
+    candidates = [model]
+    while candidates:
+        candidate = candidates.pop(0)
+        if candidate in found_models:
+            continue
+        found_models.append(candidate)
+        candidates.extend(parent for parent in candidate._meta.parents)
+        for related in get_candidate_relations_to_delete(candidate._meta):
+            if related.field.remote_field.on_delete is not models.DO_NOTHING:
+                candidates.append(related.related_model)
+    return [found_model for found_model in found_models if issubclass(found_model, BaseModelWithSoftDelete)]
+
+
+class SoftDeleteCollector(Collector):
+    """
+    Collects objects like Django's `Collector` but marks them as deleted
+    (or recovers them) instead of deleting rows.
+
+    Whole cascade graph is collected once, then each model is updated with
+    a single `UPDATE ... WHERE pk IN (...)` per batch inside one transaction.
+    Related querysets which can be fast deleted are updated directly in the
+    database without fetching objects into memory. Counters are built from
+    the rowcounts returned by `UPDATE` and `DELETE`, no extra `COUNT` queries
+    are made.
+
+        collector = SoftDeleteCollector(using='default')
+        collector.collect(Category.objects.filter(pk__in=[1, 2, 3]))
+        collector.soft_delete()                 # (total, {label: count})
+
+    Every row touched by one soft delete operation is stamped with the same
+    `deleted_batch` identifier. Rows which are already deleted are left
+    untouched, they keep their own batch. Recovering a batch doesn't need a
+    collection pass:
+
+        collector = SoftDeleteCollector(using='default')
+        collector.restore(Category, deleted_batch)
+
+    When `batch_size` is given, operation runs in chunked mode: every batch
+    is committed in its own transaction. Rows which are already in the
+    required state are skipped, an interrupted operation can be resumed by
+    running it again with the same `deleted_batch`, so the whole cascade
+    can be restored as one batch.
+
+    Per object signals (`pre_delete`, `post_delete`, `pre_undelete` and
+    `post_undelete`) are sent only if they have receivers for the model.
+    Bulk signals (`pre_bulk_delete`, `post_bulk_delete`, `pre_bulk_undelete`
+    and `post_bulk_undelete`) are sent once per model per batch with
+    `instances` and `pk_list` arguments. Set `soft_delete_bulk_signals_only`
+    on your model to receive bulk signals only. `pre_delete` and
+    `post_delete` are sent with `soft_delete=True` so receivers can tell
+    them from hard deletes.
+
+    """
+
+    undelete_signals = (pre_undelete, post_undelete, pre_bulk_undelete, post_bulk_undelete)
+    bulk_signals = (pre_bulk_delete, post_bulk_delete, pre_bulk_undelete, post_bulk_undelete)
+
+    def can_fast_delete(self, objs, from_field=None):
+        if hasattr(objs, '_meta'):
+            model = type(objs)
+        elif hasattr(objs, 'model'):
+            model = objs.model
+        else:
+            return False
+        if any(signal.has_listeners(model) for signal in self.undelete_signals + self.bulk_signals):
+            return False
+        return super().can_fast_delete(objs, from_field=from_field)
+
+    @staticmethod
+    def pending(queryset, undelete=False, deleted_batch=None):
+        """
+        Filters rows of `queryset` which still need to be processed.
+        """
+
+        if undelete:
+            return queryset.filter(deleted_batch=deleted_batch).exclude(status=BaseModel.STATUS_ONLINE)
+        return queryset.exclude(status=BaseModel.STATUS_DELETED)
+
+    def soft_delete(self, undelete=False, batch_size=None, progress=None, deleted_batch=None, saved_instances=None):
+        """
+        Marks collected objects as deleted with `deleted_batch` (a new one is
+        generated if not given). For `undelete`, only rows which are stamped
+        with `deleted_batch` are recovered. Rows of `saved_instances` are
+        already written by `save()`, only signals are sent for them.
+        """
+
+        chunked = batch_size is not None
+        batch_size = batch_size or SOFT_DELETE_BATCH_SIZE
+        progress = progress or SoftDeleteProgress()
+
+        required_pre_signal = models.signals.pre_delete
+        required_post_signal = models.signals.post_delete
+        required_pre_bulk_signal = pre_bulk_delete
+        required_post_bulk_signal = post_bulk_delete
+        required_values = dict(
+            status=BaseModel.STATUS_DELETED, deleted_at=timezone.now(), deleted_batch=deleted_batch or uuid.uuid4()
+        )
+        signal_kwargs = dict(using=self.using, soft_delete=True)
+        change_action = ChangeRecord.ACTION_DELETE
+        progress.deleted_batch = required_values['deleted_batch']
+
+        if undelete:
+            required_pre_signal = pre_undelete
+            required_post_signal = post_undelete
+            required_pre_bulk_signal = pre_bulk_undelete
+            required_post_bulk_signal = post_bulk_undelete
+            required_values = dict(status=BaseModel.STATUS_ONLINE, deleted_at=None, deleted_batch=None)
+            signal_kwargs = dict(using=self.using)
+            change_action = ChangeRecord.ACTION_UNDELETE
+            progress.deleted_batch = None
+
+        for model, instances in self.data.items():
+            self.data[model] = sorted(instances, key=attrgetter('pk'))
+        saved = {(obj.__class__, obj.pk) for obj in saved_instances or []}
+        versions = {}
+
+        outer_transaction = nullcontext() if chunked else transaction.atomic(using=self.using, savepoint=False)
+        with outer_transaction:
+
+            # pre signal...
+            for model, instances in self.data.items():
+                if self._sends_instance_signal(model, required_pre_signal):
+                    for obj in instances:
+                        required_pre_signal.send(sender=model, instance=obj, **signal_kwargs)
+
+            # fast deletes-ish
+            for queryset in self.fast_deletes:
+                is_soft_deletable = issubclass(queryset.model, BaseModelWithSoftDelete)
+                if undelete and not is_soft_deletable:
+                    # nothing to recover, rows are already gone...
+                    continue
+                if is_soft_deletable:
+                    queryset = self.pending(queryset, undelete=undelete, deleted_batch=deleted_batch)
+
+                for batch_queryset, last_pk in self._batches(queryset, batch_size, chunked):
+                    with self._batch_transaction(chunked):
+                        if is_soft_deletable:
+                            # this happens in database layer...
+                            # try to mark as deleted if the model is inherited from
+                            # BaseModelWithSoftDelete
+                            count = update_with_status_counts(
+                                batch_queryset, self._required_values(queryset.model, required_values)
+                            )
+                        else:
+                            # well, just delete it...
+                            count = raw_delete_with_status_counts(batch_queryset, self.using)
+                    progress.add(queryset.model._meta.label, count, last_pk)
+                objects_changed(queryset.model, self.using)
+
+            for model, instances in self.data.items():
+                pk_list = [obj.pk for obj in instances]
+                sends_bulk_signals = not model._meta.auto_created
+                for start in range(0, len(pk_list), batch_size):
+                    end = start + batch_size
+                    batch = pk_list[start:end]
+                    batch_instances = instances[start:end]
+
+                    if sends_bulk_signals:
+                        required_pre_bulk_signal.send(
+                            sender=model, instances=batch_instances, pk_list=batch, using=self.using
+                        )
+                    with self._batch_transaction(chunked):
+                        if issubclass(model, BaseModelWithSoftDelete):
+                            update_instances = [obj for obj in batch_instances if (model, obj.pk) not in saved]
+                            count = 0
+                            if update_instances:
+                                count = self._update_instances(
+                                    model, update_instances, required_values, undelete, deleted_batch, versions
+                                )
+                            record_changes(model, change_action, batch, self.using)
+                        else:
+                            count = len(batch)
+                    if sends_bulk_signals:
+                        required_post_bulk_signal.send(
+                            sender=model, instances=batch_instances, pk_list=batch, using=self.using
+                        )
+                    progress.add(model._meta.label, count, batch[-1])
+
+                if self._sends_instance_signal(model, required_post_signal):
+                    for obj in instances:
+                        required_post_signal.send(sender=model, instance=obj, **signal_kwargs)
+                objects_changed(model, self.using, pk_list)
+
+        # update collected instances
+        for model, instances in self.data.items():
+            if issubclass(model, BaseModelWithSoftDelete):
+                for obj in instances:
+                    if (model, obj.pk) in saved:
+                        continue
+                    for field_name, value in required_values.items():
+                        setattr(obj, field_name, value)
+                    obj._loaded_status = obj.status
+                    if (model, obj.pk) in versions:
+                        setattr(obj, VERSION_FIELD_NAME, versions[(model, obj.pk)])
+
+        return progress.result()
+
+    def restore(self, model, deleted_batch, batch_size=None, progress=None):
+        """
+        Recovers every row stamped with `deleted_batch` without a collection
+        pass. Runs a single `UPDATE ... WHERE deleted_batch = X` per table
+        which can be reached from `model`. Rows of models which have undelete
+        receivers are fetched and recovered via `soft_delete()` so signals
+        keep working. A chunked restore is resumed by calling it again, a
+        soft delete which is resumed with its `deleted_batch` is restored as
+        a whole.
+        """
+
+        chunked = batch_size is not None
+        progress = progress or SoftDeleteProgress()
+        required_values = dict(status=BaseModel.STATUS_ONLINE, deleted_at=None, deleted_batch=None)
+
+        outer_transaction = nullcontext() if chunked else transaction.atomic(using=self.using, savepoint=False)
+        with outer_transaction:
+            for related_model in get_soft_delete_models(model):
+                queryset = related_model._base_manager.using(self.using).filter(deleted_batch=deleted_batch)
+                if (
+                    uses_object_cache(related_model)
+                    or uses_change_feed(related_model)
+                    or any(signal.has_listeners(related_model) for signal in self.undelete_signals)
+                ):
+                    # receivers, cache invalidation and change records need instances...
+                    self.add(list(queryset))
+                    continue
+
+                for batch_queryset, last_pk in self._batches(queryset, batch_size or SOFT_DELETE_BATCH_SIZE, chunked):
+                    with self._batch_transaction(chunked):
+                        count = update_with_status_counts(
+                            batch_queryset, self._required_values(related_model, required_values)
+                        )
+                    progress.add(related_model._meta.label, count, last_pk)
+                objects_changed(related_model, self.using)
+
+            if self.data:
+                self.soft_delete(undelete=True, batch_size=batch_size, progress=progress, deleted_batch=deleted_batch)
+
+        return progress.result()
+
+    def _required_values(self, model, required_values):
+        if uses_versioning(model):
+            return dict(required_values, **{VERSION_FIELD_NAME: version_increment()})
+        return required_values
+
+    def _update_instances(self, model, instances, required_values, undelete, deleted_batch, versions):
+        """
+        Updates pending rows of `instances`. Rows of versioned models are
+        updated only if they still have the versions of `instances`, raises
+        `VersionConflict` for rows which are changed by someone else.
+        """
+
+        base_queryset = model._base_manager.using(self.using).filter(pk__in=[obj.pk for obj in instances])
+        queryset = self.pending(base_queryset, undelete=undelete, deleted_batch=deleted_batch)
+        if not uses_versioning(model):
+            return update_with_status_counts(queryset, required_values)
+
+        count = update_with_status_counts(
+            queryset.filter(get_versions_filter(instances)), self._required_values(model, required_values)
+        )
+        stale = self.pending(base_queryset, undelete=undelete, deleted_batch=deleted_batch)
+        stale = list(stale.values_list('pk', flat=True))
+        if stale:
+            raise VersionConflict(model, stale)
+        for pk, version in base_queryset.values_list('pk', VERSION_FIELD_NAME):
+            versions[(model, pk)] = version
+        return count
+
+    def _sends_instance_signal(self, model, signal):
+        if model._meta.auto_created or getattr(model, 'soft_delete_bulk_signals_only', False):
+            return False
+        return signal.has_listeners(model)
+
+    def _batch_transaction(self, chunked):
+        if chunked:
+            return transaction.atomic(using=self.using)
+        return nullcontext()
+
+    def _batches(self, queryset, batch_size, chunked):
+        if not chunked:
+            yield queryset, None
+            return
+
+        # rows leave the queryset once they are processed, so always take
+        # the first batch...
+        while True:
+            pk_list = list(queryset.order_by('pk').values_list('pk', flat=True)[:batch_size])
+            if not pk_list:
+                return
+            yield queryset.model._base_manager.using(self.using).filter(pk__in=pk_list), pk_list[-1]
+
+
 class BaseModelQuerySet(models.QuerySet):
     """
     Common QuerySet for BaseModel and BaseModelWithSoftDelete.
@@ -28,6 +438,10 @@ class BaseModelQuerySet(models.QuerySet):
     - `.offlines()`: filters `status` is `STATUS_OFFLINE`
     - `.drafts()`  : filters `status` is `STATUS_DRAFT`
 
+    `.bulk_create()`, `.bulk_update()` and `.bulk_upsert()` stamp
+    `created_at` / `updated_at` and work in batches. `.seek()` is keyset
+    pagination. `.cached()` returns results from the queryset cache.
+
     """
 
     def actives(self):
@@ -42,6 +456,132 @@ class BaseModelQuerySet(models.QuerySet):
     def drafts(self):
         return self.filter(status=self.model.STATUS_DRAFT)
 
+    def bulk_create(self, objs, batch_size=None, ignore_conflicts=False):
+        """
+        Django's `bulk_create()`, inserts `BULK_BATCH_SIZE` rows per query
+        by default and keeps status counters.
+        """
+
+        with transaction.atomic(using=self.db, savepoint=False):
+            objs = super().bulk_create(
+                objs, batch_size=batch_size or BULK_BATCH_SIZE, ignore_conflicts=ignore_conflicts
+            )
+            if uses_status_counters(self.model) and not ignore_conflicts:
+                change_status_counts(self.model, Counter(obj.status for obj in objs), self.db)
+            if uses_change_feed(self.model):
+                # pks are not returned by every backend...
+                pk_list = [obj.pk for obj in objs]
+                record_changes(self.model, ChangeRecord.ACTION_SAVE, None if None in pk_list else pk_list, self.db)
+            objects_changed(self.model, self.db)
+        return objs
+
+    def update(self, **kwargs):
+        if uses_versioning(self.model) and VERSION_FIELD_NAME not in kwargs:
+            kwargs[VERSION_FIELD_NAME] = version_increment()
+        if uses_change_feed(self.model) or uses_object_cache(self.model):
+            return self._update_by_pk(kwargs)
+        count = super().update(**kwargs)
+        objects_changed(self.model, self.db)
+        return count
+
+    def _update_by_pk(self, values):
+        # rows are updated by pk, every updated row gets its change record
+        # and a new cache generation...
+        assert self.query.can_filter(), 'Cannot update a query once a slice has been taken.'
+        count = 0
+        with transaction.atomic(using=self.db, savepoint=False):
+            pk_list = list(self.order_by().values_list('pk', flat=True))
+            for batch in batches(pk_list, BULK_BATCH_SIZE):
+                queryset = models.QuerySet(model=self.model, using=self.db).filter(pk__in=batch)
+                count += queryset.update(**values)
+            if uses_change_feed(self.model):
+                record_changes(self.model, ChangeRecord.ACTION_SAVE, pk_list, self.db)
+            objects_changed(self.model, self.db, pk_list)
+        return count
+
+    def bulk_update(self, objs, fields, batch_size=None):
+        """
+        Updates `fields` of `objs` in batches, `updated_at` is set to the
+        same timestamp for all rows. Returns number of updated rows:
+
+            Post.objects.bulk_update(posts, ['title', 'status'])
+            # 2500
+
+        """
+
+        return bulk_update_rows(self, objs, fields, batch_size=batch_size)
+
+    def bulk_upsert(self, objs, unique_fields, update_fields=None, batch_size=None):
+        """
+        Inserts new objects, updates `update_fields` (defaults to all fields
+        except `unique_fields` and `created_at`) of rows which have the same
+        `unique_fields` values. `status`, `deleted_at` and `deleted_batch`
+        of soft delete models are updated only when they are named, soft
+        deleted rows stay deleted. Versions of updated rows are
+        incremented. Returns `(created, updated)`:
+
+            Product.objects.bulk_upsert(products, unique_fields=['sku'])
+            # (120, 9880)
+
+        See `bulk_upsert_rows()`.
+        """
+
+        return bulk_upsert_rows(self, objs, unique_fields, update_fields=update_fields, batch_size=batch_size)
+
+    def seek(self, after=None, size=SEEK_PAGE_SIZE, descending=False):
+        """
+        Keyset pagination ordered by `(created_at, pk)`. `after` is the
+        signed cursor of the previous page, raises `InvalidCursor` for
+        tampered cursors:
+
+            page = Post.objects.actives().seek(size=20)
+            page.object_list, page.next_cursor
+            page = Post.objects.actives().seek(after=page.next_cursor, size=20)
+
+        """
+
+        return seek_page(self, after=after, size=size, descending=descending)
+
+    def cached(self, timeout=QUERYSET_CACHE_TIMEOUT):
+        """
+        Returns results as a list, cached for `timeout` seconds by the SQL
+        and params of the query. Every model of the query must have
+        `queryset_cache`, their writes make cached results stale:
+
+            Category.objects.actives().cached(timeout=300)
+
+        See `cached_queryset()`.
+        """
+
+        return cached_queryset(self, timeout=timeout)
+
+    def status_counts(self):
+        """
+        Returns `{status: count}` for every status. Models which have
+        `status_counters` read unfiltered counts from the counter table
+        instead of running `COUNT(*)`:
+
+            Post.objects.status_counts()
+            # {0: 12, 1: 20311, 2: 1200, 3: 4}
+
+        """
+
+        counts = dict.fromkeys([status for status, __ in self.model.STATUS_CHOICES], 0)
+        if self.query.has_filters():
+            counts.update(count_by_status(self))
+            return counts
+
+        if uses_status_counters(self.model):
+            counts.update(get_status_counts(self.model, self.db))
+            return counts
+
+        counts.update(count_by_status(self))
+        archive_model = get_archive_model(self.model)
+        if archive_model is not None:
+            for status, count in count_by_status(archive_model._base_manager.using(self.db)).items():
+                counts[status] += count
+        return counts
+
 
 class BaseModelWithSoftDeleteQuerySet(BaseModelQuerySet):
     """
@@ -55,31 +595,344 @@ class BaseModelWithSoftDeleteQuerySet(BaseModelQuerySet):
     - `.delete()`     : soft deletes given objects.
     - `.undelete()`   : recovers given soft deleted object. fixes status and deleted_at values.
     - `.hard_delete()`: real delete method. no turning back!
+    - `.purge_deleted()`: hard deletes old soft deleted objects.
+    - `.archive_deleted()`: moves old soft deleted objects into archive tables.
+
+    When archive is enabled for the model, `.archived()` returns rows of
+    the archive table and `.restore_archived()` moves them back into the
+    live table. `.deleted()` reads the live table only.
+
+    `.delete()` and `.undelete()` accept `batch_size` and `progress` for
+    chunked mode. See `SoftDeleteCollector` and `SoftDeleteProgress`.
+
+    `.undelete()` recovers whole deletion batches without a collection pass
+    when all of the batch's rows of this model are selected. Otherwise it
+    collects related objects and recovers the ones which were deleted
+    together with the selected rows.
 
     """
 
     def all(self):  # noqa: A003
         return self.filter(deleted_at__isnull=True).exclude(status=self.model.STATUS_DELETED)
 
-    def delete(self):
-        return self._delete_or_undelete()
+    def archived(self):
+        """
+        Returns a queryset of the archive model, rows which are moved out of
+        the live table by `archive_deleted()`:
+
+            Post.objects.archived().filter(deleted_at__lt=start)
+
+        """
+
+        archive_model = get_archive_model(self.model)
+        if archive_model is None:
+            raise ValueError('%s has no archive, set soft_delete_archive_after' % self.model._meta.label)
+        return archive_model._base_manager.using(self.db).all()
+
+    def restore_archived(self, pk_list, batch_size=None, progress=None):
+        """
+        Moves archived rows of `pk_list` back into the live tables with their
+        deletion batches and undeletes them:
+
+            Post.objects.restore_archived(Post.objects.archived().values_list('pk', flat=True))
+
+        """
+
+        pk_list = list(pk_list)
+        self._unarchive(pk_list=pk_list)
+        queryset = self.model._default_manager.db_manager(self.db).deleted().filter(pk__in=pk_list)
+        return queryset.undelete(batch_size=batch_size, progress=progress)
+
+    def delete(self, batch_size=None, progress=None, deleted_batch=None):
+        return self._delete_or_undelete(batch_size=batch_size, progress=progress, deleted_batch=deleted_batch)
+
+    def undelete(self, batch_size=None, progress=None):
+        return self._delete_or_undelete(undelete=True, batch_size=batch_size, progress=progress)
+
+    def hard_delete(self, batch_size=None, progress=None):
+        """
+        Deletes rows for real. With `batch_size`, rows are deleted in batches
+        ordered by pk, each batch and its cascade in its own transaction,
+        `progress` is called after every batch (see `SoftDeleteProgress`):
+
+            Post.objects.filter(category=category).hard_delete(batch_size=1000)
+            # (2400, {'blog.Post': 2000, 'blog.Comment': 400})
+
+        """
+
+        if batch_size is None:
+            return super().delete()
+
+        assert self.query.can_filter(), "Cannot use 'limit' or 'offset' with delete."
+        progress = SoftDeleteProgress(callback=progress)
+        candidates = self.order_by('pk').values_list('pk', flat=True)
+
+        last_pk = None
+        while True:
+            batch_candidates = candidates if last_pk is None else candidates.filter(pk__gt=last_pk)
+            pk_list = list(batch_candidates[:batch_size])
+            if not pk_list:
+                break
+            last_pk = pk_list[-1]
+
+            with transaction.atomic(using=self.db):
+                __, counter = self.model._base_manager.using(self.db).filter(pk__in=pk_list).delete()
+            for label, count in counter.items():
+                progress.add(label, count, last_pk)
+
+            if len(pk_list) < batch_size:
+                break
+        return progress.result()
+
+    def _delete_or_undelete(
+        self, undelete=False, batch_size=None, progress=None, keep_parents=False, deleted_batch=None
+    ):
+        assert self.query.can_filter(), "Cannot use 'limit' or 'offset' with delete/undelete."
+
+        progress = SoftDeleteProgress(callback=progress)
+
+        if not undelete:
+            # a resumed delete passes the batch of the interrupted one...
+            self._soft_delete(
+                deleted_batch=deleted_batch or uuid.uuid4(),
+                batch_size=batch_size,
+                progress=progress,
+                keep_parents=keep_parents,
+            )
+            return progress.result()
+
+        deleted_batches = list(self.order_by().values_list('deleted_batch', flat=True).distinct())
+        for deleted_batch in deleted_batches:
+            queryset = self.filter(deleted_batch=deleted_batch)
+            base_queryset = self.model._base_manager.using(self.db)
+            if (
+                deleted_batch is not None
+                and not base_queryset.filter(deleted_batch=deleted_batch)
+                .exclude(pk__in=queryset.values('pk'))
+                .exists()
+            ):
+                collector = SoftDeleteCollector(using=self.db)
+                collector.restore(self.model, deleted_batch, batch_size=batch_size, progress=progress)
+            else:
+                queryset._soft_delete(
+                    undelete=True,
+                    deleted_batch=deleted_batch,
+                    batch_size=batch_size,
+                    progress=progress,
+                    keep_parents=keep_parents,
+                )
+        return progress.result()
+
+    def _soft_delete(self, undelete=False, deleted_batch=None, batch_size=None, progress=None, keep_parents=False):
+        pending = SoftDeleteCollector.pending(self, undelete=undelete, deleted_batch=deleted_batch)
+
+        if batch_size is None:
+            collector = SoftDeleteCollector(using=self.db)
+            collector.collect(pending, keep_parents=keep_parents)
+            collector.soft_delete(undelete=undelete, progress=progress, deleted_batch=deleted_batch)
+            return
+
+        pending = pending.order_by('pk').values_list('pk', flat=True)
+        while True:
+            pk_list = list(pending[:batch_size])
+            if not pk_list:
+                break
+            collector = SoftDeleteCollector(using=self.db)
+            collector.collect(
+                self.model._base_manager.using(self.db).filter(pk__in=pk_list), keep_parents=keep_parents
+            )
+            collector.soft_delete(
+                undelete=undelete, batch_size=batch_size, progress=progress, deleted_batch=deleted_batch
+            )
+
+    def deletion_batches(self):
+        """
+        Lists soft delete operations of this model, most recent first:
+
+            Category.objects.deletion_batches()
+            # [{'deleted_batch': UUID('...'), 'deleted_at': datetime(...), 'count': 3}, ...]
+        """
+
+        return (
+            self.exclude(deleted_batch=None)
+            .order_by()
+            .values('deleted_batch')
+            .annotate(deleted_at=models.Max('deleted_at'), count=models.Count('pk'))
+            .order_by('-deleted_at')
+        )
 
-    def undelete(self):
-        return self._delete_or_undelete(undelete=True)
+    def restore_deletion_batch(self, deleted_batch, batch_size=None, progress=None):
+        """
+        Recovers all rows which were soft deleted by the same operation.
+        """
 
-    def hard_delete(self):
-        return super().delete()
+        self._unarchive(deleted_batch=deleted_batch)
+        collector = SoftDeleteCollector(using=self.db)
+        return collector.restore(
+            self.model, deleted_batch, batch_size=batch_size, progress=SoftDeleteProgress(callback=progress)
+        )
 
-    def _delete_or_undelete(self, undelete=False):
-        processed_instances = {}
-        call_method = 'undelete' if undelete else 'delete'
+    def archive_deleted(self, older_than=None, batch_size=SOFT_DELETE_BATCH_SIZE, sleep=0, progress=None):
+        """
+        Moves rows which are soft deleted before `older_than` (defaults to
+        model's `soft_delete_archive_after`) into `<table>_archive` tables.
+
+        Rows are moved per deletion batch, with all of the related rows of
+        the same batch, oldest batch first, `batch_size` rows per statement.
+        Batches which are still referenced by live rows are skipped. Rows
+        deleted without a deletion batch are not archived.
+
+            Category.objects.archive_deleted(older_than=timedelta(days=30))
+            # (1200, {'blog.Category': 1, 'blog.Post': 1199})
+
+        """
+
+        older_than = older_than or self.model.soft_delete_archive_after
+        if older_than is None:
+            raise ValueError('%s has no soft_delete_archive_after, please pass older_than' % self.model._meta.label)
+
+        archive_models = [(model, get_archive_model(model)) for model in get_soft_delete_models(self.model)]
+        not_archived = [model._meta.label for model, archive_model in archive_models if archive_model is None]
+        if not_archived:
+            raise ImproperlyConfigured(
+                'Archive is not enabled for related models of %s: %s'
+                % (self.model._meta.label, ', '.join(not_archived))
+            )
+
+        progress = SoftDeleteProgress(callback=progress)
+        deleted_batches = (
+            self.filter(status=self.model.STATUS_DELETED, deleted_at__lt=timezone.now() - older_than)
+            .exclude(deleted_batch=None)
+            .order_by()
+            .values('deleted_batch')
+            .annotate(last_deleted_at=models.Max('deleted_at'))
+            .order_by('last_deleted_at')
+            .values_list('deleted_batch', flat=True)
+        )
+
+        for deleted_batch in list(deleted_batches):
+            if self._has_live_references(deleted_batch):
+                logger.warning('Deletion batch %s is still referenced, not archived', deleted_batch)
+                continue
+
+            # children first, parent rows can not leave before them...
+            for model, archive_model in reversed(archive_models):
+                queryset = model._base_manager.using(self.db).filter(deleted_batch=deleted_batch)
+                while True:
+                    pk_list = list(queryset.order_by('pk').values_list('pk', flat=True)[:batch_size])
+                    if not pk_list:
+                        break
+                    with transaction.atomic(using=self.db):
+                        count = move_rows(queryset.filter(pk__in=pk_list), archive_model, self.db)
+                        objects_changed(model, self.db)
+                    progress.add(model._meta.label, count, pk_list[-1])
+                    if sleep:
+                        time.sleep(sleep)
+        return progress.result()
+
+    def _has_live_references(self, deleted_batch):
+        for model in get_soft_delete_models(self.model):
+            batch_pks = model._base_manager.using(self.db).filter(deleted_batch=deleted_batch).values('pk')
+            for related in get_candidate_relations_to_delete(model._meta):
+                related_model = related.related_model
+                queryset = related_model._base_manager.using(self.db).filter(
+                    **{'%s__in' % related.field.name: batch_pks}
+                )
+                if issubclass(related_model, BaseModelWithSoftDelete):
+                    queryset = queryset.exclude(deleted_batch=deleted_batch)
+                if queryset.exists():
+                    return True
+        return False
+
+    def _unarchive(self, pk_list=None, deleted_batch=None):
+        """
+        Moves archived rows back into the live tables. Rows of given pks (of
+        this model) are moved with their deletion batches.
+        """
+
+        archive_model = get_archive_model(self.model)
+        if archive_model is None:
+            return
+
+        deleted_batches = [deleted_batch]
+        if pk_list is not None:
+            archived_queryset = archive_model._base_manager.using(self.db).filter(pk__in=pk_list)
+            deleted_batches = set(archived_queryset.values_list('deleted_batch', flat=True))
+            if None in deleted_batches:
+                with transaction.atomic(using=self.db):
+                    move_rows(archived_queryset.filter(deleted_batch=None), self.model, self.db)
+                    objects_changed(self.model, self.db)
+                deleted_batches.discard(None)
+
+        # parents first...
+        for model in get_soft_delete_models(self.model):
+            model_archive = get_archive_model(model)
+            if model_archive is None:
+                continue
+            for batch in deleted_batches:
+                with transaction.atomic(using=self.db):
+                    move_rows(model_archive._base_manager.using(self.db).filter(deleted_batch=batch), model, self.db)
+                    objects_changed(model, self.db)
+
+    def purge_deleted(self, older_than=None, batch_size=SOFT_DELETE_BATCH_SIZE, sleep=0, dry_run=False, progress=None):
+        """
+        Hard deletes rows which are soft deleted before `older_than`
+        (`datetime.timedelta`, defaults to model's `soft_delete_retention`).
+
+        Rows are processed in batches ordered by pk, related objects are
+        deleted by Django's deletion cascade. `sleep` seconds are waited
+        between batches. With `dry_run`, nothing is deleted but the return
+        value still tells how many rows would be deleted:
+
+            Post.objects.purge_deleted(older_than=timedelta(days=30), dry_run=True)
+            # (1200, {'blog.Post': 1000, 'blog.Comment': 200})
+
+        """
+
+        older_than = older_than or self.model.soft_delete_retention
+        if older_than is None:
+            raise ValueError('%s has no soft_delete_retention, please pass older_than' % self.model._meta.label)
+
+        progress = SoftDeleteProgress(callback=progress)
+        candidates = (
+            self.filter(status=self.model.STATUS_DELETED)
+            .filter(deleted_at__lt=timezone.now() - older_than)
+            .order_by('pk')
+            .values_list('pk', flat=True)
+        )
 
-        for model_instance in self:
-            _count, model_information = getattr(model_instance, call_method)()
-            for (app_label, row_amount) in model_information.items():
-                processed_instances.setdefault(app_label, 0)
-                processed_instances[app_label] = processed_instances[app_label] + row_amount
-        return (sum(processed_instances.values()), processed_instances)
+        last_pk = None
+        while True:
+            batch_candidates = candidates if last_pk is None else candidates.filter(pk__gt=last_pk)
+            pk_list = list(batch_candidates[:batch_size])
+            if not pk_list:
+                break
+            last_pk = pk_list[-1]
+
+            queryset = self.model._base_manager.using(self.db).filter(pk__in=pk_list)
+            if dry_run:
+                counter = self._collect_purge_counts(queryset)
+            else:
+                __, counter = queryset.delete()
+            for label, count in counter.items():
+                progress.add(label, count, last_pk)
+
+            if len(pk_list) < batch_size:
+                break
+            if sleep:
+                time.sleep(sleep)
+        return progress.result()
+
+    def _collect_purge_counts(self, queryset):
+        collector = Collector(using=self.db)
+        collector.collect(queryset)
+
+        counter = Counter()
+        for fast_delete_queryset in collector.fast_deletes:
+            counter[fast_delete_queryset.model._meta.label] += fast_delete_queryset.count()
+        for model, instances in collector.data.items():
+            counter[model._meta.label] += len(instances)
+        return counter
 
 
 class BaseModelManager(models.Manager):
@@ -98,26 +951,137 @@ class BaseModelManager(models.Manager):
     def drafts(self):
         return self.get_queryset().drafts()
 
+    def bulk_upsert(self, objs, unique_fields, update_fields=None, batch_size=None):
+        return self.get_queryset().bulk_upsert(objs, unique_fields, update_fields=update_fields, batch_size=batch_size)
+
+    def seek(self, after=None, size=SEEK_PAGE_SIZE, descending=False):
+        return self.get_queryset().seek(after=after, size=size, descending=descending)
+
+    def status_counts(self):
+        return self.get_queryset().status_counts()
+
+    def cached_get(self, pk):
+        """
+        `get(pk=pk)` through Django's cache, for models which have
+        `object_cache`. Cached objects are removed by `save()`, soft delete,
+        undelete, hard delete and `bulk_update()`:
+
+            Post.objects.cached_get(pk=1)
+
+        """
+
+        self._check_object_cache()
+        return cached_get(self.get_queryset(), pk)
+
+    def cached_get_many(self, pk_list):
+        """
+        `in_bulk(pk_list)` through Django's cache, one `get_many()` for the
+        hits and one query for the misses:
+
+            Post.objects.cached_get_many([1, 2, 3])
+            # {1: <Post: 1>, 2: <Post: 2>, 3: <Post: 3>}
+
+        """
+
+        self._check_object_cache()
+        return cached_get_many(self.get_queryset(), pk_list)
+
+    def snapshot(self):
+        """
+        Returns the process-local `Snapshot` of active rows, for models
+        which have `snapshot`. Reloaded when the model is changed:
+
+            Category.objects.snapshot().get(slug='python')
+
+        """
+
+        if not getattr(self.model, 'snapshot', False):
+            raise ImproperlyConfigured('%s has no snapshot' % self.model._meta.label)
+        return snapshots.get(self.model, using=self._db)
+
+    def _check_object_cache(self):
+        if not uses_object_cache(self.model):
+            raise ImproperlyConfigured('%s has no object_cache' % self.model._meta.label)
+
 
 class BaseModelWithSoftDeleteManager(BaseModelManager):
     """
     This is a manager for `BaseModelWithSoftDelete` instances.
+
+    Related managers (`category.posts`, `member.members`) and
+    `prefetch_related()` (also `Prefetch` querysets) return live rows only.
+    Use `include_deleted_relations()` to get soft deleted rows too. Writes
+    of related managers (`set()`, `clear()`, `remove()`) see every row.
+    Methods which work on deleted rows (`deleted()`, `undelete()`,
+    `hard_delete()` ...) always see them.
     """
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Django's related managers are subclasses of the default manager...
+        if 'get_prefetch_queryset' in cls.__dict__:
+            cls.get_prefetch_queryset = live_prefetch_queryset(cls.get_prefetch_queryset)
+        for name in ('set', 'clear', 'remove'):
+            if name in cls.__dict__:
+                setattr(cls, name, with_deleted_relations(cls.__dict__[name]))
+
     def get_queryset(self):
-        return BaseModelWithSoftDeleteQuerySet(self.model, using=self._db)
+        queryset = BaseModelWithSoftDeleteQuerySet(self.model, using=self._db)
+        if self.is_related_manager() and filters_deleted_relations():
+            return queryset.all()
+        return queryset
+
+    def get_queryset_with_deleted(self):
+        with include_deleted_relations():
+            return self.get_queryset()
+
+    def is_related_manager(self):
+        return getattr(self, 'instance', None) is not None
 
     def all(self):  # noqa: A003
+        if self.is_related_manager():
+            # already filtered, keeps prefetched objects...
+            return self.get_queryset()
         return self.get_queryset().all()
 
-    def delete(self):
-        return self.get_queryset().delete()
+    def deleted(self):
+        return self.get_queryset_with_deleted().deleted()
+
+    def delete(self, batch_size=None, progress=None, deleted_batch=None):
+        return self.get_queryset().delete(batch_size=batch_size, progress=progress, deleted_batch=deleted_batch)
+
+    def undelete(self, batch_size=None, progress=None):
+        return self.get_queryset_with_deleted().undelete(batch_size=batch_size, progress=progress)
+
+    def hard_delete(self, batch_size=None, progress=None):
+        return self.get_queryset_with_deleted().hard_delete(batch_size=batch_size, progress=progress)
 
-    def undelete(self):
-        return self.get_queryset().undelete()
+    def deletion_batches(self):
+        return self.get_queryset_with_deleted().deletion_batches()
 
-    def hard_delete(self):
-        return self.get_queryset().hard_delete()
+    def archived(self):
+        return self.get_queryset_with_deleted().archived()
+
+    def restore_archived(self, pk_list, batch_size=None, progress=None):
+        return self.get_queryset_with_deleted().restore_archived(pk_list, batch_size=batch_size, progress=progress)
+
+    def restore_deletion_batch(self, deleted_batch, batch_size=None, progress=None):
+        return self.get_queryset_with_deleted().restore_deletion_batch(
+            deleted_batch, batch_size=batch_size, progress=progress
+        )
+
+    def purge_deleted(self, older_than=None, batch_size=SOFT_DELETE_BATCH_SIZE, sleep=0, dry_run=False, progress=None):
+        return self.get_queryset_with_deleted().purge_deleted(
+            older_than=older_than, batch_size=batch_size, sleep=sleep, dry_run=dry_run, progress=progress
+        )
+
+    def archive_deleted(self, older_than=None, batch_size=SOFT_DELETE_BATCH_SIZE, sleep=0, progress=None):
+        return self.get_queryset_with_deleted().archive_deleted(
+            older_than=older_than, batch_size=batch_size, sleep=sleep, progress=progress
+        )
+
+    def status_counts(self):
+        return self.get_queryset_with_deleted().status_counts()
 
 
 class BaseModel(models.Model):
@@ -141,102 +1105,310 @@ class BaseModel(models.Model):
     updated_at = models.DateTimeField(auto_now=True, verbose_name=_('updated at'))
     status = models.IntegerField(choices=STATUS_CHOICES, default=STATUS_ONLINE, verbose_name=_('status'))
 
-    objects = BaseModelManager()
+    # set True to keep row counts per status in `StatusCounter` table, see
+    # `status_counts()` and `manage.py reconcile_status_counts`
+    status_counters = False
 
-    class Meta:
-        abstract = True
+    # set True to add indexes of status filters (`get_status_indexes()`) to
+    # model's `Meta.indexes`, run `makemigrations` after enabling
+    status_indexes = False
 
+    # set True to enable `objects.cached_get()` and `cached_get_many()`,
+    # objects are kept in the cache for `object_cache_timeout` seconds
+    object_cache = False
+    object_cache_timeout = OBJECT_CACHE_TIMEOUT
 
-class BaseModelWithSoftDelete(BaseModel):
+    # set True to enable `.cached()` querysets, every write gives the model
+    # a new cache generation
+    queryset_cache = False
 
-    deleted_at = models.DateTimeField(null=True, blank=True, verbose_name=_('deleted at'))
+    # set True to keep active rows in a process-local, read-only snapshot,
+    # see `objects.snapshot()`. Indexed by pk and `snapshot_lookup_fields`
+    # (defaults to `slug` if the model has it)
+    snapshot = False
+    snapshot_lookup_fields = None
 
-    objects = BaseModelWithSoftDeleteManager()
+    # set True to publish `(model, pk)` events of writes to the invalidation
+    # bus, see `baseapp.utils.invalidation`
+    publish_invalidations = False
+
+    # set True to add a `version` column. `save()` and soft delete update
+    # rows only if they have the same version (`UPDATE ... WHERE version =
+    # N`), `VersionConflict` is raised otherwise. See `retry_on_conflict()`
+    optimistic_locking = False
+
+    # set True to replace the integer `id` with a time-ordered UUIDv7 pk,
+    # generated in the process. `seek()` and batches order by pk alone. See
+    # `baseapp.models.identifiers` for migrating existing tables
+    time_ordered_pk = False
+
+    # set True to write a `ChangeRecord` of every saved, deleted and
+    # recovered row in the same transaction, see `read_changes()` and
+    # `manage.py tail_changes`
+    change_feed = False
+
+    objects = BaseModelManager()
 
     class Meta:
         abstract = True
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_status = instance.__dict__.get('status')
+        # values of the row, compared only when the object is saved...
+        instance._loaded_row = (field_names, values)
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using=using, fields=fields)
+        if fields is None or 'status' in fields:
+            self._loaded_status = self.__dict__.get('status')
+        self._set_loaded_values(fields)
+
+    def _get_loaded_values(self):
+        loaded_row = self.__dict__.pop('_loaded_row', None)
+        if loaded_row is not None:
+            self._loaded_values = dict(zip(*loaded_row))
+        return getattr(self, '_loaded_values', None)
+
+    def _get_field_values(self, field_names=None):
+        values = {}
+        for field in self._meta.concrete_fields:
+            if field.attname not in self.__dict__:
+                # deferred...
+                continue
+            if field_names is not None and field.name not in field_names and field.attname not in field_names:
+                continue
+            values[field.attname] = self.__dict__[field.attname]
+        return values
+
+    def get_dirty_fields(self):
+        """
+        Returns names of concrete fields which are changed since the object
+        is loaded or saved, `None` for objects which are not loaded. Values
+        are not copied, `dict` and `list` values (which may be changed in
+        place) are always dirty.
+        """
+
+        loaded_values = self._get_loaded_values()
+        if loaded_values is None:
+            return None
+        dirty_fields = []
+        for field in self._meta.concrete_fields:
+            if field.attname not in self.__dict__:
+                continue
+            value = self.__dict__[field.attname]
+            if (
+                isinstance(value, (dict, list))
+                or field.attname not in loaded_values
+                or loaded_values[field.attname] != value
+            ):
+                dirty_fields.append(field.name)
+        return dirty_fields
+
+    def _get_save_dirty_fields(self, args, kwargs):
+        if args or self._state.adding or kwargs.get('update_fields') is not None or kwargs.get('force_insert'):
+            return None
+        if kwargs.get('using') not in (None, self._state.db):
+            return None
+        dirty_fields = self.get_dirty_fields()
+        if dirty_fields is None or self._meta.pk.name in dirty_fields:
+            # not loaded or a new pk, saved like Django does...
+            return None
+        auto_now_fields = [field.name for field in self._meta.concrete_fields if getattr(field, 'auto_now', False)]
+        return list(dict.fromkeys(dirty_fields + auto_now_fields))
+
     def save(self, *args, **kwargs):  # pylint: disable=W0221
-        if self.status == BaseModel.STATUS_DELETED:
-            self.delete()
-        else:
-            self.deleted_at = None
+        """
+        Plain `save()` of a loaded object updates only the fields which are
+        changed (see `get_dirty_fields()`) and `auto_now` fields. Rows which
+        are deleted meanwhile are inserted again, like Django does:
+
+            post = Post.objects.get(pk=1)
+            post.title = 'Python'
+            post.save()
+            # UPDATE ... SET title, updated_at
+
+        """
+
+        self._dirty_save_fields = self._get_save_dirty_fields(args, kwargs)
+        try:
+            if not uses_change_feed(self.__class__):
+                self._save(*args, **kwargs)
+                return
+
+            using = kwargs.get('using') or router.db_for_write(self.__class__, instance=self)
+            with transaction.atomic(using=using, savepoint=False):
+                self._save(*args, **kwargs)
+                record_changes(self.__class__, ChangeRecord.ACTION_SAVE, [self.pk], self._state.db)
+        finally:
+            self._dirty_save_fields = None
+
+    def _save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            update_fields = self._dirty_save_fields
+        if update_fields is not None and 'status' not in update_fields:
+            super().save(*args, **kwargs)
+            self._set_loaded_values(update_fields)
+            objects_changed(self.__class__, self._state.db, [self.pk])
+            return
+
+        counted = uses_status_counters(self.__class__)
+        previous_status = None
+        if counted and not self._state.adding:
+            previous_status = self._get_previous_status(kwargs.get('using'))
         super().save(*args, **kwargs)
 
-    def hard_delete(self, using=None, keep_parents=False):
-        return super().delete(using=using, keep_parents=keep_parents)
+        if counted:
+            changes = Counter({self.status: 1})
+            if previous_status is not None:
+                changes[previous_status] -= 1
+            change_status_counts(self.__class__, changes, self._state.db)
+        self._loaded_status = self.status
+        self._set_loaded_values(update_fields)
+        objects_changed(self.__class__, self._state.db, [self.pk])
+
+    def _set_loaded_values(self, update_fields=None):
+        loaded_values = self._get_loaded_values()
+        if loaded_values is None or update_fields is None:
+            self._loaded_values = self._get_field_values()
+        else:
+            loaded_values.update(self._get_field_values(update_fields))
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        dirty_save_fields = getattr(self, '_dirty_save_fields', None)
+        if dirty_save_fields is not None:
+            # not `update_fields`, Django inserts the row if the update
+            # doesn't find it...
+            values = [value for value in values if value[0].name in dirty_save_fields]
+        if not uses_versioning(self.__class__):
+            return super()._do_update(base_qs, using, pk_val, values, update_fields, forced_update)
+        field = get_version_field(self.__class__)
+        if field.model._meta.concrete_model is not base_qs.model:
+            # parent table of a versioned child...
+            return super()._do_update(base_qs, using, pk_val, values, update_fields, forced_update)
+
+        version = getattr(self, field.attname)
+        values = [value for value in values if value[0] is not field] + [(field, None, version + 1)]
+        queryset = base_qs.filter(**{field.attname: version})
+        if super()._do_update(queryset, using, pk_val, values, update_fields, forced_update):
+            setattr(self, field.attname, version + 1)
+            return True
+        if base_qs.filter(pk=pk_val).exists():
+            raise VersionConflict(self.__class__, [pk_val])
+        return False
+
+    def _get_previous_status(self, using=None):
+        previous_status = getattr(self, '_loaded_status', None)
+        if previous_status is None:
+            using = using or router.db_for_write(self.__class__, instance=self)
+            queryset = self.__class__._base_manager.using(using).filter(pk=self.pk)
+            previous_status = queryset.values_list('status', flat=True).first()
+            self._loaded_status = previous_status
+        return previous_status
 
-    def delete(self, using=None, keep_parents=False):
-        using = using or router.db_for_write(self.__class__, instance=self)
-        return self._soft_delete(using=using, keep_parents=keep_parents)
 
-    def undelete(self, using=None, keep_parents=False):
-        using = using or router.db_for_write(self.__class__, instance=self)
-        return self._undelete(using=using, keep_parents=keep_parents)
+class BaseModelWithSoftDelete(BaseModel):
 
-    def _collect_related(self, using=None, keep_parents=False):
-        collector = Collector(using=using)
-        collector.collect([self], keep_parents=keep_parents)
-        fast_deletes = []
-        for queryset in collector.fast_deletes:
-            if queryset.count() > 0:
-                fast_deletes.append(queryset)
+    deleted_at = models.DateTimeField(null=True, blank=True, verbose_name=_('deleted at'))
+    deleted_batch = models.UUIDField(
+        null=True, blank=True, editable=False, db_index=True, verbose_name=_('deleted batch')
+    )
 
-        return dict(
-            instances_with_model=collector.instances_with_model(), fast_deletes=fast_deletes, data=collector.data
-        )
+    # set True to receive only bulk soft delete signals for this model
+    soft_delete_bulk_signals_only = False
 
-    def _undelete(self, using=None, keep_parents=False):
-        return self._soft_delete(using=using, keep_parents=keep_parents, undelete=True)
+    # datetime.timedelta, soft deleted rows older than this are removed by
+    # `purge_deleted()` and `manage.py purge_softdeleted`
+    soft_delete_retention = None
 
-    def _soft_delete(self, using=None, keep_parents=False, undelete=False):
-        items = self._collect_related(using=using, keep_parents=keep_parents)
-        deleted_counter = Counter()
+    # datetime.timedelta, enables `<table>_archive` table. soft deleted rows
+    # older than this are moved by `archive_deleted()` and
+    # `manage.py archive_softdeleted`
+    soft_delete_archive_after = None
 
-        required_pre_signal = models.signals.pre_delete
-        required_post_signal = models.signals.post_delete
-        required_status = BaseModel.STATUS_DELETED
-        required_deleted_at = timezone.now()
+    objects = BaseModelWithSoftDeleteManager()
 
-        if undelete:
-            required_pre_signal = pre_undelete
-            required_post_signal = post_undelete
-            required_status = BaseModel.STATUS_ONLINE
-            required_deleted_at = None
+    class Meta:
+        abstract = True
 
-        with transaction.atomic(using=using, savepoint=False):
+    def save(self, *args, **kwargs):  # pylint: disable=W0221
+        """
+        Writes the row once. When `status` changes to `STATUS_DELETED`, the
+        row is saved with `deleted_at` and `deleted_batch`, then related
+        objects are soft deleted with the same batch. Saving an already
+        deleted object doesn't touch related objects. Fields which are set
+        by the status transition are added to `update_fields`:
+
+            post.status = Post.STATUS_DELETED
+            post.save(update_fields=['status'])
+            # UPDATE ... SET status, updated_at, deleted_at, deleted_batch
+
+        """
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'status' not in update_fields:
+            super().save(*args, **kwargs)
+            return
+
+        using = kwargs.get('using') or router.db_for_write(self.__class__, instance=self)
+        deleting = False
+        if self.status != BaseModel.STATUS_DELETED:
+            self.deleted_at = None
+            self.deleted_batch = None
+        elif self._state.adding or self._get_previous_status(using) != BaseModel.STATUS_DELETED:
+            deleting = not self._state.adding
+            self.deleted_at = timezone.now()
+            self.deleted_batch = uuid.uuid4()
 
-            # pre signal...
-            for model, obj in items.get('instances_with_model'):
-                if not model._meta.auto_created:
-                    required_pre_signal.send(sender=model, instance=obj, using=using)
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'updated_at', 'deleted_at', 'deleted_batch'}
 
-            # fast deletes-ish
-            for queryset in items.get('fast_deletes'):
-                count = queryset.count()
-
-                if issubclass(queryset.model, BaseModelWithSoftDelete):
-                    # this happens in database layer...
-                    # try to mark as deleted if the model is inherited from
-                    # BaseModelWithSoftDelete
-                    count = queryset.update(status=required_status, deleted_at=required_deleted_at)
-                else:
-                    # well, just delete it...
-                    count = queryset._raw_delete(using=using)
-                deleted_counter[queryset.model._meta.label] += count
-
-            for model, instances in items.get('data').items():
-                pk_list = [obj.pk for obj in instances]
-                queryset = model.objects.filter(id__in=pk_list)
-                count = queryset.count()
+        if not deleting:
+            super().save(*args, **kwargs)
+            return
 
-                if issubclass(model, BaseModelWithSoftDelete):
-                    count = queryset.update(status=required_status, deleted_at=required_deleted_at)
+        with transaction.atomic(using=using, savepoint=False):
+            super().save(*args, **kwargs)
+            collector = SoftDeleteCollector(using=using)
+            collector.collect([self])
+            collector.soft_delete(deleted_batch=self.deleted_batch, saved_instances=[self])
 
-                deleted_counter[model._meta.label] += count
+    def hard_delete(self, using=None, keep_parents=False):
+        return super().delete(using=using, keep_parents=keep_parents)
 
-                if not model._meta.auto_created:
-                    for obj in instances:
-                        required_post_signal.send(sender=model, instance=obj, using=using)
+    def delete(
+        self, using=None, keep_parents=False, batch_size=None, progress=None, deleted_batch=None
+    ):  # pylint: disable=W0221
+        using = using or router.db_for_write(self.__class__, instance=self)
+        return self._soft_delete(
+            using=using,
+            keep_parents=keep_parents,
+            batch_size=batch_size,
+            progress=progress,
+            deleted_batch=deleted_batch,
+        )
+
+    def undelete(self, using=None, keep_parents=False, batch_size=None, progress=None):
+        using = using or router.db_for_write(self.__class__, instance=self)
+        return self._undelete(using=using, keep_parents=keep_parents, batch_size=batch_size, progress=progress)
 
-        return sum(deleted_counter.values()), dict(deleted_counter)
+    def _undelete(self, using=None, keep_parents=False, batch_size=None, progress=None):
+        queryset = BaseModelWithSoftDeleteQuerySet(model=self.__class__, using=using).filter(pk=self.pk)
+        queryset._unarchive(pk_list=[self.pk])
+        result = queryset._delete_or_undelete(
+            undelete=True, batch_size=batch_size, progress=progress, keep_parents=keep_parents
+        )
+        self.status = BaseModel.STATUS_ONLINE
+        self.deleted_at = None
+        self.deleted_batch = None
+        return result
+
+    def _soft_delete(self, using=None, keep_parents=False, batch_size=None, progress=None, deleted_batch=None):
+        collector = SoftDeleteCollector(using=using)
+        collector.collect([self], keep_parents=keep_parents)
+        return collector.soft_delete(
+            batch_size=batch_size, progress=SoftDeleteProgress(callback=progress), deleted_batch=deleted_batch
+        )
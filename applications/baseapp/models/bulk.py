@@ -0,0 +1,237 @@
+# pylint: disable=W0212
+
+import logging
+from functools import partial, reduce
+from operator import or_
+
+from django.db import connections, models, transaction
+from django.db.models import sql
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+from ..utils import console
+from .cache import objects_changed, uses_object_cache
+from .counters import (
+    change_status_counts,
+    count_by_status,
+    uses_status_counters,
+)
+from .outbox import (
+    ChangeRecord,
+    record_changes,
+    uses_change_feed,
+)
+from .versioning import (
+    VERSION_FIELD_NAME,
+    get_version_field,
+    uses_versioning,
+    version_increment,
+)
+
+__all__ = ['BULK_BATCH_SIZE', 'bulk_update_rows', 'bulk_upsert_rows']
+
+console = console(source=__name__)
+logger = logging.getLogger('app')
+
+BULK_BATCH_SIZE = 1000
+SOFT_DELETE_FIELDS = ('status', 'deleted_at', 'deleted_batch')
+
+
+def batches(objs, batch_size):
+    for start in range(0, len(objs), batch_size):
+        end = start + batch_size
+        yield objs[start:end]
+
+
+def count_status_changes(queryset, callback):
+    """
+    Runs `callback()` and applies status changes of `queryset`'s rows to
+    status counters. Rows are counted before and after the callback, only
+    for models which use status counters.
+    """
+
+    if not uses_status_counters(queryset.model):
+        return callback()
+
+    previous = count_by_status(queryset)
+    result = callback()
+    changes = count_by_status(queryset)
+    changes.subtract(previous)
+    change_status_counts(queryset.model, changes, queryset.db)
+    return result
+
+
+def bulk_update_rows(queryset, objs, fields, batch_size=None, status_counts=True):
+    """
+    Updates `fields` of `objs` with one `UPDATE ... CASE WHEN` per batch
+    and sets `updated_at` of every row to the same timestamp. Returns
+    number of updated rows.
+    """
+
+    model = queryset.model
+    objs = list(objs)
+    if any(obj.pk is None for obj in objs):
+        raise ValueError('All bulk_update() objects must have a primary key set.')
+    fields = [model._meta.get_field(name) for name in fields if name != 'updated_at']
+    if any(not field.concrete or field.many_to_many or field.primary_key for field in fields):
+        raise ValueError('bulk_update() can only be used with concrete, non primary key fields.')
+    if not objs:
+        return 0
+    status_counts = status_counts and any(field.name == 'status' for field in fields)
+
+    connection = connections[queryset.db]
+    max_batch_size = connection.ops.bulk_batch_size(['pk', 'pk'] + fields, objs)
+    batch_size = min(batch_size or BULK_BATCH_SIZE, max_batch_size)
+    requires_casting = connection.features.requires_casted_case_in_updates
+
+    updated_at = timezone.now()
+    for obj in objs:
+        obj.updated_at = updated_at
+
+    count = 0
+    with transaction.atomic(using=queryset.db, savepoint=False):
+        for batch in batches(objs, batch_size):
+            update_kwargs = dict(updated_at=updated_at)
+            if uses_versioning(model):
+                update_kwargs[VERSION_FIELD_NAME] = version_increment()
+            for field in fields:
+                when_statements = []
+                for obj in batch:
+                    value = getattr(obj, field.attname)
+                    if not isinstance(value, models.Expression):
+                        value = models.Value(value, output_field=field)
+                    when_statements.append(models.When(pk=obj.pk, then=value))
+                case_statement = models.Case(*when_statements, output_field=field)
+                if requires_casting:
+                    case_statement = Cast(case_statement, output_field=field)
+                update_kwargs[field.attname] = case_statement
+
+            batch_queryset = queryset.model._base_manager.using(queryset.db).filter(pk__in=[obj.pk for obj in batch])
+            if status_counts:
+                count += count_status_changes(batch_queryset, lambda: batch_queryset.update(**update_kwargs))
+            else:
+                count += batch_queryset.update(**update_kwargs)
+            record_changes(model, ChangeRecord.ACTION_SAVE, [obj.pk for obj in batch], queryset.db)
+            objects_changed(model, queryset.db, [obj.pk for obj in batch])
+    return count
+
+
+def get_key(obj, fields):
+    return tuple(getattr(obj, field.attname) for field in fields)
+
+
+def get_keys_filter(objs, fields):
+    if len(fields) == 1:
+        return models.Q(**{'%s__in' % fields[0].attname: [get_key(obj, fields)[0] for obj in objs]})
+    attnames = [field.attname for field in fields]
+    return reduce(or_, [models.Q(**dict(zip(attnames, get_key(obj, fields)))) for obj in objs])
+
+
+def bulk_upsert_rows(queryset, objs, unique_fields, update_fields=None, batch_size=None):
+    """
+    Inserts `objs` or updates `update_fields` of existing rows which have
+    the same `unique_fields` values. `created_at` of existing rows is kept,
+    `updated_at` is stamped and `version` is incremented (for models which
+    use optimistic locking). Uses `INSERT ... ON CONFLICT DO UPDATE` on
+    PostgreSQL, a lookup query, `bulk_update()` and `bulk_create()` per
+    batch on other databases. Returns `(created, updated)` counts.
+
+    Objects with the same key are merged, the last one wins. Primary keys
+    of objects are not set.
+    """
+
+    model = queryset.model
+    opts = model._meta
+    unique_fields = [opts.get_field(name) for name in unique_fields]
+    if update_fields is None:
+        excluded = {'created_at'}
+        if any(field.name == 'deleted_at' for field in opts.concrete_fields):
+            # soft delete bookkeeping is updated only when it is named...
+            excluded.update(SOFT_DELETE_FIELDS)
+        update_fields = [
+            field
+            for field in opts.concrete_fields
+            if not field.primary_key and field not in unique_fields and field.name not in excluded
+        ]
+    else:
+        update_fields = [opts.get_field(name) for name in update_fields]
+    update_field_names = {field.name for field in update_fields} | {'updated_at'}
+    if uses_versioning(model):
+        # versions of updated rows are incremented, never overwritten...
+        update_field_names.discard(VERSION_FIELD_NAME)
+    update_fields = [field for field in opts.concrete_fields if field.name in update_field_names]
+
+    # last one wins, ON CONFLICT can not update a row twice in one statement...
+    objs = list({get_key(obj, unique_fields): obj for obj in objs}.values())
+    if not objs:
+        return 0, 0
+
+    connection = connections[queryset.db]
+    fields = [field for field in opts.concrete_fields if not isinstance(field, models.AutoField)]
+    batch_size = min(batch_size or BULK_BATCH_SIZE, connection.ops.bulk_batch_size(fields, objs))
+
+    upsert = insert_on_conflict if connection.vendor == 'postgresql' else select_and_write
+    created = updated = 0
+    pk_list = []
+    with transaction.atomic(using=queryset.db, savepoint=False):
+        for batch in batches(objs, batch_size):
+            batch_queryset = model._base_manager.using(queryset.db).filter(get_keys_filter(batch, unique_fields))
+            batch_created, batch_updated = count_status_changes(
+                batch_queryset, partial(upsert, batch_queryset, batch, fields, unique_fields, update_fields)
+            )
+            created += batch_created
+            updated += batch_updated
+            if uses_change_feed(model) or uses_object_cache(model):
+                # pks of upserted rows are not known before...
+                batch_pk_list = list(batch_queryset.values_list('pk', flat=True))
+                if uses_change_feed(model):
+                    record_changes(model, ChangeRecord.ACTION_SAVE, batch_pk_list, queryset.db)
+                pk_list.extend(batch_pk_list)
+        objects_changed(model, queryset.db, pk_list if uses_object_cache(model) else None)
+    return created, updated
+
+
+def insert_on_conflict(queryset, objs, fields, unique_fields, update_fields):
+    connection = connections[queryset.db]
+    quote_name = connection.ops.quote_name
+
+    query = sql.InsertQuery(queryset.model)
+    query.insert_values(fields, objs, raw=False)
+    ((insert_sql, params),) = query.get_compiler(using=queryset.db).as_sql()
+
+    conflict_sql = ', '.join(quote_name(field.column) for field in unique_fields)
+    update_sql = ', '.join('{0} = EXCLUDED.{0}'.format(quote_name(field.column)) for field in update_fields)
+    if uses_versioning(queryset.model):
+        column = quote_name(get_version_field(queryset.model).column)
+        update_sql += ', {0} = {1}.{0} + 1'.format(column, quote_name(queryset.model._meta.db_table))
+    with connection.cursor() as cursor:
+        # xmax is 0 for inserted rows...
+        cursor.execute(
+            '{0} ON CONFLICT ({1}) DO UPDATE SET {2} RETURNING (xmax = 0)'.format(
+                insert_sql, conflict_sql, update_sql
+            ),
+            params,
+        )
+        inserted = [row[0] for row in cursor.fetchall()]
+    created = sum(1 for is_inserted in inserted if is_inserted)
+    return created, len(inserted) - created
+
+
+def select_and_write(queryset, objs, fields, unique_fields, update_fields):  # pylint: disable=W0613
+    attnames = [field.attname for field in unique_fields]
+    existing = {tuple(row[1:]): row[0] for row in queryset.values_list('pk', *attnames)}
+
+    to_update = []
+    to_create = []
+    for obj in objs:
+        pk = existing.get(get_key(obj, unique_fields))
+        if pk is None:
+            to_create.append(obj)
+        else:
+            obj.pk = pk
+            to_update.append(obj)
+
+    # rows are counted by the caller...
+    models.QuerySet(model=queryset.model, using=queryset.db).bulk_create(to_create)
+    bulk_update_rows(queryset, to_update, [field.name for field in update_fields], status_counts=False)
+    return len(to_create), len(to_update)
@@ -0,0 +1,323 @@
+# pylint: disable=W0212
+
+import hashlib
+import logging
+import uuid
+import zlib
+from functools import partial
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections, transaction
+from django.db.models.signals import (
+    class_prepared,
+    post_delete,
+)
+
+from ..utils import console
+from ..utils.invalidation import get_invalidation_bus
+from .archive import ARCHIVE_MODELS
+from .signals import generation_changed
+
+__all__ = [
+    'OBJECT_CACHE_TIMEOUT',
+    'QUERYSET_CACHE_TIMEOUT',
+    'bump_generation',
+    'cached_get',
+    'cached_get_many',
+    'cached_queryset',
+    'invalidate_cached_objects',
+    'objects_changed',
+]
+
+console = console(source=__name__)
+logger = logging.getLogger('app')
+
+OBJECT_CACHE_TIMEOUT = 300
+OBJECT_CACHE_KEY_PREFIX = 'baseapp.object'
+QUERYSET_CACHE_TIMEOUT = 60
+QUERYSET_CACHE_KEY_PREFIX = 'baseapp.queryset'
+GENERATION_KEY_PREFIX = 'baseapp.generation'
+ROW_GENERATION_KEY_PREFIX = 'baseapp.row_generation'
+
+
+def uses_object_cache(model):
+    return getattr(model, 'object_cache', False) and not model._meta.abstract
+
+
+def get_object_cache():
+    return caches[getattr(settings, 'OBJECT_CACHE_ALIAS', 'default')]
+
+
+def get_cache_version(model):
+    """
+    Returns the cache version of `model`. Changes when concrete fields of
+    the model change, pickles of an older deploy are never unpickled.
+    """
+
+    attnames = ','.join(field.attname for field in model._meta.concrete_model._meta.concrete_fields)
+    return zlib.crc32(attnames.encode())
+
+
+def get_cache_key(model, pk, generation):
+    label = model._meta.concrete_model._meta.label_lower
+    return '{0}:{1}:{2}:{3}'.format(OBJECT_CACHE_KEY_PREFIX, label, pk, generation)
+
+
+def get_row_generation_key(model, pk):
+    return '{0}:{1}:{2}'.format(ROW_GENERATION_KEY_PREFIX, model._meta.concrete_model._meta.label_lower, pk)
+
+
+def get_row_generation_timeout(model):
+    # outlives entries of the generation...
+    return model.object_cache_timeout * 2
+
+
+def read_row_generations(cache, model, pk_list):
+    """
+    Returns `{pk: generation}` of rows, writers give a row a new generation
+    when they commit. A reader which fetched the row before the commit
+    caches it under the old generation, nobody reads that entry again.
+    """
+
+    generation_keys = [get_row_generation_key(model, pk) for pk in pk_list]
+    found = cache.get_many(generation_keys)
+    generations = read_generations(cache, found, generation_keys, timeout=get_row_generation_timeout(model))
+    return dict(zip(pk_list, generations))
+
+
+def cached_get(queryset, pk):
+    """
+    Returns the object of `pk` from the cache, fetches it with
+    `queryset.get(pk=pk)` on a miss. Raises `DoesNotExist` like `get()`,
+    missing rows are not cached. Entries are keyed on the row's generation,
+    see `read_row_generations()`.
+    """
+
+    model = queryset.model
+    pk = model._meta.pk.to_python(pk)
+    cache = get_object_cache()
+    generation = read_row_generations(cache, model, [pk])[pk]
+    key = get_cache_key(model, pk, generation)
+    version = get_cache_version(model)
+
+    obj = cache.get(key, version=version)
+    if obj is None:
+        obj = queryset.get(pk=pk)
+        cache.set(key, obj, timeout=model.object_cache_timeout, version=version)
+    return obj
+
+
+def cached_get_many(queryset, pk_list):
+    """
+    Returns `{pk: obj}` of `pk_list` like `in_bulk()`. Generations and
+    hits are read with a `get_many()` each, misses are fetched with one
+    query and written with one `set_many()`. A cold read also writes the
+    missing generations with one `set_many()`.
+    """
+
+    model = queryset.model
+    pk_list = [model._meta.pk.to_python(pk) for pk in pk_list]
+    if not pk_list:
+        return {}
+
+    cache = get_object_cache()
+    version = get_cache_version(model)
+    generations = read_row_generations(cache, model, list(dict.fromkeys(pk_list)))
+    keys = {get_cache_key(model, pk, generation): pk for pk, generation in generations.items()}
+
+    found = {keys[key]: obj for key, obj in cache.get_many(list(keys), version=version).items()}
+    missing = [pk for pk in generations if pk not in found]
+    if missing:
+        fetched = queryset.in_bulk(missing)
+        cache.set_many(
+            {get_cache_key(model, pk, generations[pk]): obj for pk, obj in fetched.items()},
+            timeout=model.object_cache_timeout,
+            version=version,
+        )
+        found.update(fetched)
+    return {pk: found[pk] for pk in pk_list if pk in found}
+
+
+def set_new_row_generations(model, pk_list):
+    generations = {get_row_generation_key(model, pk): uuid.uuid4().hex for pk in pk_list}
+    get_object_cache().set_many(generations, timeout=get_row_generation_timeout(model))
+
+
+def invalidate_cached_objects(model, pk_list, using):
+    """
+    Gives rows of `pk_list` new generations when the current transaction
+    of `using` commits (right away outside of a transaction). Readers which
+    fetch a row before the commit and fill the cache after it write to an
+    entry of the old generation, it is never read.
+    """
+
+    if not uses_object_cache(model) or not pk_list:
+        return
+    transaction.on_commit(partial(set_new_row_generations, model, list(pk_list)), using=using)
+
+
+def uses_queryset_cache(model):
+    return getattr(model, 'queryset_cache', False) and not model._meta.abstract
+
+
+def uses_generations(model):
+    return (uses_queryset_cache(model) or getattr(model, 'snapshot', False)) and not model._meta.abstract
+
+
+def get_generation_key(model):
+    return '{0}:{1}'.format(GENERATION_KEY_PREFIX, model._meta.concrete_model._meta.label_lower)
+
+
+def read_generations(cache, found, generation_keys, timeout=None):
+    """
+    Returns generations of `generation_keys` as a tuple. `found` is the
+    result of a `get_many()` which included the keys, missing generations
+    are created with one `set_many()`.
+
+    Concurrent readers of a missing generation may overwrite each other,
+    entries of the losing generation are not read again. This is safe:
+    readers write the generation before they query the database, so a
+    commit's new generation is either replaced by a reader which saw the
+    commit or it replaces theirs.
+    """
+
+    missing = {generation_key: uuid.uuid4().hex for generation_key in generation_keys if generation_key not in found}
+    if missing:
+        cache.set_many(missing, timeout=timeout)
+        found.update(missing)
+    return tuple(found.get(generation_key) for generation_key in generation_keys)
+
+
+def set_new_generation(model):
+    generation = uuid.uuid4().hex
+    get_object_cache().set(get_generation_key(model), generation, timeout=None)
+    generation_changed.send(sender=model, generation=generation)
+
+
+def is_bump_pending(model, using):
+    """
+    Returns `True` if a generation bump of `model` is scheduled for the
+    current transaction of `using`. Django replaces `run_on_commit` list on
+    commit and rollback, appends to it otherwise.
+    """
+
+    connection = connections[using]
+    pending = getattr(connection, 'pending_generation_bumps', {})
+    return connection.in_atomic_block and pending.get(model._meta.concrete_model) is connection.run_on_commit
+
+
+def bump_generation(model, using):
+    """
+    Gives `model` a new generation when the current transaction of `using`
+    commits (right away outside of a transaction). Cached querysets of
+    older generations are never served again, snapshots are reloaded.
+    Scheduled once per model per transaction.
+    """
+
+    if not uses_generations(model) or is_bump_pending(model, using):
+        return
+    model = model._meta.concrete_model
+    connection = connections[using]
+    transaction.on_commit(partial(set_new_generation, model), using=using)
+    if connection.in_atomic_block:
+        if not hasattr(connection, 'pending_generation_bumps'):
+            connection.pending_generation_bumps = {}
+        connection.pending_generation_bumps[model] = connection.run_on_commit
+
+
+def get_queryset_models(query):
+    """
+    Returns models of every table which is used by compiled `query`,
+    archive tables count as their models.
+    """
+
+    tables = {}
+    for model in apps.get_models(include_auto_created=True):
+        tables[model._meta.db_table] = model
+    for model, archive_model in ARCHIVE_MODELS.items():
+        tables[archive_model._meta.db_table] = model
+
+    queries = [query] + list(query.combined_queries)
+    return {tables.get(join.table_name) for sub_query in queries for join in sub_query.alias_map.values()}
+
+
+def cached_queryset(queryset, timeout=QUERYSET_CACHE_TIMEOUT):
+    """
+    Returns results of `queryset` as a list, from the cache if models of
+    every table in the query have the same generation as when the result
+    was cached. Entry and generations are read with one `get_many()`.
+    Inside a transaction which changed one of the models, the database is
+    queried directly.
+    """
+
+    query = queryset.query.clone()
+    sql, params = query.get_compiler(using=queryset.db).as_sql()
+    query_models = get_queryset_models(query)
+    not_cached = [model for model in query_models if model is None or not uses_queryset_cache(model)]
+    if not_cached:
+        raise ImproperlyConfigured(
+            'Tables of %s have no queryset_cache: %s'
+            % (queryset.model._meta.label, ', '.join(sorted(str(model and model._meta.label) for model in not_cached)))
+        )
+    # a fresh copy, result cache of `queryset` may be stale...
+    queryset = queryset._chain()
+    if any(is_bump_pending(model, queryset.db) for model in query_models):
+        return list(queryset)
+
+    cache = get_object_cache()
+    generation_keys = sorted(get_generation_key(model) for model in query_models)
+    digest = hashlib.md5(repr((queryset.db, sql, params, queryset._iterable_class)).encode()).hexdigest()
+    key = '{0}:{1}:{2}'.format(QUERYSET_CACHE_KEY_PREFIX, queryset.model._meta.label_lower, digest)
+
+    found = cache.get_many(generation_keys + [key])
+    generations = read_generations(cache, found, generation_keys)
+
+    entry = found.get(key)
+    if entry is not None and entry[0] == generations:
+        return entry[1]
+
+    result = list(queryset)
+    cache.set(key, (generations, result), timeout=timeout)
+    return result
+
+
+def uses_invalidation_bus(model):
+    if model._meta.abstract:
+        return False
+    return getattr(model, 'publish_invalidations', False) or getattr(model, 'snapshot', False)
+
+
+def objects_changed(model, using, pk_list=None):
+    """
+    Called by every write path of `BaseModel`. Removes cached objects of
+    `pk_list`, bumps the generation and publishes `(model, pk)` events to
+    the invalidation bus, for models which use them. `pk_list` is `None`
+    when changed rows are unknown.
+    """
+
+    if pk_list is not None:
+        invalidate_cached_objects(model, pk_list, using)
+    bump_generation(model, using)
+    if uses_invalidation_bus(model):
+        get_invalidation_bus().publish(model._meta.concrete_model._meta.label_lower, pk_list=pk_list, using=using)
+
+
+def invalidate_deleted_object(sender, instance, using, soft_delete=False, **kwargs):  # pylint: disable=W0613
+    if soft_delete:
+        # invalidated by the soft delete collector...
+        return
+    objects_changed(sender, using, [instance.pk])
+
+
+def register_object_cache(sender, **kwargs):  # pylint: disable=W0613
+    if not uses_object_cache(sender) and not uses_generations(sender) and not uses_invalidation_bus(sender):
+        return
+    # hard deletes (also cascades) are invalidated per instance, this also
+    # keeps cached rows out of fast deletes...
+    post_delete.connect(invalidate_deleted_object, sender=sender, dispatch_uid='object_cache')
+
+
+class_prepared.connect(register_object_cache)
@@ -0,0 +1,160 @@
+# pylint: disable=W0212,R0903
+
+import logging
+from collections import Counter
+
+from django.db import IntegrityError, models, transaction
+from django.db.models.signals import (
+    class_prepared,
+    post_delete,
+)
+from django.utils.translation import ugettext_lazy as _
+
+from ..utils import console
+from .archive import get_archive_model
+
+__all__ = ['StatusCounter']
+
+console = console(source=__name__)
+logger = logging.getLogger('app')
+
+
+class StatusCounter(models.Model):
+    """
+    Materialized row counts per `status` of models which have
+    `status_counters = True`. Kept current by `save()`, soft delete,
+    undelete, hard delete and the bulk helpers. Use
+    `manage.py reconcile_status_counts` to fix drift caused by raw SQL or
+    `QuerySet.update()`.
+    """
+
+    model_label = models.CharField(max_length=255, verbose_name=_('model'))
+    status = models.IntegerField(verbose_name=_('status'))
+    count = models.BigIntegerField(default=0, verbose_name=_('count'))
+    updated_at = models.DateTimeField(auto_now=True, verbose_name=_('updated at'))
+
+    class Meta:
+        unique_together = (('model_label', 'status'),)
+        verbose_name = _('status counter')
+        verbose_name_plural = _('status counters')
+
+    def __str__(self):
+        return '{0} [{1}]: {2}'.format(self.model_label, self.status, self.count)
+
+
+def uses_status_counters(model):
+    return getattr(model, 'status_counters', False) and not model._meta.proxy
+
+
+def count_by_status(queryset):
+    """
+    Returns `Counter({status: count})` of `queryset` with a single
+    `GROUP BY` query.
+    """
+
+    return Counter(dict(queryset.order_by().values_list('status').annotate(models.Count('pk'))))
+
+
+def change_status_counts(model, changes, using):
+    """
+    Applies `changes` (`{status: delta}`) to counters of `model`. Each
+    counter is changed with `UPDATE ... SET count = count + delta`, missing
+    counters are created.
+    """
+
+    model_label = model._meta.concrete_model._meta.label
+    queryset = StatusCounter.objects.using(using).filter(model_label=model_label)
+    for status, delta in changes.items():
+        if not delta:
+            continue
+        if queryset.filter(status=status).update(count=models.F('count') + delta):
+            continue
+        try:
+            with transaction.atomic(using=using):
+                StatusCounter.objects.using(using).create(model_label=model_label, status=status, count=delta)
+        except IntegrityError:
+            # created by a concurrent writer...
+            queryset.filter(status=status).update(count=models.F('count') + delta)
+
+
+def update_with_status_counts(queryset, values):
+    """
+    Runs `queryset.update(**values)` and moves counts of updated rows from
+    their old statuses to `values['status']`. Counts are read with one
+    extra `GROUP BY` query, only for models which use status counters.
+    """
+
+    if not uses_status_counters(queryset.model):
+        return queryset.update(**values)
+
+    previous = count_by_status(queryset)
+    count = queryset.update(**values)
+
+    changes = Counter({values['status']: sum(previous.values())})
+    changes.subtract(previous)
+    change_status_counts(queryset.model, changes, queryset.db)
+    return count
+
+
+def raw_delete_with_status_counts(queryset, using):
+    if not uses_status_counters(queryset.model):
+        return queryset._raw_delete(using=using)
+
+    previous = count_by_status(queryset)
+    count = queryset._raw_delete(using=using)
+    change_status_counts(queryset.model, Counter({status: -count for status, count in previous.items()}), using)
+    return count
+
+
+def get_status_counts(model, using):
+    """
+    Returns `{status: count}` of `model` from the counter table.
+    """
+
+    counters = StatusCounter.objects.using(using).filter(model_label=model._meta.concrete_model._meta.label)
+    return dict(counters.values_list('status', 'count'))
+
+
+def reconcile_status_counts(model, queryset, using):
+    """
+    Recounts rows of `queryset` (and the archive table, if any) and
+    overwrites counters of `model`. Returns `{status: drift}` of counters
+    which were wrong.
+    """
+
+    actual = count_by_status(queryset)
+    archive_model = get_archive_model(model)
+    if archive_model is not None:
+        actual.update(count_by_status(archive_model._base_manager.using(using)))
+
+    stored = get_status_counts(model, using)
+    drift = {}
+    with transaction.atomic(using=using):
+        for status in set(stored) | set(actual):
+            if stored.get(status, 0) == actual[status]:
+                continue
+            drift[status] = stored.get(status, 0) - actual[status]
+            StatusCounter.objects.using(using).update_or_create(
+                model_label=model._meta.concrete_model._meta.label, status=status, defaults=dict(count=actual[status])
+            )
+    return drift
+
+
+def decrease_status_count(sender, instance, using, soft_delete=False, **kwargs):  # pylint: disable=W0613
+    if soft_delete:
+        # counted by the soft delete collector...
+        return
+    status = getattr(instance, '_loaded_status', None)
+    if status is None:
+        status = instance.status
+    change_status_counts(sender, {status: -1}, using)
+
+
+def register_status_counters(sender, **kwargs):  # pylint: disable=W0613
+    if sender._meta.abstract or not uses_status_counters(sender):
+        return
+    # hard deletes (also cascades) are counted per instance...
+    post_delete.connect(decrease_status_count, sender=sender, dispatch_uid='status_counters')
+
+
+class_prepared.connect(register_status_counters)
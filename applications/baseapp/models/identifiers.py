@@ -0,0 +1,259 @@
+# pylint: disable=W0212
+
+import datetime
+import logging
+import os
+import threading
+import time
+import uuid
+
+from django.db import NotSupportedError, models
+from django.db.migrations.operations.base import Operation
+from django.db.models.signals import class_prepared
+from django.utils import timezone
+
+from ..utils import console
+
+__all__ = [
+    'PopulateTimeOrderedIds',
+    'SwitchToTimeOrderedPk',
+    'TimeOrderedUUIDField',
+    'min_uuid7',
+    'uuid7',
+    'uuid7_datetime',
+]
+
+console = console(source=__name__)
+logger = logging.getLogger('app')
+
+TIME_ORDERED_ID_BATCH_SIZE = 1000
+
+UUID7_TIMESTAMP_MASK = (1 << 48) - 1
+UUID7_COUNTER_MAX = 0xFFF
+
+uuid7_lock = threading.Lock()
+uuid7_state = {'timestamp': 0, 'counter': 0}
+
+
+def random_bits(bits):
+    return int.from_bytes(os.urandom(8), 'big') >> (64 - bits)
+
+
+def build_uuid7(timestamp, counter):
+    value = (timestamp & UUID7_TIMESTAMP_MASK) << 80
+    value |= 0x7 << 76 | counter << 64
+    value |= 0b10 << 62 | random_bits(62)
+    return uuid.UUID(int=value)
+
+
+def uuid7(timestamp=None):
+    """
+    Returns a UUIDv7: 48 bits of unix time in milliseconds, a 12 bit
+    counter and 62 random bits. Values of the process are increasing, the
+    counter starts from a random value every millisecond and moves the
+    timestamp forward when it overflows. `timestamp` (a datetime) builds
+    a value of the past, with a random counter:
+
+        uuid7()
+        # UUID('0192a3b4-c5d6-7e0f-8a1b-2c3d4e5f6a7b')
+
+    """
+
+    if timestamp is not None:
+        return build_uuid7(int(timestamp.timestamp() * 1000), random_bits(12))
+
+    with uuid7_lock:
+        now = time.time_ns() // 1000000
+        if now > uuid7_state['timestamp']:
+            # half of the counter is left for the rest of the millisecond...
+            uuid7_state.update(timestamp=now, counter=random_bits(11))
+        elif uuid7_state['counter'] < UUID7_COUNTER_MAX:
+            # same millisecond or the clock went back...
+            uuid7_state['counter'] += 1
+        else:
+            uuid7_state.update(timestamp=uuid7_state['timestamp'] + 1, counter=random_bits(11))
+        return build_uuid7(uuid7_state['timestamp'], uuid7_state['counter'])
+
+
+def uuid7_datetime(value):
+    """
+    Returns the (UTC) datetime of a UUIDv7, in millisecond precision.
+    """
+
+    timestamp = uuid.UUID(str(value)).int >> 80
+    return datetime.datetime.fromtimestamp(timestamp / 1000, tz=timezone.utc)
+
+
+def min_uuid7(timestamp):
+    """
+    Returns the smallest UUIDv7 of `timestamp`'s millisecond, time ranges
+    can be filtered on the primary key index:
+
+        Post.objects.filter(pk__gte=min_uuid7(start), pk__lt=min_uuid7(end))
+
+    """
+
+    value = (int(timestamp.timestamp() * 1000) & UUID7_TIMESTAMP_MASK) << 80
+    return uuid.UUID(int=value | 0x7 << 76 | 0b10 << 62)
+
+
+class TimeOrderedUUIDField(models.UUIDField):
+    """
+    UUIDField which defaults to `uuid7()`. Values are generated in the
+    process and sort by creation time, new rows go to the right edge of
+    the index like integer ids do.
+    """
+
+    def __init__(self, *args, **kwargs):
+        if not kwargs.get('null'):
+            # nullable columns are filled by `PopulateTimeOrderedIds`...
+            kwargs.setdefault('default', uuid7)
+        kwargs.setdefault('editable', False)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if kwargs.get('default') is uuid7:
+            del kwargs['default']
+        if kwargs.get('editable') is False:
+            del kwargs['editable']
+        else:
+            kwargs['editable'] = True
+        return name, path, args, kwargs
+
+
+def uses_time_ordered_pk(model):
+    return getattr(model, 'time_ordered_pk', False) and not model._meta.abstract
+
+
+def register_time_ordered_pk(sender, **kwargs):  # pylint: disable=W0613
+    if not uses_time_ordered_pk(sender) or sender._meta.proxy:
+        return
+    opts = sender._meta
+    auto_field = opts.pk
+    if not (auto_field.auto_created and isinstance(auto_field, models.AutoField)):
+        # explicit primary key or parent link...
+        return
+
+    opts.local_fields.remove(auto_field)
+    opts.pk = opts.auto_field = None
+    field = TimeOrderedUUIDField(verbose_name='ID', primary_key=True, serialize=False)
+    # first column, like the auto field...
+    field.creation_counter = auto_field.creation_counter
+    sender.add_to_class(auto_field.name, field)
+
+
+class_prepared.connect(register_time_ordered_pk)
+
+
+class PopulateTimeOrderedIds(Operation):
+    """
+    Fills empty `field_name` values of existing rows with UUIDv7s of their
+    `created_at`, in `(created_at, pk)` order and batches:
+
+        operations = [
+            migrations.AddField('post', 'time_ordered_id', TimeOrderedUUIDField(null=True)),
+            PopulateTimeOrderedIds('post', 'time_ordered_id'),
+            SwitchToTimeOrderedPk('post', 'time_ordered_id'),
+        ]
+
+    """
+
+    reduces_to_sql = False
+    reversible = True
+
+    def __init__(self, model_name, field_name, batch_size=TIME_ORDERED_ID_BATCH_SIZE):
+        self.model_name = model_name
+        self.field_name = field_name
+        self.batch_size = batch_size
+        super().__init__()
+
+    def deconstruct(self):
+        kwargs = {'model_name': self.model_name, 'field_name': self.field_name, 'batch_size': self.batch_size}
+        return self.__class__.__name__, [], kwargs
+
+    def describe(self):
+        return 'Populate time ordered ids of {0}.{1}'.format(self.model_name, self.field_name)
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            populate_time_ordered_ids(model, self.field_name, schema_editor.connection.alias, self.batch_size)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        pass
+
+
+def populate_time_ordered_ids(model, field_name, using, batch_size=TIME_ORDERED_ID_BATCH_SIZE):
+    queryset = model._base_manager.using(using).filter(**{'{0}__isnull'.format(field_name): True})
+    count = 0
+    while True:
+        # filled rows leave the queryset...
+        objs = list(queryset.order_by('created_at', 'pk').only('pk', 'created_at')[:batch_size])
+        if not objs:
+            return count
+        for obj in objs:
+            setattr(obj, field_name, uuid7(timestamp=obj.created_at))
+        model._base_manager.using(using).bulk_update(objs, [field_name])
+        count += len(objs)
+
+
+class SwitchToTimeOrderedPk(Operation):
+    """
+    Makes the populated `field_name` column the `id` primary key of the
+    model, the integer id column is dropped. PostgreSQL only. Foreign keys
+    which point to the model must be migrated first, the integer column
+    can not be dropped otherwise. Set `time_ordered_pk = True` on the
+    model with this migration.
+    """
+
+    reduces_to_sql = True
+    reversible = False
+
+    def __init__(self, model_name, field_name):
+        self.model_name = model_name
+        self.field_name = field_name
+        super().__init__()
+
+    def deconstruct(self):
+        return self.__class__.__name__, [], {'model_name': self.model_name, 'field_name': self.field_name}
+
+    def describe(self):
+        return 'Switch primary key of {0} to {1}'.format(self.model_name, self.field_name)
+
+    def state_forwards(self, app_label, state):
+        model_state = state.models[app_label, self.model_name.lower()]
+        fields = []
+        for name, field in model_state.fields:
+            if name == self.field_name:
+                continue
+            if field.primary_key:
+                field = TimeOrderedUUIDField(verbose_name='ID', primary_key=True, serialize=False)
+            fields.append((name, field))
+        model_state.fields = fields
+        state.reload_model(app_label, self.model_name.lower(), delay=True)
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != 'postgresql':
+            raise NotSupportedError('SwitchToTimeOrderedPk supports only PostgreSQL')
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+
+        quote_name = schema_editor.quote_name
+        table = quote_name(model._meta.db_table)
+        pk_column = quote_name(model._meta.pk.column)
+        column = quote_name(model._meta.get_field(self.field_name).column)
+        for sql in [
+            'ALTER TABLE {0} DROP COLUMN {1}',
+            'ALTER TABLE {0} RENAME COLUMN {2} TO {1}',
+            'ALTER TABLE {0} ALTER COLUMN {1} SET NOT NULL',
+            'ALTER TABLE {0} ADD PRIMARY KEY ({1})',
+        ]:
+            schema_editor.execute(sql.format(table, pk_column, column))
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        raise NotSupportedError('SwitchToTimeOrderedPk is not reversible')
@@ -0,0 +1,149 @@
+# pylint: disable=W0212
+
+import json
+import logging
+
+from django.db import DatabaseError, connections, models
+from django.db.models.signals import class_prepared
+
+from ..utils import console
+
+__all__ = ['estimate_count', 'estimate_row_count', 'get_status_indexes', 'has_status_indexes']
+
+console = console(source=__name__)
+logger = logging.getLogger('app')
+
+
+def get_status_indexes(model):
+    """
+    Returns indexes which serve `BaseModelQuerySet` filters of `model`:
+
+    - `(status, created_at, id)`: `actives()`, `offlines()`, `drafts()` and
+      `deleted()` ordered by `created_at`, also `seek()` pagination
+    - `(created_at, id) WHERE deleted_at IS NULL AND status != 2`: `all()`
+      of soft delete models, only live rows are indexed
+    - `(deleted_at) WHERE status = 2`: `purge_deleted()` and
+      `archive_deleted()`
+
+    Partial indexes are created only on databases which support them.
+    """
+
+    field_names = {field.name for field in model._meta.concrete_fields}
+    pk_name = model._meta.pk.name
+    indexes = [models.Index(fields=['status', 'created_at', pk_name], name='status_created_at')]
+    if 'deleted_at' in field_names:
+        indexes.extend(
+            [
+                models.Index(
+                    fields=['created_at', pk_name],
+                    name='live_created_at',
+                    condition=models.Q(deleted_at__isnull=True) & ~models.Q(status=model.STATUS_DELETED),
+                ),
+                models.Index(
+                    fields=['deleted_at'], name='deleted_at', condition=models.Q(status=model.STATUS_DELETED)
+                ),
+            ]
+        )
+
+    # names are unique per table, like Django's unnamed indexes...
+    for index in indexes:
+        index.set_name_with_model(model)
+    return indexes
+
+
+def index_signature(index):
+    return (tuple(index.fields), str(index.condition))
+
+
+def has_status_indexes(model):
+    """
+    Returns `True` if `model` has every index of `get_status_indexes()`
+    (with any name).
+    """
+
+    existing = {index_signature(index) for index in model._meta.indexes}
+    return all(index_signature(index) in existing for index in get_status_indexes(model))
+
+
+def register_status_indexes(sender, **kwargs):  # pylint: disable=W0613
+    if not getattr(sender, 'status_indexes', False) or sender._meta.abstract or sender._meta.proxy:
+        return
+
+    existing = {index_signature(index) for index in sender._meta.indexes}
+    for index in get_status_indexes(sender):
+        if index_signature(index) not in existing:
+            sender._meta.indexes.append(index)
+
+
+class_prepared.connect(register_status_indexes)
+
+
+def estimate_row_count(model, using):
+    """
+    Returns row count of `model`'s table. Uses planner statistics when the
+    table has them (no table scan), `COUNT(*)` otherwise.
+    """
+
+    row_count = get_statistics_row_count(model, using)
+    if row_count is None:
+        return model._base_manager.using(using).count()
+    return row_count
+
+
+def get_statistics_row_count(model, using):
+    """
+    Returns row count of `model`'s table from planner statistics, `None`
+    if the table has no statistics. PostgreSQL keeps them in `pg_class`
+    (`reltuples` is -1, or 0 with no pages before PostgreSQL 14, until
+    the table is analyzed), SQLite in `sqlite_stat1` (written by
+    `ANALYZE`).
+    """
+
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint, relpages FROM pg_class WHERE oid = %s::regclass', [model._meta.db_table]
+            )
+            row = cursor.fetchone()
+        if row is None or row[0] < 0 or (row[0] == 0 and row[1] == 0):
+            return None
+        return row[0]
+    if connection.vendor != 'sqlite':
+        return None
+
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT stat FROM sqlite_stat1 WHERE tbl = %s', [model._meta.db_table])
+            row = cursor.fetchone()
+    except DatabaseError:
+        # not analyzed yet...
+        return None
+    return int(row[0].split()[0]) if row else None
+
+
+def estimate_count(queryset):
+    """
+    Returns estimated number of rows of `queryset` without counting them,
+    `None` if there is no estimate. Unfiltered querysets use table
+    statistics, filtered ones the row estimate of the query plan
+    (PostgreSQL only, plans of tables without statistics are guesses and
+    not used).
+    """
+
+    query = queryset.query
+    if query.combinator or not query.can_filter():
+        return None
+    if not query.has_filters() and not query.distinct:
+        return get_statistics_row_count(queryset.model, queryset.db)
+
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql' or get_statistics_row_count(queryset.model, queryset.db) is None:
+        return None
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN (FORMAT JSON) {0}'.format(sql), params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
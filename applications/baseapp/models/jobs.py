@@ -0,0 +1,222 @@
+# pylint: disable=W0212,R0903
+
+import json
+import logging
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections, models, transaction
+from django.utils import timezone
+from django.utils.translation import ugettext_lazy as _
+
+from ..utils import console
+from .base import SOFT_DELETE_BATCH_SIZE
+
+__all__ = ['ADMIN_JOB_STALE_TIMEOUT', 'AdminJob', 'claim_job', 'enqueue_job', 'run_job']
+
+console = console(source=__name__)
+logger = logging.getLogger('app')
+
+ADMIN_JOB_STALE_TIMEOUT = 600
+
+
+def run_undelete(queryset):
+    return queryset.undelete()
+
+
+def run_hard_delete(queryset):
+    return queryset.hard_delete()
+
+
+JOB_ACTIONS = {
+    'undelete': run_undelete,
+    'hard_delete': run_hard_delete,
+}
+
+
+class AdminJob(models.Model):
+    """
+    Queue of admin actions which run out of the request, by
+    `manage.py run_admin_jobs`. The selection is kept as the SQL of its
+    pk query, rows are read by the worker. `processed` and `last_pk`
+    follow the batches of the running job, a reclaimed job resumes after
+    `last_pk`.
+    """
+
+    STATUS_PENDING = 0
+    STATUS_RUNNING = 1
+    STATUS_DONE = 2
+    STATUS_FAILED = 3
+
+    STATUS_CHOICES = (
+        (STATUS_PENDING, _('pending')),
+        (STATUS_RUNNING, _('running')),
+        (STATUS_DONE, _('done')),
+        (STATUS_FAILED, _('failed')),
+    )
+
+    action = models.CharField(max_length=64, verbose_name=_('action'))
+    model_label = models.CharField(max_length=255, verbose_name=_('model'))
+    selection = models.TextField(verbose_name=_('selection'))
+    status = models.PositiveSmallIntegerField(choices=STATUS_CHOICES, default=STATUS_PENDING, verbose_name=_('status'))
+    total = models.PositiveIntegerField(null=True, verbose_name=_('selected rows'))
+    processed = models.PositiveIntegerField(default=0, verbose_name=_('processed rows'))
+    last_pk = models.CharField(max_length=64, null=True, verbose_name=_('last pk'))
+    error = models.TextField(blank=True, verbose_name=_('error'))
+    created_by = models.ForeignKey(
+        to=settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, verbose_name=_('created by')
+    )
+    created_at = models.DateTimeField(default=timezone.now, verbose_name=_('created at'))
+    started_at = models.DateTimeField(null=True, verbose_name=_('started at'))
+    updated_at = models.DateTimeField(null=True, verbose_name=_('updated at'))
+    finished_at = models.DateTimeField(null=True, verbose_name=_('finished at'))
+
+    class Meta:
+        verbose_name = _('admin job')
+        verbose_name_plural = _('admin jobs')
+
+    def __str__(self):
+        return '{0} {1}: {2}'.format(self.action, self.model_label, self.get_status_display())
+
+    @property
+    def is_finished(self):
+        return self.status in (self.STATUS_DONE, self.STATUS_FAILED)
+
+    @property
+    def rate(self):
+        """
+        Processed rows per second, `None` before the first batch.
+        """
+
+        if self.started_at is None or self.updated_at is None:
+            return None
+        elapsed = (self.updated_at - self.started_at).total_seconds()
+        return self.processed / elapsed if elapsed else float(self.processed)
+
+    def get_queryset(self):
+        model = apps.get_model(self.model_label)
+        manager = model._default_manager.db_manager(self._state.db)
+        if hasattr(manager, 'get_queryset_with_deleted'):
+            # recover selects deleted rows...
+            return manager.get_queryset_with_deleted()
+        return manager.all()
+
+    def get_selection(self):
+        """
+        Returns the selected rows, which match the selection when they are
+        read.
+        """
+
+        sql, params = json.loads(self.selection)
+        queryset = self.get_queryset()
+        quote_name = connections[queryset.db].ops.quote_name
+        column = '{0}.{1}'.format(
+            quote_name(queryset.model._meta.db_table), quote_name(queryset.model._meta.pk.column)
+        )
+        # `pk__in=RawSQL(...)` is a scalar subquery on SQLite...
+        return queryset.extra(where=['{0} IN ({1})'.format(column, sql)], params=params)
+
+    def as_dict(self):
+        return dict(
+            id=self.id,
+            action=self.action,
+            model=self.model_label,
+            status=self.get_status_display(),
+            finished=self.is_finished,
+            total=self.total,
+            processed=self.processed,
+            last_pk=self.last_pk,
+            rate=self.rate,
+            error=self.error,
+        )
+
+
+def enqueue_job(action, queryset, user=None):
+    """
+    Queues `action` (a key of `JOB_ACTIONS`) of `queryset`'s rows, returns
+    the job. Rows are not read in the request, the job keeps the SQL of
+    `queryset`'s pks:
+
+        job = enqueue_job('hard_delete', Post.objects.filter(category=category), user=request.user)
+
+    """
+
+    if action not in JOB_ACTIONS:
+        raise ValueError('Unknown job action: %s' % action)
+    query = queryset.order_by().values('pk').query
+    sql, params = query.get_compiler(using=queryset.db).as_sql()
+    return AdminJob.objects.create(
+        action=action,
+        model_label=queryset.model._meta.label,
+        # params are adapted by the database, dates and uuids as strings...
+        selection=json.dumps([sql, params], default=str),
+        created_by=user if user is not None and user.pk else None,
+    )
+
+
+def claim_job(using=None):
+    """
+    Marks the oldest pending job as running and returns it, `None` when
+    the queue is empty. Running jobs without progress for
+    `ADMIN_JOB_STALE_TIMEOUT` seconds (their worker died) are claimed
+    again. A conditional `UPDATE` claims a job, workers can't take the
+    same job.
+    """
+
+    stale_timeout = getattr(settings, 'ADMIN_JOB_STALE_TIMEOUT', ADMIN_JOB_STALE_TIMEOUT)
+    stale_before = timezone.now() - timedelta(seconds=stale_timeout)
+    jobs = AdminJob.objects.using(using)
+    claimable = jobs.filter(
+        models.Q(status=AdminJob.STATUS_PENDING)
+        | models.Q(status=AdminJob.STATUS_RUNNING, updated_at__lt=stale_before)
+    )
+    for job in claimable.order_by('id')[:10]:
+        now = timezone.now()
+        # unchanged since it was read...
+        claimed = jobs.filter(pk=job.pk, status=job.status, updated_at=job.updated_at).update(
+            status=AdminJob.STATUS_RUNNING, started_at=job.started_at or now, updated_at=now
+        )
+        if claimed:
+            if job.status == AdminJob.STATUS_RUNNING:
+                logger.warning('Admin job %s is stale, resuming after pk %s', job.pk, job.last_pk)
+            job.refresh_from_db()
+            return job
+    return None
+
+
+def run_job(job, batch_size=SOFT_DELETE_BATCH_SIZE):
+    """
+    Runs a claimed job in batches of `batch_size` selected rows in pk
+    order, each batch and its cascade in its own transaction. Progress is
+    saved after every batch, jobs continue after `last_pk`. Errors are
+    kept in `error` of the failed job.
+    """
+
+    jobs = AdminJob.objects.using(job._state.db)
+    try:
+        queryset = job.get_queryset()
+        selection = job.get_selection()
+        if job.total is None:
+            job.total = selection.count()
+            jobs.filter(pk=job.pk).update(total=job.total)
+        last_pk = None if job.last_pk is None else queryset.model._meta.pk.to_python(job.last_pk)
+
+        while True:
+            pending = selection if last_pk is None else selection.filter(pk__gt=last_pk)
+            with transaction.atomic(using=queryset.db):
+                batch = list(pending.order_by('pk').values_list('pk', flat=True)[:batch_size])
+                if not batch:
+                    break
+                count, __ = JOB_ACTIONS[job.action](queryset.filter(pk__in=batch))
+            last_pk = batch[-1]
+            job.processed, job.last_pk, job.updated_at = job.processed + count, str(last_pk), timezone.now()
+            jobs.filter(pk=job.pk).update(processed=job.processed, last_pk=job.last_pk, updated_at=job.updated_at)
+    except Exception as exc:  # pylint: disable=W0703
+        logger.exception('Admin job %s failed', job.pk)
+        job.status, job.error = AdminJob.STATUS_FAILED, str(exc) or exc.__class__.__name__
+    else:
+        job.status = AdminJob.STATUS_DONE
+    job.finished_at = timezone.now()
+    jobs.filter(pk=job.pk).update(status=job.status, error=job.error, finished_at=job.finished_at)
+    return job
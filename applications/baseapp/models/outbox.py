@@ -0,0 +1,191 @@
+# pylint: disable=W0212,R0903
+
+import datetime
+import logging
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import models, router
+from django.db.models.signals import (
+    class_prepared,
+    post_delete,
+)
+from django.utils import timezone
+from django.utils.translation import ugettext_lazy as _
+
+from ..utils import console
+
+__all__ = ['ChangeRecord', 'latest_change_id', 'prune_changes', 'read_changes']
+
+console = console(source=__name__)
+logger = logging.getLogger('app')
+
+CHANGE_FEED_BATCH_SIZE = 1000
+# seconds...
+CHANGE_FEED_SETTLE_TIME = 5
+CHANGE_FEED_GAP_TIMEOUT = 24 * 3600
+CHANGE_FEED_GAP_KEY_PREFIX = 'baseapp.change_gap'
+
+
+class ChangeRecord(models.Model):
+    """
+    Outbox of models which have `change_feed = True`. Saves, updates, soft
+    deletes, undeletes and hard deletes write a record per changed row in
+    the same transaction. `object_pk` is `None` when the changed rows are
+    not known (`bulk_create()` without returned pks). Read with
+    `read_changes()`, ids are the cursor.
+    """
+
+    ACTION_SAVE = 1
+    ACTION_DELETE = 2
+    ACTION_UNDELETE = 3
+    ACTION_HARD_DELETE = 4
+
+    ACTION_CHOICES = (
+        (ACTION_SAVE, _('save')),
+        (ACTION_DELETE, _('delete')),
+        (ACTION_UNDELETE, _('undelete')),
+        (ACTION_HARD_DELETE, _('hard delete')),
+    )
+
+    # untranslated, for consumers...
+    ACTION_NAMES = {
+        ACTION_SAVE: 'save',
+        ACTION_DELETE: 'delete',
+        ACTION_UNDELETE: 'undelete',
+        ACTION_HARD_DELETE: 'hard_delete',
+    }
+
+    id = models.BigAutoField(primary_key=True)  # noqa: A003
+    model_label = models.CharField(max_length=255, verbose_name=_('model'))
+    object_pk = models.CharField(max_length=64, null=True, verbose_name=_('object pk'))
+    action = models.PositiveSmallIntegerField(choices=ACTION_CHOICES, verbose_name=_('action'))
+    created_at = models.DateTimeField(default=timezone.now, verbose_name=_('created at'))
+
+    class Meta:
+        verbose_name = _('change record')
+        verbose_name_plural = _('change records')
+
+    def __str__(self):
+        return '{0} {1}: {2}'.format(self.get_action_display(), self.model_label, self.object_pk)
+
+    def as_dict(self):
+        return dict(
+            id=self.id,
+            model=self.model_label,
+            pk=self.object_pk,
+            action=self.ACTION_NAMES[self.action],
+            created_at=self.created_at.isoformat(),
+        )
+
+
+def uses_change_feed(model):
+    return getattr(model, 'change_feed', False) and not model._meta.abstract
+
+
+def record_changes(model, action, pk_list, using):
+    """
+    Writes change records of `pk_list` (`None`: unknown rows) with a
+    single insert per `CHANGE_FEED_BATCH_SIZE` rows. Callers run it in the
+    transaction of the change.
+    """
+
+    if not uses_change_feed(model):
+        return
+    model_label = model._meta.concrete_model._meta.label
+    now = timezone.now()
+    if pk_list is None:
+        records = [ChangeRecord(model_label=model_label, object_pk=None, action=action, created_at=now)]
+    else:
+        records = [
+            ChangeRecord(model_label=model_label, object_pk=str(pk), action=action, created_at=now) for pk in pk_list
+        ]
+    ChangeRecord.objects.using(using).bulk_create(records, batch_size=CHANGE_FEED_BATCH_SIZE)
+
+
+def read_changes(after=0, limit=CHANGE_FEED_BATCH_SIZE, model_labels=None, using=None, settle_time=None):
+    """
+    Returns `(records, cursor)`: up to `limit` change records after the
+    `after` cursor and the cursor of the next call. `model_labels` filters
+    records of given models, the cursor moves over the others too:
+
+        records, cursor = read_changes(after=cursor, model_labels=['blog.Post'])
+
+    Ids are taken before commit, a transaction which is still open can
+    commit into a gap of ids later. Reading stops at a gap until readers
+    see it for `settle_time` (a rolled back transaction leaves a gap
+    forever), `CHANGE_FEED_SETTLE_TIME` seconds of settings by default.
+    The time a gap is seen first is kept in the cache of
+    `CHANGE_FEED_CACHE_ALIAS`, `created_at` of records is not used: it is
+    taken before commit too. Records of a transaction which commits later
+    than `settle_time` after the records behind the gap are skipped.
+    """
+
+    if settle_time is None:
+        settle_time = datetime.timedelta(seconds=getattr(settings, 'CHANGE_FEED_SETTLE_TIME', CHANGE_FEED_SETTLE_TIME))
+    after = after or 0
+
+    records = []
+    cursor = after
+    for record in ChangeRecord.objects.using(using).filter(id__gt=after).order_by('id')[:limit]:
+        if record.id != cursor + 1 and not is_gap_settled(cursor + 1, settle_time, using):
+            break
+        cursor = record.id
+        if model_labels is None or record.model_label in model_labels:
+            records.append(record)
+    return records, cursor
+
+
+def is_gap_settled(missing_id, settle_time, using=None):
+    """
+    Returns whether the gap of ids which starts at `missing_id` is seen
+    for `settle_time` by readers, the first call starts waiting.
+    """
+
+    cache = caches[getattr(settings, 'CHANGE_FEED_CACHE_ALIAS', 'default')]
+    key = '{0}.{1}.{2}'.format(CHANGE_FEED_GAP_KEY_PREFIX, using or router.db_for_read(ChangeRecord), missing_id)
+    now = timezone.now()
+    # clock of the reader, the first reader wins...
+    cache.add(key, now, timeout=getattr(settings, 'CHANGE_FEED_GAP_TIMEOUT', CHANGE_FEED_GAP_TIMEOUT))
+    seen_at = cache.get(key, now)
+    if seen_at > now - settle_time:
+        return False
+    cache.delete(key)
+    return True
+
+
+def latest_change_id(using=None):
+    """
+    Returns the id of the latest change record, the cursor to read only
+    new changes from.
+    """
+
+    return ChangeRecord.objects.using(using).aggregate(latest=models.Max('id'))['latest'] or 0
+
+
+def prune_changes(up_to, using=None):
+    """
+    Deletes change records up to the `up_to` cursor (the smallest cursor
+    of every consumer), returns number of deleted records.
+    """
+
+    using = using or router.db_for_write(ChangeRecord)
+    return ChangeRecord.objects.using(using).filter(id__lte=up_to)._raw_delete(using=using)
+
+
+def record_hard_delete(sender, instance, using, soft_delete=False, **kwargs):  # pylint: disable=W0613
+    if soft_delete:
+        # recorded by the soft delete collector...
+        return
+    record_changes(sender, ChangeRecord.ACTION_HARD_DELETE, [instance.pk], using)
+
+
+def register_change_feed(sender, **kwargs):  # pylint: disable=W0613
+    if not uses_change_feed(sender):
+        return
+    # hard deletes (also cascades) run in the delete transaction, this also
+    # keeps rows out of fast deletes...
+    post_delete.connect(record_hard_delete, sender=sender, dispatch_uid='change_feed')
+
+
+class_prepared.connect(register_change_feed)
@@ -0,0 +1,111 @@
+import logging
+
+from django.core import signing
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.utils.dateparse import parse_datetime
+
+from ..utils import console
+from .identifiers import uses_time_ordered_pk
+
+__all__ = ['InvalidCursor', 'SeekPage', 'seek_page']
+
+console = console(source=__name__)
+logger = logging.getLogger('app')
+
+SEEK_PAGE_SIZE = 20
+SEEK_CURSOR_SALT = 'baseapp.seek'
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(obj):
+    value = obj.pk if isinstance(obj.pk, int) else str(obj.pk)
+    if uses_time_ordered_pk(obj.__class__):
+        return signing.dumps([value], salt=SEEK_CURSOR_SALT, compress=True)
+    return signing.dumps([obj.created_at.isoformat(), value], salt=SEEK_CURSOR_SALT, compress=True)
+
+
+def decode_cursor(model, cursor):
+    try:
+        values = signing.loads(cursor, salt=SEEK_CURSOR_SALT)
+        if uses_time_ordered_pk(model):
+            (value,) = values
+            created_at = None
+        else:
+            created_at, value = values
+            created_at = parse_datetime(created_at)
+            if created_at is None:
+                raise ValueError('created_at is missing')
+        pk = model._meta.pk.to_python(value)
+    except (signing.BadSignature, TypeError, ValueError, ValidationError) as err:
+        raise InvalidCursor('Invalid cursor: %s' % err)
+    if pk is None:
+        raise InvalidCursor('Invalid cursor')
+    return created_at, pk
+
+
+class SeekPage:
+    """
+    A page of keyset pagination. `next_cursor` is `None` on the last page.
+    """
+
+    def __init__(self, object_list, next_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+
+    def __repr__(self):
+        return '<SeekPage: {0} objects, next: {1}>'.format(len(self.object_list), self.next_cursor)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+def seek_page(queryset, after=None, size=SEEK_PAGE_SIZE, descending=False):
+    """
+    Returns `size` objects of `queryset` which come after the `after`
+    cursor, ordered by `(created_at, pk)`. Uses `WHERE` on the last seen
+    row instead of `OFFSET`, every page costs the same. Models which have
+    `time_ordered_pk` are ordered by the pk alone.
+    """
+
+    time_ordered = uses_time_ordered_pk(queryset.model)
+    ordering = ['pk'] if time_ordered else ['created_at', 'pk']
+    lookup, range_lookup = 'gt', 'gte'
+    if descending:
+        ordering = ['-{0}'.format(field_name) for field_name in ordering]
+        lookup, range_lookup = 'lt', 'lte'
+
+    queryset = queryset.order_by(*ordering)
+    if after:
+        created_at, pk = decode_cursor(queryset.model, after)
+        if time_ordered:
+            queryset = queryset.filter(**{'pk__%s' % lookup: pk})
+        else:
+            # the range on created_at alone lets the index seek, the OR only
+            # breaks ties of the first created_at...
+            queryset = queryset.filter(
+                models.Q(**{'created_at__%s' % range_lookup: created_at}),
+                models.Q(**{'created_at__%s' % lookup: created_at})
+                | models.Q(**{'created_at': created_at, 'pk__%s' % lookup: pk}),
+            )
+
+    limit = size + 1
+    object_list = list(queryset[:limit])
+    next_cursor = None
+    if len(object_list) > size:
+        object_list = object_list[:size]
+        next_cursor = encode_cursor(object_list[-1])
+    return SeekPage(object_list, next_cursor=next_cursor)
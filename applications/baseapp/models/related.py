@@ -0,0 +1,65 @@
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from ..utils import console
+
+__all__ = ['filters_deleted_relations', 'include_deleted_relations']
+
+console = console(source=__name__)
+logger = logging.getLogger('app')
+
+deleted_relations_included = ContextVar('deleted_relations_included', default=False)
+
+
+def filters_deleted_relations():
+    return not deleted_relations_included.get()
+
+
+@contextmanager
+def include_deleted_relations():
+    """
+    Related managers and `prefetch_related()` return soft deleted rows
+    inside this block:
+
+        with include_deleted_relations():
+            category.posts.count()  # deleted posts are counted too
+
+    """
+
+    token = deleted_relations_included.set(True)
+    try:
+        yield
+    finally:
+        deleted_relations_included.reset(token)
+
+
+def live_prefetch_queryset(get_prefetch_queryset):
+    """
+    Wraps `get_prefetch_queryset()` of Django's related managers, querysets
+    of `Prefetch` objects are filtered too.
+    """
+
+    @wraps(get_prefetch_queryset)
+    def wrapper(self, instances, queryset=None):
+        if queryset is not None and filters_deleted_relations():
+            queryset = queryset.filter(deleted_at__isnull=True).exclude(status=queryset.model.STATUS_DELETED)
+        return get_prefetch_queryset(self, instances, queryset)
+
+    return wrapper
+
+
+def with_deleted_relations(method):
+    """
+    Wraps write methods of Django's related managers (`set()`, `clear()`,
+    `remove()`), they see soft deleted rows like Django's managers do.
+    `member.members.set([person])` unlinks a deleted person too.
+    """
+
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        with include_deleted_relations():
+            return method(*args, **kwargs)
+
+    return wrapper
@@ -1,3 +1,10 @@
 # flake8: noqa
 
+from .bulk import (
+    post_bulk_delete,
+    post_bulk_undelete,
+    pre_bulk_delete,
+    pre_bulk_undelete,
+)
+from .generation import generation_changed
 from .undelete import post_undelete, pre_undelete
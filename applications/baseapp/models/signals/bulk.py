@@ -0,0 +1,10 @@
+# pylint: disable=C0103
+
+import django.dispatch
+
+__all__ = ['pre_bulk_delete', 'post_bulk_delete', 'pre_bulk_undelete', 'post_bulk_undelete']
+
+pre_bulk_delete = django.dispatch.Signal(providing_args=['instances', 'pk_list'])
+post_bulk_delete = django.dispatch.Signal(providing_args=['instances', 'pk_list'])
+pre_bulk_undelete = django.dispatch.Signal(providing_args=['instances', 'pk_list'])
+post_bulk_undelete = django.dispatch.Signal(providing_args=['instances', 'pk_list'])
@@ -0,0 +1,7 @@
+# pylint: disable=C0103
+
+import django.dispatch
+
+__all__ = ['generation_changed']
+
+generation_changed = django.dispatch.Signal(providing_args=['generation'])
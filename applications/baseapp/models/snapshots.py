@@ -0,0 +1,181 @@
+# pylint: disable=W0212
+
+import logging
+from contextvars import ContextVar
+from types import MappingProxyType
+
+from django.core.signals import (
+    request_finished,
+    request_started,
+)
+from django.db import router
+
+from ..utils import console
+from ..utils.invalidation import get_invalidation_bus
+from .cache import (
+    get_generation_key,
+    get_object_cache,
+    is_bump_pending,
+    read_generations,
+)
+from .signals import generation_changed
+
+__all__ = ['Snapshot', 'SnapshotRegistry', 'snapshots']
+
+console = console(source=__name__)
+logger = logging.getLogger('app')
+
+# models whose generation is checked in the current request, `None`
+# outside of requests...
+checked_models = ContextVar('checked_models', default=None)
+
+
+class Snapshot:
+    """
+    Read-only active rows of a model, indexed by pk and `lookup_fields`.
+    Objects are shared by every thread of the process, don't change them.
+
+        snapshot = Category.objects.snapshot()
+        snapshot.get(pk=1)
+        snapshot.get(slug='python')
+        [category.title for category in snapshot]
+
+    """
+
+    __slots__ = ('model', 'generation', 'objects', 'by_pk', 'lookups')
+
+    def __init__(self, model, generation, objects, lookup_fields=()):
+        self.model = model
+        self.generation = generation
+        self.objects = tuple(objects)
+        self.by_pk = MappingProxyType({obj.pk: obj for obj in self.objects})
+        self.lookups = MappingProxyType(
+            {
+                field_name: MappingProxyType({getattr(obj, field_name): obj for obj in self.objects})
+                for field_name in lookup_fields
+            }
+        )
+
+    def __repr__(self):
+        return '<Snapshot: {0}, {1} objects>'.format(self.model._meta.label, len(self.objects))
+
+    def __len__(self):
+        return len(self.objects)
+
+    def __iter__(self):
+        return iter(self.objects)
+
+    def get(self, **kwargs):
+        """
+        Returns the object of a single `pk` or lookup field value, raises
+        `DoesNotExist` like `QuerySet.get()`.
+        """
+
+        if len(kwargs) != 1:
+            raise TypeError('Snapshot.get() takes exactly one lookup')
+        ((field_name, value),) = kwargs.items()
+        if field_name == 'pk':
+            index = self.by_pk
+            value = self.model._meta.pk.to_python(value)
+        elif field_name in self.lookups:
+            index = self.lookups[field_name]
+        else:
+            raise ValueError('{0} is not a lookup field of {1}'.format(field_name, self))
+
+        try:
+            return index[value]
+        except KeyError:
+            raise self.model.DoesNotExist('{0} matching {1}={2!r} does not exist.'.format(self, field_name, value))
+
+
+def get_lookup_fields(model):
+    lookup_fields = getattr(model, 'snapshot_lookup_fields', None)
+    if lookup_fields is None:
+        lookup_fields = [field.name for field in model._meta.concrete_fields if field.name == 'slug']
+    return tuple(lookup_fields)
+
+
+def load_snapshot(model, generation, using=None):
+    queryset = model._base_manager.using(using).filter(status=model.STATUS_ONLINE).order_by('pk')
+    if any(field.name == 'deleted_at' for field in model._meta.concrete_fields):
+        queryset = queryset.filter(deleted_at__isnull=True)
+    return Snapshot(model, generation, queryset, lookup_fields=get_lookup_fields(model))
+
+
+class SnapshotRegistry:
+    """
+    Process-local snapshots of models which have `snapshot = True`. Shared
+    generation of the model (see `bump_generation()`) is read from the
+    cache at most once per request, the snapshot is reloaded when it has
+    changed. Outside of requests, it is read on every access. Invalidation
+    bus events of other workers drop snapshots at request start.
+    """
+
+    def __init__(self):
+        self.snapshots = {}
+
+    def get(self, model, using=None):
+        model = model._meta.concrete_model
+        snapshot = self.snapshots.get(model)
+        checked = checked_models.get()
+        if snapshot is not None and checked is not None and model in checked:
+            return snapshot
+
+        if is_bump_pending(model, router.db_for_write(model)):
+            # changed in the current transaction, not shared...
+            return load_snapshot(model, None, using=using)
+
+        cache = get_object_cache()
+        generation_key = get_generation_key(model)
+        (generation,) = read_generations(cache, cache.get_many([generation_key]), [generation_key])
+        if checked is not None:
+            checked.add(model)
+
+        if snapshot is None or snapshot.generation != generation:
+            snapshot = load_snapshot(model, generation, using=using)
+            self.snapshots[model] = snapshot
+        return snapshot
+
+    def discard(self, model):
+        self.snapshots.pop(model._meta.concrete_model, None)
+
+    def discard_label(self, label):
+        for model in list(self.snapshots):
+            if model._meta.label_lower == label:
+                self.discard(model)
+
+    def clear(self):
+        self.snapshots.clear()
+
+
+snapshots = SnapshotRegistry()
+
+
+def start_request(sender, **kwargs):  # pylint: disable=W0613
+    checked_models.set(set())
+
+
+def finish_request(sender, **kwargs):  # pylint: disable=W0613
+    checked_models.set(None)
+
+
+def discard_snapshot(sender, **kwargs):  # pylint: disable=W0613
+    # changed by this process, reload on next access...
+    checked = checked_models.get()
+    if checked is not None:
+        checked.discard(sender)
+    snapshots.discard(sender)
+
+
+def drop_snapshot(label, pk):  # pylint: disable=W0613
+    # changed by another worker...
+    if label is None:
+        snapshots.clear()
+    else:
+        snapshots.discard_label(label)
+
+
+request_started.connect(start_request, dispatch_uid='snapshots')
+request_finished.connect(finish_request, dispatch_uid='snapshots')
+generation_changed.connect(discard_snapshot, dispatch_uid='snapshots')
+get_invalidation_bus().subscribe(drop_snapshot)
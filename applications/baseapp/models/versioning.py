@@ -0,0 +1,103 @@
+# pylint: disable=W0212
+
+import logging
+import time
+from functools import reduce, wraps
+from operator import or_
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models, transaction
+from django.db.models.signals import class_prepared
+from django.utils.translation import ugettext_lazy as _
+
+from ..utils import console
+
+__all__ = ['VERSION_FIELD_NAME', 'VersionConflict', 'retry_on_conflict']
+
+console = console(source=__name__)
+logger = logging.getLogger('app')
+
+VERSION_FIELD_NAME = 'version'
+VERSION_CONFLICT_ATTEMPTS = 3
+VERSION_CONFLICT_DELAY = 0.05
+
+
+class VersionConflict(Exception):
+    """
+    Raised when a row is changed by someone else after it is read, the
+    `version` column doesn't match anymore.
+    """
+
+    def __init__(self, model, pk_list):
+        self.model = model
+        self.pk_list = list(pk_list)
+        super().__init__(
+            '{0} {1} changed since it was read'.format(model._meta.label, ', '.join(str(pk) for pk in self.pk_list))
+        )
+
+
+def uses_versioning(model):
+    return getattr(model, 'optimistic_locking', False) and not model._meta.abstract
+
+
+def get_version_field(model):
+    return model._meta.get_field(VERSION_FIELD_NAME)
+
+
+def version_increment():
+    return models.F(VERSION_FIELD_NAME) + 1
+
+
+def get_versions_filter(objs):
+    """
+    Returns `Q(pk=1, version=3) | Q(pk=2, version=7) ...` of `objs`.
+    """
+
+    return reduce(or_, [models.Q(pk=obj.pk, **{VERSION_FIELD_NAME: getattr(obj, VERSION_FIELD_NAME)}) for obj in objs])
+
+
+def retry_on_conflict(attempts=VERSION_CONFLICT_ATTEMPTS, delay=VERSION_CONFLICT_DELAY, using=None):
+    """
+    Runs the decorated function again on `VersionConflict`, up to
+    `attempts` times, waiting `delay` seconds more before each retry. Every
+    attempt runs in its own transaction (savepoint), the function must
+    read the objects it changes:
+
+        @retry_on_conflict(attempts=5)
+        def publish(pk):
+            post = Post.objects.get(pk=pk)
+            post.status = Post.STATUS_ONLINE
+            post.save()
+
+    """
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            for attempt in range(1, attempts + 1):
+                try:
+                    with transaction.atomic(using=using):
+                        return func(*args, **kwargs)
+                except VersionConflict as err:
+                    if attempt == attempts:
+                        raise
+                    logger.info('%s, retrying %s (%s/%s)', err, func.__name__, attempt, attempts)
+                    time.sleep(delay * attempt)
+            return None
+
+        return wrapper
+
+    return decorator
+
+
+def register_version_field(sender, **kwargs):  # pylint: disable=W0613
+    if not uses_versioning(sender) or sender._meta.proxy:
+        return
+    try:
+        sender._meta.get_field(VERSION_FIELD_NAME)
+    except FieldDoesNotExist:
+        field = models.PositiveIntegerField(default=1, editable=False, verbose_name=_('version'))
+        field.contribute_to_class(sender, VERSION_FIELD_NAME)
+
+
+class_prepared.connect(register_version_field)
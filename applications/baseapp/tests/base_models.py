@@ -1,8 +1,14 @@
 # pylint: disable=R0903
 
+import datetime
+
 from django.db import models
 
-from ..models import BaseModel, BaseModelWithSoftDelete
+from ..models import (
+    BaseModel,
+    BaseModelWithSoftDelete,
+    TimeOrderedUUIDField,
+)
 
 
 class BasicPost(BaseModel):
@@ -55,3 +61,204 @@ class Member(BaseModelWithSoftDelete):
 
     def __str__(self):
         return self.title
+
+
+class ArchivedCategory(BaseModelWithSoftDelete):
+    title = models.CharField(max_length=255)
+
+    soft_delete_archive_after = datetime.timedelta(days=30)
+
+    class Meta:
+        managed = False
+
+    def __str__(self):
+        return self.title
+
+
+class ArchivedPost(BaseModelWithSoftDelete):
+    category = models.ForeignKey(to='ArchivedCategory', on_delete=models.CASCADE, related_name='posts')
+    title = models.CharField(max_length=255)
+
+    soft_delete_archive_after = datetime.timedelta(days=30)
+
+    class Meta:
+        managed = False
+
+    def __str__(self):
+        return self.title
+
+
+class CountedCategory(BaseModelWithSoftDelete):
+    title = models.CharField(max_length=255)
+
+    status_counters = True
+
+    class Meta:
+        managed = False
+
+    def __str__(self):
+        return self.title
+
+
+class CountedPost(BaseModelWithSoftDelete):
+    category = models.ForeignKey(to='CountedCategory', on_delete=models.CASCADE, related_name='posts')
+    title = models.CharField(max_length=255)
+
+    status_counters = True
+
+    class Meta:
+        managed = False
+
+    def __str__(self):
+        return self.title
+
+
+class IndexedPost(BaseModelWithSoftDelete):
+    title = models.CharField(max_length=255)
+
+    status_indexes = True
+
+    class Meta:
+        managed = False
+
+    def __str__(self):
+        return self.title
+
+
+class Product(BaseModel):
+    sku = models.CharField(max_length=32, unique=True)
+    title = models.CharField(max_length=255)
+
+    status_counters = True
+
+    class Meta:
+        managed = False
+
+    def __str__(self):
+        return self.title
+
+
+class CachedCategory(BaseModelWithSoftDelete):
+    title = models.CharField(max_length=255)
+
+    object_cache = True
+    queryset_cache = True
+
+    class Meta:
+        managed = False
+
+    def __str__(self):
+        return self.title
+
+
+class CachedPost(BaseModelWithSoftDelete):
+    category = models.ForeignKey(to='CachedCategory', on_delete=models.CASCADE, related_name='posts')
+    title = models.CharField(max_length=255)
+
+    object_cache = True
+    queryset_cache = True
+
+    class Meta:
+        managed = False
+
+    def __str__(self):
+        return self.title
+
+
+class Tag(BaseModelWithSoftDelete):
+    slug = models.SlugField(unique=True)
+    title = models.CharField(max_length=255)
+
+    snapshot = True
+
+    class Meta:
+        managed = False
+
+    def __str__(self):
+        return self.title
+
+
+class VersionedCategory(BaseModelWithSoftDelete):
+    title = models.CharField(max_length=255)
+
+    optimistic_locking = True
+
+    class Meta:
+        managed = False
+
+    def __str__(self):
+        return self.title
+
+
+class VersionedPost(BaseModelWithSoftDelete):
+    category = models.ForeignKey(to='VersionedCategory', on_delete=models.CASCADE, related_name='posts')
+    title = models.CharField(max_length=255)
+
+    optimistic_locking = True
+
+    class Meta:
+        managed = False
+
+    def __str__(self):
+        return self.title
+
+
+class VersionedProduct(BaseModel):
+    sku = models.CharField(max_length=32, unique=True)
+    title = models.CharField(max_length=255)
+
+    optimistic_locking = True
+
+    class Meta:
+        managed = False
+
+    def __str__(self):
+        return self.title
+
+
+class TimeOrderedPost(BaseModelWithSoftDelete):
+    title = models.CharField(max_length=255)
+
+    time_ordered_pk = True
+
+    class Meta:
+        managed = False
+
+    def __str__(self):
+        return self.title
+
+
+class LegacyPost(BaseModel):
+    title = models.CharField(max_length=255)
+    time_ordered_id = TimeOrderedUUIDField(null=True)
+
+    class Meta:
+        managed = False
+
+    def __str__(self):
+        return self.title
+
+
+class FeedCategory(BaseModelWithSoftDelete):
+    title = models.CharField(max_length=255)
+
+    change_feed = True
+
+    class Meta:
+        managed = False
+
+    def __str__(self):
+        return self.title
+
+
+class FeedPost(BaseModelWithSoftDelete):
+    category = models.ForeignKey(to='FeedCategory', on_delete=models.CASCADE, related_name='posts')
+    title = models.CharField(max_length=255)
+
+    change_feed = True
+
+    class Meta:
+        managed = False
+
+    def __str__(self):
+        return self.title
@@ -0,0 +1,168 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.admin import AdminSite, helpers
+from django.contrib.messages.storage.cookie import (
+    CookieStorage,
+)
+from django.core.management import call_command
+from django.db import connections
+from django.test import (
+    RequestFactory,
+    TestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import path
+from django.utils import timezone
+
+from ..admin import CustomBaseModelAdminWithSoftDelete
+from ..admin.base import (
+    hard_delete_selected,
+    recover_selected,
+)
+from ..models import AdminJob, User
+from ..models.jobs import claim_job, enqueue_job, run_job
+from .base_models import Category, Post
+
+site = AdminSite(name='jobs_admin')
+site.register(Category, CustomBaseModelAdminWithSoftDelete)
+
+urlpatterns = [path('admin/', site.urls)]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class AdminJobsTestCase(TestCase):
+    """Unit tests of background admin actions"""
+
+    @classmethod
+    def setUpTestData(cls):  # noqa: N802
+        with connections['default'].schema_editor() as schema_editor:
+            schema_editor.create_model(Category)
+            schema_editor.create_model(Post)
+
+        cls.user = User.objects.create(email='admin@example.com', is_active=True, is_staff=True, is_superuser=True)
+        cls.categories = [Category.objects.create(title='Category {0}'.format(i)) for i in range(3)]
+        for category in cls.categories:
+            Post.objects.bulk_create([Post(category=category, title='Post {0}'.format(i)) for i in range(2)])
+
+    def setUp(self):
+        self.model_admin = site._registry[Category]  # pylint: disable=W0212
+        self.model_admin.background_action_threshold = 2
+
+    def tearDown(self):
+        self.model_admin.background_action_threshold = None
+
+    def get_request(self, **data):
+        request = RequestFactory().post('/', data)
+        request.user = self.user
+        request._messages = CookieStorage(request)  # pylint: disable=W0212
+        return request
+
+    def test_hard_delete_selected_is_queued(self):
+        request = self.get_request(post='yes')
+        # threshold check and insert of the job, no counts of the cascade...
+        with self.assertNumQueries(2):
+            response = hard_delete_selected(self.model_admin, request, Category.objects.all())
+        job = AdminJob.objects.get()
+        self.assertEqual(response.url, '/admin/baseapp/category/jobs/{0}/'.format(job.pk))
+        self.assertEqual((job.action, job.model_label, job.created_by), ('hard_delete', 'baseapp.Category', self.user))
+        self.assertEqual(Category.objects.count(), 3)
+
+        out = StringIO()
+        call_command('run_admin_jobs', '--once', '--batch-size=2', stdout=out)
+        self.assertIn('9 rows processed', out.getvalue())
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.total, job.processed), (AdminJob.STATUS_DONE, 3, 9))
+        self.assertIsNotNone(job.rate)
+        self.assertFalse(Category.objects.all().exists())
+        self.assertFalse(Post.objects.all().exists())
+
+    def test_select_across_hard_delete_is_queued_through_changelist(self):
+        self.client.force_login(self.user)
+        data = {
+            'action': 'hard_delete_selected',
+            'select_across': '1',
+            'index': '0',
+            helpers.ACTION_CHECKBOX_NAME: [self.categories[0].pk],
+            'post': 'yes',
+        }
+        response = self.client.post('/admin/baseapp/category/', data)
+        job = AdminJob.objects.get()
+        self.assertRedirects(response, '/admin/baseapp/category/jobs/{0}/'.format(job.pk))
+        self.assertEqual(
+            list(job.get_selection().order_by('pk').values_list('pk', flat=True)),
+            sorted(category.pk for category in self.categories),
+        )
+
+        run_job(claim_job(), batch_size=2)
+        self.assertFalse(Category.objects.all().exists())
+        self.assertFalse(Post.objects.all().exists())
+
+    def test_small_selections_run_in_request(self):
+        self.assertIsNone(
+            recover_selected(self.model_admin, self.get_request(), Category.objects.filter(pk=self.categories[0].pk))
+        )
+        self.assertFalse(AdminJob.objects.exists())
+
+        # without a threshold, selections are not counted...
+        self.model_admin.background_action_threshold = None
+        with CaptureQueriesContext(connections['default']) as context:
+            recover_selected(self.model_admin, self.get_request(), Category.objects.all())
+        self.assertFalse([query for query in context.captured_queries if 'COUNT(' in query['sql']])
+
+    def test_recover_selected_job(self):
+        Category.objects.all().delete()
+        recover_selected(self.model_admin, self.get_request(), Category.objects.deleted())
+        job = claim_job()
+        self.assertEqual(job.status, AdminJob.STATUS_RUNNING)
+        self.assertIsNone(claim_job())
+
+        run_job(job, batch_size=2)
+        self.assertEqual(Category.objects.count(), 3)
+        self.assertEqual(Post.objects.count(), 6)
+
+    def test_enqueue_reads_no_rows(self):
+        # only the job is inserted...
+        with self.assertNumQueries(1):
+            job = enqueue_job('undelete', Category.objects.filter(title__startswith='Category'))
+        self.assertEqual(job.get_selection().count(), 3)
+
+    def test_stale_job_is_resumed(self):
+        Category.objects.all().delete()
+        job = enqueue_job('undelete', Category.objects.deleted())
+        claim_job()
+        # the worker died after the first batch...
+        first = Category.objects.order_by('pk').first()
+        AdminJob.objects.filter(pk=job.pk).update(
+            total=3, processed=3, last_pk=str(first.pk), updated_at=timezone.now() - timedelta(hours=1)
+        )
+        Category.objects.filter(pk=first.pk).update(title='Not recovered')
+
+        with self.settings(ADMIN_JOB_STALE_TIMEOUT=3600 * 2):
+            self.assertIsNone(claim_job())
+        with self.assertLogs('app', 'WARNING'):
+            job = claim_job()
+        self.assertEqual((job.status, job.last_pk), (AdminJob.STATUS_RUNNING, str(first.pk)))
+        self.assertIsNone(claim_job())
+
+        job = run_job(job, batch_size=2)
+        self.assertEqual((job.status, job.total, job.processed), (AdminJob.STATUS_DONE, 3, 9))
+        self.assertEqual(Category.objects.all().count(), 2)
+        self.assertTrue(Category.objects.deleted().filter(pk=first.pk).exists())
+
+    def test_failed_job(self):
+        job = enqueue_job('undelete', Category.objects.all())
+        AdminJob.objects.filter(pk=job.pk).update(model_label='baseapp.Missing')
+        with self.assertLogs('app', 'ERROR'):
+            job = run_job(claim_job())
+        self.assertEqual(job.status, AdminJob.STATUS_FAILED)
+        self.assertIn('Missing', AdminJob.objects.get(pk=job.pk).error)
+
+    def test_job_view(self):
+        job = enqueue_job('hard_delete', Category.objects.all(), user=self.user)
+        self.client.force_login(self.user)
+        response = self.client.get('/admin/baseapp/category/jobs/{0}/'.format(job.pk))
+        self.assertContains(response, 'data-interval="2000"')
+        response = self.client.get('/admin/baseapp/category/jobs/{0}/?format=json'.format(job.pk))
+        self.assertEqual(response.json()['status'], 'pending')
@@ -0,0 +1,90 @@
+import datetime
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connections
+from django.test import TestCase
+from django.utils import timezone
+
+from ..models.archive import get_archive_model
+from ..utils import console
+from .base_models import ArchivedCategory, ArchivedPost
+
+console = console(source=__name__)
+
+
+class SoftDeleteArchiveTestCase(TestCase):
+    """Unit tests of soft delete archive tables"""
+
+    @classmethod
+    def setUpTestData(cls):  # noqa: N802
+        with connections['default'].schema_editor() as schema_editor:
+            for model in [ArchivedCategory, ArchivedPost]:
+                schema_editor.create_model(model)
+                schema_editor.create_model(get_archive_model(model))
+
+        cls.category = ArchivedCategory.objects.create(title='Python')
+        cls.posts = [
+            ArchivedPost.objects.create(category=cls.category, title='Python post 1'),
+            ArchivedPost.objects.create(category=cls.category, title='Python post 2'),
+        ]
+
+    def delete_category(self, days_ago=40):
+        self.category.delete()
+        deleted_at = timezone.now() - datetime.timedelta(days=days_ago)
+        for model in [ArchivedCategory, ArchivedPost]:
+            model.objects.filter(deleted_batch=self.category.deleted_batch).update(deleted_at=deleted_at)
+
+    def test_archive_model(self):
+        archive_model = get_archive_model(ArchivedPost)
+        self.assertEqual(archive_model._meta.db_table, 'baseapp_archivedpost_archive')
+        self.assertEqual(
+            [field.column for field in archive_model._meta.concrete_fields],
+            [field.column for field in ArchivedPost._meta.concrete_fields],
+        )
+
+    def test_archive_deleted(self):
+        self.delete_category()
+        archived = ArchivedCategory.objects.archive_deleted(batch_size=1)
+        self.assertEqual(archived, (3, {'baseapp.ArchivedCategory': 1, 'baseapp.ArchivedPost': 2}))
+        self.assertEqual(ArchivedPost.objects.count(), 0)
+        self.assertEqual(get_archive_model(ArchivedPost).objects.count(), 2)
+
+        self.assertEqual(ArchivedCategory.objects.deleted().count(), 0)
+        self.assertEqual(list(ArchivedCategory.objects.archived().values_list('title', flat=True)), ['Python'])
+        self.assertEqual(ArchivedPost.objects.archived().count(), 2)
+
+        # deleted() is a plain queryset of the live table...
+        self.assertEqual(ArchivedPost.objects.deleted().filter(title='Python post 1').update(title='Post'), 0)
+
+    def test_archive_skips_recent_and_referenced_batches(self):
+        self.delete_category(days_ago=1)
+        self.assertEqual(ArchivedCategory.objects.archive_deleted(), (0, {}))
+
+        self.category.undelete()
+        self.posts[0].delete()
+        self.category.delete()
+        ArchivedPost.objects.deleted().update(deleted_at=timezone.now() - datetime.timedelta(days=40))
+        ArchivedCategory.objects.deleted().update(deleted_at=timezone.now() - datetime.timedelta(days=40))
+        self.posts[1].undelete()
+
+        with self.assertLogs('app', level='WARNING'):
+            self.assertEqual(ArchivedCategory.objects.archive_deleted(), (0, {}))
+        self.assertEqual(ArchivedPost.objects.archive_deleted(), (1, {'baseapp.ArchivedPost': 1}))
+
+    def test_undelete_archived(self):
+        self.delete_category()
+        ArchivedCategory.objects.archive_deleted()
+
+        undeleted = ArchivedCategory.objects.restore_archived([self.category.pk])
+        self.assertEqual(undeleted, (3, {'baseapp.ArchivedCategory': 1, 'baseapp.ArchivedPost': 2}))
+        self.assertQuerysetEqual(ArchivedCategory.objects.actives(), ['<ArchivedCategory: Python>'])
+        self.assertEqual(ArchivedPost.objects.actives().count(), 2)
+        self.assertEqual(get_archive_model(ArchivedPost).objects.count(), 0)
+
+    def test_archive_softdeleted_command(self):
+        self.delete_category()
+
+        out = StringIO()
+        call_command('archive_softdeleted', 'baseapp.ArchivedCategory', stdout=out)
+        self.assertIn('baseapp.ArchivedCategory: 3 rows archived', out.getvalue())
@@ -1,5 +1,8 @@
+import re
+
 from django.db import connections
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
 from .base_models import BasicPost
 
@@ -39,3 +42,46 @@ class BaseModelTestCase(TestCase):
         self.assertQuerysetEqual(BasicPost.objects.offlines(), ['<BasicPost: Test Post 3>'])
         self.assertQuerysetEqual(BasicPost.objects.deleted(), ['<BasicPost: Test Post 2>'])
         self.assertQuerysetEqual(BasicPost.objects.drafts(), ['<BasicPost: Test Post 4>'])
+
+    def test_basemodel_status_counts(self):
+        """Test status counts"""
+
+        self.assertEqual(BasicPost.objects.status_counts(), {0: 1, 1: 1, 2: 1, 3: 1})
+        self.assertEqual(BasicPost.objects.filter(title='Test Post 1').status_counts(), {0: 0, 1: 1, 2: 0, 3: 0})
+
+    def get_updated_columns(self, obj):
+        with CaptureQueriesContext(connections['default']) as queries:
+            obj.save()
+        self.assertEqual(len(queries), 1)
+        sql = queries[0]['sql']
+        self.assertTrue(sql.startswith('UPDATE'))
+        set_clause = sql.split(' SET ', 1)[1].split(' WHERE ', 1)[0]
+        return re.findall(r'"(\w+)" =', set_clause)
+
+    def test_basemodel_save_dirty_fields(self):
+        """Test plain saves update only changed fields"""
+
+        post = BasicPost.objects.get(pk=self.post.pk)
+        self.assertEqual(post.get_dirty_fields(), [])
+        post.title = 'Changed'
+        self.assertEqual(post.get_dirty_fields(), ['title'])
+        self.assertEqual(self.get_updated_columns(post), ['updated_at', 'title'])
+        self.assertEqual(post.get_dirty_fields(), [])
+        # saved fields are clean...
+        self.assertEqual(self.get_updated_columns(post), ['updated_at'])
+        self.assertEqual(BasicPost.objects.get(pk=post.pk).title, 'Changed')
+
+        post = BasicPost(title='New')
+        self.assertIsNone(post.get_dirty_fields())
+        post.save()
+        post.status = BasicPost.STATUS_OFFLINE
+        self.assertEqual(self.get_updated_columns(post), ['updated_at', 'status'])
+
+    def test_basemodel_save_deleted_row(self):
+        """Test plain saves insert rows which are deleted meanwhile"""
+
+        post = BasicPost.objects.get(pk=self.post.pk)
+        BasicPost.objects.filter(pk=post.pk).delete()
+        post.title = 'Changed'
+        post.save()
+        self.assertEqual(BasicPost.objects.get(pk=post.pk).title, 'Changed')
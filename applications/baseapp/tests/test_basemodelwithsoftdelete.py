@@ -1,6 +1,22 @@
+import datetime
+from io import StringIO
+from unittest import mock
+
+from django.contrib.admin import site
+from django.core.management import call_command
 from django.db import connections
+from django.db.models import Prefetch
+from django.db.models.signals import post_delete
 from django.test import TestCase
+from django.utils import timezone
 
+from ..admin import CustomBaseModelAdminWithSoftDelete
+from ..models import include_deleted_relations
+from ..models.base import (
+    SoftDeleteCollector,
+    SoftDeleteProgress,
+)
+from ..models.signals import post_bulk_delete
 from ..utils import console
 from .base_models import Category, Member, Person, Post
 
@@ -75,3 +91,266 @@ class BaseModelWithSoftDeleteTestCase(TestCase):
     def test_softdelete_all(self):
         deleted_posts = Post.objects.delete()
         self.assertEqual(deleted_posts, (2, {'baseapp.Post': 2}))
+
+    def test_softdelete_queryset_cascade(self):
+        deleted_categories = Category.objects.delete()
+        self.assertEqual(deleted_categories, (3, {'baseapp.Category': 1, 'baseapp.Post': 2}))
+        self.assertQuerysetEqual(Post.objects.all(), [])
+
+        undeleted_categories = Category.objects.deleted().undelete()
+        self.assertEqual(undeleted_categories, (3, {'baseapp.Category': 1, 'baseapp.Post': 2}))
+        self.assertQuerysetEqual(Post.objects.deleted(), [])
+
+    def test_softdelete_number_of_queries(self):
+        with self.assertNumQueries(2):
+            self.category.delete()
+        # find batch, check batch is not shared, one update per table
+        with self.assertNumQueries(4):
+            self.category.undelete()
+
+        with self.assertNumQueries(2):
+            self.member.delete()
+        with self.assertNumQueries(3):
+            self.member.undelete()
+
+        with self.assertNumQueries(3):
+            Category.objects.delete()
+
+    def test_softdelete_save_number_of_queries(self):
+        category = Category.objects.get(pk=self.category.pk)
+        category.status = Category.STATUS_DELETED
+        # update row, soft delete posts
+        with self.assertNumQueries(2):
+            category.save()
+        self.assertEqual(Post.objects.deleted().filter(deleted_batch=category.deleted_batch).count(), 2)
+
+        # status didn't change, no cascade
+        with self.assertNumQueries(1):
+            category.save()
+        category.status = Category.STATUS_OFFLINE
+        with self.assertNumQueries(1):
+            category.save()
+        self.assertQuerysetEqual(Category.objects.offlines(), ['<Category: Python>'])
+
+    def test_softdelete_save_update_fields(self):
+        post = Post.objects.get(title='Python post 1')
+        post.title = 'not saved'
+        post.status = Post.STATUS_DELETED
+        post.save(update_fields=['status'])
+
+        post = Post.objects.get(pk=post.pk)
+        self.assertEqual(post.title, 'Python post 1')
+        self.assertEqual(post.status, Post.STATUS_DELETED)
+        self.assertIsNotNone(post.deleted_at)
+        self.assertIsNotNone(post.deleted_batch)
+
+        post.status = Post.STATUS_ONLINE
+        post.save(update_fields=['status'])
+        self.assertQuerysetEqual(Post.objects.all().filter(pk=post.pk), ['<Post: Python post 1>'])
+        self.assertEqual(Post.objects.filter(pk=post.pk, deleted_at=None, deleted_batch=None).count(), 1)
+
+    def test_softdelete_related_managers(self):
+        self.posts[0].delete()
+        # soft delete removes m2m rows, mark as deleted without cascade...
+        Person.objects.filter(pk=self.people[0].pk).update(status=Person.STATUS_DELETED, deleted_at=timezone.now())
+
+        self.assertQuerysetEqual(self.category.posts.all(), ['<Post: Python post 2>'])
+        self.assertEqual(self.category.posts.count(), 1)
+        self.assertEqual(self.category.posts.filter(title__startswith='Python').count(), 1)
+        self.assertQuerysetEqual(self.category.posts.deleted(), ['<Post: Python post 1>'])
+        self.assertQuerysetEqual(self.member.members.all(), ['<Person: Person 2>'])
+        self.assertEqual(self.member.members.count(), 1)
+        self.assertEqual(self.people[1].member_set.count(), 1)
+
+        with include_deleted_relations():
+            self.assertEqual(self.category.posts.count(), 2)
+            self.assertEqual(self.member.members.count(), 2)
+
+        model_admin = CustomBaseModelAdminWithSoftDelete(Member, site)
+        self.assertEqual(model_admin.render_with_deleted_relations(self.member.members.count), 1)
+        model_admin.filter_deleted_relations = False
+        self.assertEqual(model_admin.render_with_deleted_relations(self.member.members.count), 2)
+
+        self.category.posts.undelete()
+        self.assertEqual(self.category.posts.count(), 2)
+
+    def test_softdelete_related_manager_writes(self):
+        # soft delete removes m2m rows, mark as deleted without cascade...
+        Person.objects.filter(pk=self.people[0].pk).update(status=Person.STATUS_DELETED, deleted_at=timezone.now())
+        through = Member.members.through
+
+        self.member.members.set([self.people[1]])
+        self.assertEqual(list(through.objects.values_list('person_id', flat=True)), [self.people[1].pk])
+
+        self.member.members.add(self.people[0])
+        self.member.members.remove(self.people[0])
+        self.assertEqual(through.objects.count(), 1)
+
+        self.member.members.add(self.people[0])
+        self.member.members.clear()
+        self.assertFalse(through.objects.exists())
+        self.assertEqual(self.member.members.count(), 0)
+
+    def test_softdelete_prefetch_related(self):
+        self.posts[0].delete()
+        # soft delete removes m2m rows, mark as deleted without cascade...
+        Person.objects.filter(pk=self.people[0].pk).update(status=Person.STATUS_DELETED, deleted_at=timezone.now())
+
+        with self.assertNumQueries(2):
+            category = Category.objects.prefetch_related('posts').get(pk=self.category.pk)
+            self.assertQuerysetEqual(category.posts.all(), ['<Post: Python post 2>'])
+        with self.assertNumQueries(2):
+            member = Member.objects.prefetch_related('members').get(pk=self.member.pk)
+            self.assertQuerysetEqual(member.members.all(), ['<Person: Person 2>'])
+
+        category = Category.objects.prefetch_related(
+            Prefetch('posts', queryset=Post.objects.order_by('-pk'), to_attr='post_list')
+        ).get(pk=self.category.pk)
+        self.assertEqual([post.title for post in category.post_list], ['Python post 2'])
+
+        with include_deleted_relations():
+            category = Category.objects.prefetch_related('posts').get(pk=self.category.pk)
+            member = Member.objects.prefetch_related(Prefetch('members', queryset=Person.objects.order_by('pk'))).get(
+                pk=self.member.pk
+            )
+        self.assertEqual(len(category.posts.all()), 2)
+        self.assertEqual(len(member.members.all()), 2)
+
+    def test_softdelete_chunked(self):
+        reports = []
+        deleted_category = self.category.delete(batch_size=1, progress=reports.append)
+        self.assertEqual(deleted_category, (3, {'baseapp.Category': 1, 'baseapp.Post': 2}))
+        self.assertEqual([report['total'] for report in reports], [1, 2, 3])
+        self.assertEqual(reports[-1]['label'], 'baseapp.Category')
+
+        undeleted_categories = Category.objects.undelete(batch_size=1)
+        self.assertEqual(undeleted_categories, (3, {'baseapp.Category': 1, 'baseapp.Post': 2}))
+        self.assertQuerysetEqual(Post.objects.deleted(), [])
+
+    def test_softdelete_chunked_resume(self):
+        reports = []
+
+        def interrupt(report):
+            reports.append(report)
+            raise RuntimeError('interrupted at {0}'.format(report['last_pk']))
+
+        with self.assertRaises(RuntimeError):
+            Category.objects.delete(batch_size=1, progress=interrupt)
+        self.assertEqual(Post.objects.deleted().count(), 1)
+        self.assertQuerysetEqual(Category.objects.deleted(), [])
+
+        deleted_batch = reports[0]['deleted_batch']
+        deleted_categories = Category.objects.delete(batch_size=1, deleted_batch=deleted_batch)
+        self.assertEqual(deleted_categories, (2, {'baseapp.Category': 1, 'baseapp.Post': 1}))
+        self.assertEqual(Post.objects.deleted().count(), 2)
+        self.assertEqual(set(Post.objects.deleted().values_list('deleted_batch', flat=True)), {deleted_batch})
+
+        # whole cascade is one batch...
+        restored = Category.objects.restore_deletion_batch(deleted_batch, batch_size=1)
+        self.assertEqual(restored, (3, {'baseapp.Category': 1, 'baseapp.Post': 2}))
+        self.assertQuerysetEqual(Post.objects.deleted(), [])
+
+    def test_softdelete_chunked_resume_undelete(self):
+        def interrupt(report):
+            raise RuntimeError('interrupted with {0}'.format(report['deleted_batch']))
+
+        with self.assertRaises(RuntimeError) as context:
+            self.category.delete(batch_size=1, progress=interrupt)
+        deleted_batch = str(context.exception).split()[-1]
+        self.category.delete(batch_size=1, deleted_batch=deleted_batch)
+
+        self.assertEqual(
+            Category.objects.get_queryset_with_deleted().get(pk=self.category.pk).undelete(),
+            (3, {'baseapp.Category': 1, 'baseapp.Post': 2}),
+        )
+        self.assertQuerysetEqual(Post.objects.deleted(), [])
+
+    def test_softdelete_bulk_signals(self):
+        bulk_calls = []
+        instance_calls = []
+
+        def bulk_receiver(sender, instances, pk_list, **kwargs):
+            bulk_calls.append(pk_list)
+
+        def instance_receiver(sender, instance, **kwargs):
+            instance_calls.append(instance.pk)
+
+        post_bulk_delete.connect(bulk_receiver, sender=Post)
+        post_delete.connect(instance_receiver, sender=Post)
+        try:
+            with mock.patch.object(Post, 'soft_delete_bulk_signals_only', True):
+                self.category.delete()
+        finally:
+            post_bulk_delete.disconnect(bulk_receiver, sender=Post)
+            post_delete.disconnect(instance_receiver, sender=Post)
+
+        self.assertEqual(bulk_calls, [[post.pk for post in self.posts]])
+        self.assertEqual(instance_calls, [])
+
+    def test_softdelete_undelete_restores_only_its_batch(self):
+        self.posts[0].delete()
+        self.category.delete()
+        self.assertNotEqual(Post.objects.get(pk=self.posts[0].pk).deleted_batch, Category.objects.get().deleted_batch)
+
+        undeleted_items = self.category.undelete()
+        self.assertEqual(undeleted_items, (2, {'baseapp.Category': 1, 'baseapp.Post': 1}))
+        self.assertQuerysetEqual(Post.objects.deleted(), ['<Post: Python post 1>'])
+
+    def test_collector_restore_after_resumed_delete(self):
+        def interrupt(report):
+            raise RuntimeError('interrupted')
+
+        collector = SoftDeleteCollector(using='default')
+        collector.collect([self.category])
+        progress = SoftDeleteProgress(callback=interrupt)
+        with self.assertRaises(RuntimeError):
+            collector.soft_delete(batch_size=1, progress=progress)
+        deleted_batch = progress.deleted_batch
+
+        collector = SoftDeleteCollector(using='default')
+        collector.collect([Category.objects.get(pk=self.category.pk)])
+        collector.soft_delete(batch_size=1, deleted_batch=deleted_batch)
+        self.assertEqual(Post.objects.deleted().filter(deleted_batch=deleted_batch).count(), 2)
+
+        restored = SoftDeleteCollector(using='default').restore(Category, deleted_batch, batch_size=1)
+        self.assertEqual(restored, (3, {'baseapp.Category': 1, 'baseapp.Post': 2}))
+        self.assertEqual(Post.objects.count(), 2)
+
+    def test_softdelete_deletion_batches(self):
+        Post.objects.delete()
+        batches = list(Post.objects.deletion_batches())
+        self.assertEqual(len(batches), 1)
+        self.assertEqual(batches[0]['count'], 2)
+
+        restored = Post.objects.restore_deletion_batch(batches[0]['deleted_batch'])
+        self.assertEqual(restored, (2, {'baseapp.Post': 2}))
+        self.assertQuerysetEqual(Post.objects.deletion_batches(), [])
+
+    def test_softdelete_undelete_part_of_batch(self):
+        Post.objects.delete()
+        undeleted_posts = Post.objects.filter(pk=self.posts[1].pk).undelete()
+        self.assertEqual(undeleted_posts, (1, {'baseapp.Post': 1}))
+        self.assertQuerysetEqual(Post.objects.deleted(), ['<Post: Python post 1>'])
+
+    def test_purge_deleted(self):
+        self.category.delete()
+        self.posts[0].undelete()
+        Post.objects.deleted().update(deleted_at=timezone.now() - datetime.timedelta(days=40))
+
+        purged = Post.objects.purge_deleted(older_than=datetime.timedelta(days=30), dry_run=True)
+        self.assertEqual(purged, (1, {'baseapp.Post': 1}))
+        self.assertEqual(Post.objects.deleted().count(), 1)
+
+        purged = Post.objects.purge_deleted(older_than=datetime.timedelta(days=30), batch_size=1)
+        self.assertEqual(purged, (1, {'baseapp.Post': 1}))
+        self.assertQuerysetEqual(Post.objects.deleted(), [])
+        self.assertEqual(Category.objects.purge_deleted(older_than=datetime.timedelta(days=30)), (0, {}))
+
+    def test_purge_softdeleted_command(self):
+        self.category.delete()
+        Category.objects.update(deleted_at=timezone.now() - datetime.timedelta(days=40))
+
+        out = StringIO()
+        call_command('purge_softdeleted', 'baseapp.Category', days=30, stdout=out)
+        self.assertIn('baseapp.Category: 3 rows deleted', out.getvalue())
+        self.assertEqual(Post.objects.count(), 0)
@@ -0,0 +1,85 @@
+import datetime
+
+from django.db import connections
+from django.test import TestCase
+from django.utils import timezone
+
+from .base_models import Product, Tag
+
+
+class BulkOperationsTestCase(TestCase):
+    """Unit tests of bulk create / update / upsert"""
+
+    @classmethod
+    def setUpTestData(cls):  # noqa: N802
+        with connections['default'].schema_editor() as schema_editor:
+            schema_editor.create_model(Product)
+            schema_editor.create_model(Tag)
+
+        Product.objects.bulk_create(
+            [Product(sku='sku-{0}'.format(i), title='Product {0}'.format(i)) for i in range(3)], batch_size=2
+        )
+        cls.long_ago = timezone.now() - datetime.timedelta(days=10)
+        Product.objects.update(created_at=cls.long_ago, updated_at=cls.long_ago)
+
+    def test_bulk_create(self):
+        self.assertEqual(Product.objects.count(), 3)
+        self.assertEqual(Product.objects.status_counts(), {0: 0, 1: 3, 2: 0, 3: 0})
+
+    def test_bulk_update(self):
+        products = list(Product.objects.order_by('sku'))
+        for product in products:
+            product.title = product.title.upper()
+
+        with self.assertNumQueries(2):
+            updated = Product.objects.bulk_update(products, ['title'], batch_size=2)
+        self.assertEqual(updated, 3)
+
+        products[0].status = Product.STATUS_OFFLINE
+        Product.objects.bulk_update(products, ['status'])
+
+        self.assertQuerysetEqual(
+            Product.objects.order_by('sku'), ['<Product: PRODUCT 0>', '<Product: PRODUCT 1>', '<Product: PRODUCT 2>']
+        )
+        self.assertEqual(Product.objects.filter(updated_at__gt=self.long_ago).count(), 3)
+        self.assertEqual(Product.objects.values('updated_at').distinct().count(), 1)
+        self.assertEqual(Product.objects.status_counts(), {0: 1, 1: 2, 2: 0, 3: 0})
+
+    def test_bulk_upsert(self):
+        created, updated = Product.objects.bulk_upsert(
+            [
+                Product(sku='sku-1', title='New 1', status=Product.STATUS_DRAFT),
+                Product(sku='sku-3', title='Product 3'),
+                Product(sku='sku-3', title='New 3'),
+            ],
+            unique_fields=['sku'],
+            update_fields=['title', 'status'],
+        )
+        self.assertEqual((created, updated), (1, 1))
+
+        self.assertQuerysetEqual(
+            Product.objects.order_by('sku'),
+            ['<Product: Product 0>', '<Product: New 1>', '<Product: Product 2>', '<Product: New 3>'],
+        )
+        product = Product.objects.get(sku='sku-1')
+        self.assertEqual(product.created_at, self.long_ago)
+        self.assertGreater(product.updated_at, self.long_ago)
+        self.assertEqual(Product.objects.status_counts(), {0: 0, 1: 3, 2: 0, 3: 1})
+
+    def test_bulk_upsert_keeps_soft_delete_fields(self):
+        Tag.objects.bulk_create([Tag(slug='python', title='Python'), Tag(slug='django', title='Django')])
+        Tag.objects.get(slug='python').delete()
+
+        Tag.objects.bulk_upsert(
+            [Tag(slug='python', title='New Python'), Tag(slug='django', title='New Django')], unique_fields=['slug']
+        )
+        tag = Tag.objects.deleted().get(slug='python')
+        self.assertEqual(tag.title, 'New Python')
+        self.assertIsNotNone(tag.deleted_at)
+        self.assertIsNotNone(tag.deleted_batch)
+        self.assertEqual(list(Tag.objects.all().values_list('title', flat=True)), ['New Django'])
+
+        Tag.objects.bulk_upsert(
+            [Tag(slug='python', title='Python')], unique_fields=['slug'], update_fields=['status', 'deleted_at']
+        )
+        self.assertEqual(Tag.objects.get(slug='python').status, Tag.STATUS_ONLINE)
@@ -0,0 +1,119 @@
+from django.contrib.admin import AdminSite, helpers, site
+from django.contrib.messages.storage.cookie import (
+    CookieStorage,
+)
+from django.db import connections
+from django.test import (
+    RequestFactory,
+    TestCase,
+    override_settings,
+)
+from django.urls import path
+
+from ..admin import CustomBaseModelAdminWithSoftDelete
+from ..admin.base import hard_delete_selected
+from ..admin.deletion import get_deletion_summary
+from ..models import User
+from .base_models import Category, Post
+
+
+class CategoryAdmin(CustomBaseModelAdminWithSoftDelete):
+    hard_delete_summary_threshold = 2
+
+
+summary_site = AdminSite(name='summary_admin')
+summary_site.register(Category, CategoryAdmin)
+
+urlpatterns = [path('admin/', summary_site.urls)]
+
+
+class DeletionSummaryTestCase(TestCase):
+    """Unit tests of summarized hard delete confirmations"""
+
+    @classmethod
+    def setUpTestData(cls):  # noqa: N802
+        with connections['default'].schema_editor() as schema_editor:
+            schema_editor.create_model(Category)
+            schema_editor.create_model(Post)
+
+        cls.categories = [Category.objects.create(title='Category {0}'.format(i)) for i in range(3)]
+        for category in cls.categories:
+            Post.objects.bulk_create([Post(category=category, title='Post {0}'.format(i)) for i in range(4)])
+
+    def setUp(self):
+        self.model_admin = CustomBaseModelAdminWithSoftDelete(Category, site)
+        self.model_admin.hard_delete_summary_threshold = 2
+        self.model_admin.hard_delete_sample_size = 2
+        self.model_admin.hard_delete_batch_size = 2
+
+    def get_request(self, **data):
+        request = RequestFactory().post('/', data)
+        request.user = User(is_active=True, is_staff=True, is_superuser=True)
+        request._messages = CookieStorage(request)  # pylint: disable=W0212
+        return request
+
+    def test_summary_counts_cascade(self):
+        queryset = Category.objects.all()
+        with self.assertNumQueries(3):
+            sample, model_count, perms_needed, protected = get_deletion_summary(
+                self.model_admin, self.get_request(), queryset, sample_size=2
+            )
+        self.assertEqual(sample, ['Category: Category 0', 'Category: Category 1'])
+        self.assertEqual(model_count, {'categorys': 3, 'posts': 12})
+        self.assertEqual(perms_needed, set())
+        self.assertEqual(protected, [])
+
+    def test_summarized_confirmation(self):
+        request = self.get_request(**{helpers.ACTION_CHECKBOX_NAME: [category.pk for category in self.categories]})
+        response = hard_delete_selected(self.model_admin, request, Category.objects.all())
+        self.assertTrue(response.context_data['summarized'])
+        self.assertEqual(dict(response.context_data['model_count']), {'categorys': 3, 'posts': 12})
+
+        self.assertEqual(
+            response.context_data['deletable_objects'], [['Category: Category 0', 'Category: Category 1']]
+        )
+        self.assertEqual(len(response.context_data['selected']), 3)
+        self.assertFalse(response.context_data['select_across'])
+
+        request = self.get_request(select_across='1')
+        response = hard_delete_selected(self.model_admin, request, Category.objects.all())
+        self.assertTrue(response.context_data['select_across'])
+
+        self.model_admin.hard_delete_summary_threshold = None
+        response = hard_delete_selected(self.model_admin, self.get_request(), Category.objects.all())
+        self.assertFalse(response.context_data['summarized'])
+
+    def test_summarized_hard_delete_in_batches(self):
+        request = self.get_request(post='yes')
+        self.assertIsNone(hard_delete_selected(self.model_admin, request, Category.objects.all()))
+        self.assertFalse(Category.objects.all().exists())
+        self.assertFalse(Post.objects.all().exists())
+
+    def test_hard_delete_batches(self):
+        reports = []
+        result = Category.objects.all().hard_delete(batch_size=2, progress=reports.append)
+        self.assertEqual(result, (15, {'baseapp.Category': 3, 'baseapp.Post': 12}))
+        self.assertEqual([report['last_pk'] for report in reports][-1], self.categories[-1].pk)
+
+    @override_settings(ROOT_URLCONF=__name__)
+    def test_select_across_confirmation_through_changelist(self):
+        user = User.objects.create(email='admin@example.com', is_active=True, is_staff=True, is_superuser=True)
+        self.client.force_login(user)
+        data = {
+            'action': 'hard_delete_selected',
+            'select_across': '1',
+            'index': '0',
+            helpers.ACTION_CHECKBOX_NAME: [self.categories[0].pk],
+        }
+        response = self.client.post('/admin/baseapp/category/', data)
+        self.assertContains(response, 'name="select_across" value="1"')
+        self.assertContains(
+            response, 'name="{0}" value="{1}"'.format(helpers.ACTION_CHECKBOX_NAME, self.categories[0].pk)
+        )
+        self.assertTrue(Category.objects.all().exists())
+
+        # "Yes, I'm sure" posts the form back...
+        response = self.client.post('/admin/baseapp/category/', dict(data, post='yes'))
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(Category.objects.all().exists())
+        self.assertFalse(Post.objects.all().exists())
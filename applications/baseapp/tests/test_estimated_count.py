@@ -0,0 +1,131 @@
+from django.contrib.admin import site
+from django.core.cache import cache
+from django.db import connections
+from django.test import RequestFactory, TestCase
+
+from ..admin import (
+    CustomBaseModelAdmin,
+    CustomBaseModelAdminWithSoftDelete,
+)
+from ..admin.pagination import EstimatedCountPaginator
+from ..models import User
+from ..models.indexes import estimate_count
+from .base_models import BasicPost, Category, Post
+
+
+class EstimatedCountTestCase(TestCase):
+    """Unit tests of estimated changelist counts"""
+
+    @classmethod
+    def setUpTestData(cls):  # noqa: N802
+        with connections['default'].schema_editor() as schema_editor:
+            schema_editor.create_model(BasicPost)
+            schema_editor.create_model(Category)
+            schema_editor.create_model(Post)
+
+        BasicPost.objects.bulk_create([BasicPost(title='Post {0}'.format(i)) for i in range(30)])
+        category = Category.objects.create(title='Python')
+        Post.objects.bulk_create([Post(category=category, title='Post {0}'.format(i)) for i in range(30)])
+
+    def setUp(self):
+        cache.clear()
+        self.request = RequestFactory().get('/')
+        self.request.user = User(is_active=True, is_staff=True, is_superuser=True)
+
+    def test_cached_count(self):
+        queryset = Post.objects.all().order_by('pk')
+        paginator = EstimatedCountPaginator(queryset, 10, threshold=20)
+        self.assertEqual(paginator.count, 30)
+        self.assertFalse(paginator.is_estimated)
+
+        Post.objects.filter(title='Post 0').delete()
+        paginator = EstimatedCountPaginator(queryset, 10, threshold=20)
+        # no COUNT(*), only the statistics lookup of PostgreSQL...
+        with self.assertNumQueries(1 if connections['default'].vendor == 'postgresql' else 0):
+            self.assertEqual(paginator.count, 30)
+        self.assertTrue(paginator.is_estimated)
+        # pages after an over estimate are empty...
+        self.assertEqual(len(paginator.page(3)), 9)
+        self.assertEqual(len(paginator.page(4)), 0)
+
+        self.assertEqual(EstimatedCountPaginator(Post.objects.filter(pk__in=[]), 10, threshold=20).count, 0)
+
+    def test_changelist(self):
+        model_admin = CustomBaseModelAdminWithSoftDelete(Post, site)
+        changelist = model_admin.get_changelist_instance(self.request)
+        self.assertFalse(hasattr(changelist, 'counts_estimated'))
+
+        model_admin.estimated_count_threshold = 20
+        changelist = model_admin.get_changelist_instance(self.request)
+        self.assertEqual((changelist.result_count, changelist.full_result_count), (30, 30))
+        self.assertFalse(changelist.counts_estimated)
+
+        changelist = model_admin.get_changelist_instance(self.request)
+        self.assertTrue(changelist.counts_estimated)
+        self.assertFalse(changelist.can_show_all)
+
+        request = RequestFactory().get('/', {'status__exact': Post.STATUS_OFFLINE})
+        request.user = self.request.user
+        changelist = model_admin.get_changelist_instance(request)
+        self.assertEqual((changelist.result_count, changelist.full_result_count), (0, 30))
+
+        model_admin = CustomBaseModelAdmin(BasicPost, site)
+        model_admin.estimated_count_threshold = 1000
+        changelist = model_admin.get_changelist_instance(self.request)
+        self.assertEqual(changelist.result_count, 30)
+        self.assertFalse(changelist.counts_estimated)
+
+    def test_status_counts_above_threshold(self):
+        model_admin = CustomBaseModelAdminWithSoftDelete(Post, site)
+
+        def get_choices():
+            changelist = model_admin.get_changelist_instance(self.request)
+            return [str(choice['display']) for choice in changelist.filter_specs[0].choices(changelist)]
+
+        model_admin.estimated_count_threshold = 1000
+        self.assertEqual(get_choices(), ['All', 'offline (0)', 'online (30)', 'deleted (0)', 'draft (0)'])
+
+        cache.clear()
+        model_admin.estimated_count_threshold = 20
+        self.assertEqual(get_choices(), ['All', 'offline', 'online', 'deleted', 'draft'])
+
+
+class TableStatisticsTestCase(TestCase):
+    """Unit tests of estimated counts from table statistics"""
+
+    # `ANALYZE` of PostgreSQL is not rolled back with the test, tables of
+    # this class are dropped with their statistics at the end of the class
+
+    @classmethod
+    def setUpTestData(cls):  # noqa: N802
+        with connections['default'].schema_editor() as schema_editor:
+            schema_editor.create_model(BasicPost)
+
+        BasicPost.objects.bulk_create([BasicPost(title='Post {0}'.format(i)) for i in range(30)])
+
+    def tearDown(self):
+        connection = connections['default']
+        if connection.vendor != 'sqlite':
+            return
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name FROM sqlite_master WHERE name = 'sqlite_stat1'")
+            if cursor.fetchone():
+                cursor.execute('DELETE FROM sqlite_stat1')
+
+    def test_table_statistics(self):
+        self.assertIsNone(estimate_count(BasicPost.objects.all()))
+        with connections['default'].cursor() as cursor:
+            cursor.execute('ANALYZE')
+        self.assertEqual(estimate_count(BasicPost.objects.all()), 30)
+        # filtered estimates come from query plans of PostgreSQL...
+        filtered_estimate = 1 if connections['default'].vendor == 'postgresql' else None
+        self.assertEqual(estimate_count(BasicPost.objects.filter(title='Post 1')), filtered_estimate)
+
+        paginator = EstimatedCountPaginator(BasicPost.objects.order_by('pk'), 10, threshold=20)
+        with self.assertNumQueries(1):
+            self.assertEqual(paginator.count, 30)
+        self.assertTrue(paginator.is_estimated)
+
+        paginator = EstimatedCountPaginator(BasicPost.objects.order_by('pk'), 10, threshold=50)
+        self.assertEqual(paginator.count, 30)
+        self.assertFalse(paginator.is_estimated)
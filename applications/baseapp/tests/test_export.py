@@ -0,0 +1,79 @@
+import json
+
+from django.contrib.admin import AdminSite
+from django.db import connections
+from django.test import TestCase, override_settings
+from django.urls import path
+
+from ..admin import CustomBaseModelAdminWithSoftDelete
+from ..models import User
+from .base_models import Category, Post
+
+
+class PostAdmin(CustomBaseModelAdminWithSoftDelete):
+    list_display = ('__str__', 'title', 'category', 'status')
+    export_chunk_size = 2
+
+
+site = AdminSite(name='export_admin')
+site.register(Post, PostAdmin)
+
+urlpatterns = [path('admin/', site.urls)]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class ExportTestCase(TestCase):
+    """Unit tests of streaming export actions"""
+
+    @classmethod
+    def setUpTestData(cls):  # noqa: N802
+        with connections['default'].schema_editor() as schema_editor:
+            schema_editor.create_model(Category)
+            schema_editor.create_model(Post)
+
+        cls.user = User.objects.create(email='admin@example.com', is_active=True, is_staff=True, is_superuser=True)
+        cls.category = Category.objects.create(title='Python')
+        cls.posts = [Post.objects.create(category=cls.category, title='Post {0}'.format(i)) for i in range(5)]
+        cls.posts[0].delete()
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def export(self, action, query='', **data):
+        data = dict(data, action=action, index=0)
+        response = self.client.post('/admin/baseapp/post/{0}'.format(query), data)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_export(self):
+        content = self.export('export_as_csv', select_across=1, _selected_action=self.posts[1].pk)
+        lines = content.splitlines()
+        self.assertEqual(lines[0], 'id,title,category,status')
+        # soft deleted rows are hidden by default...
+        self.assertEqual(len(lines), 5)
+        self.assertIn('{0},Post 1,{1},1'.format(self.posts[1].pk, self.category.pk), lines)
+
+        content = self.export('export_as_csv', '?status__exact=2', select_across=1, _selected_action=self.posts[1].pk)
+        self.assertEqual(content.splitlines()[1:], ['{0},Post 0,{1},2'.format(self.posts[0].pk, self.category.pk)])
+
+    def test_jsonl_export(self):
+        content = self.export('export_as_jsonl', _selected_action=[self.posts[1].pk, self.posts[2].pk])
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(
+            sorted(rows, key=lambda row: row['id']),
+            [
+                {'id': self.posts[1].pk, 'title': 'Post 1', 'category': self.category.pk, 'status': 1},
+                {'id': self.posts[2].pk, 'title': 'Post 2', 'category': self.category.pk, 'status': 1},
+            ],
+        )
+
+    def test_export_formats(self):
+        model_admin = site._registry[Post]  # pylint: disable=W0212
+        request = self.client.get('/admin/baseapp/post/').wsgi_request
+        self.assertIn('export_as_jsonl', model_admin.get_actions(request))
+
+        model_admin.export_formats = ('csv',)
+        try:
+            self.assertNotIn('export_as_jsonl', model_admin.get_actions(request))
+        finally:
+            model_admin.export_formats = PostAdmin.export_formats
@@ -0,0 +1,129 @@
+import datetime
+import uuid
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connections
+from django.db.migrations.state import (
+    ModelState,
+    ProjectState,
+)
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from ..models import TimeOrderedUUIDField, uuid7
+from ..models.identifiers import (
+    PopulateTimeOrderedIds,
+    SwitchToTimeOrderedPk,
+    min_uuid7,
+    uuid7_datetime,
+)
+from .base_models import LegacyPost, TimeOrderedPost
+
+
+class UUID7TestCase(SimpleTestCase):
+    """Unit tests of time-ordered UUIDs"""
+
+    def test_uuid7(self):
+        started = timezone.now()
+        values = [uuid7() for __ in range(10000)]
+        self.assertEqual(values, sorted(values))
+        self.assertEqual(len(set(values)), len(values))
+        self.assertEqual({(value.version, value.variant) for value in values}, {(7, uuid.RFC_4122)})
+
+        self.assertLess(abs(uuid7_datetime(values[0]) - started), datetime.timedelta(seconds=1))
+        self.assertLessEqual(min_uuid7(started.replace(microsecond=0)), values[0])
+
+        past = started - datetime.timedelta(days=365)
+        self.assertEqual(
+            uuid7_datetime(uuid7(timestamp=past)), past.replace(microsecond=past.microsecond // 1000 * 1000)
+        )
+        self.assertLess(uuid7(timestamp=past), values[0])
+
+    def test_field(self):
+        __, path, __, kwargs = TimeOrderedUUIDField(primary_key=True).deconstruct()
+        self.assertEqual(path, 'baseapp.models.identifiers.TimeOrderedUUIDField')
+        self.assertEqual(kwargs, {'primary_key': True})
+        self.assertEqual(TimeOrderedUUIDField(null=True).deconstruct()[3], {'null': True})
+
+        pk = TimeOrderedPost._meta.pk
+        self.assertIsInstance(pk, TimeOrderedUUIDField)
+        self.assertEqual((pk.name, TimeOrderedPost._meta.concrete_fields[0]), ('id', pk))
+        self.assertIsInstance(TimeOrderedPost(title='Python').pk, uuid.UUID)
+
+    def test_switch_state(self):
+        state = ProjectState()
+        state.add_model(ModelState.from_model(LegacyPost))
+        SwitchToTimeOrderedPk('legacypost', 'time_ordered_id').state_forwards('baseapp', state)
+
+        fields = dict(state.models['baseapp', 'legacypost'].fields)
+        self.assertNotIn('time_ordered_id', fields)
+        self.assertIsInstance(fields['id'], TimeOrderedUUIDField)
+        self.assertTrue(fields['id'].primary_key)
+
+
+class TimeOrderedPkTestCase(TestCase):
+    """Unit tests of BaseModel time_ordered_pk"""
+
+    @classmethod
+    def setUpTestData(cls):  # noqa: N802
+        with connections['default'].schema_editor() as schema_editor:
+            schema_editor.create_model(TimeOrderedPost)
+            schema_editor.create_model(LegacyPost)
+
+        TimeOrderedPost.objects.bulk_create([TimeOrderedPost(title='Post {0}'.format(i)) for i in range(5)])
+
+    def get_titles(self, page):
+        return [post.title for post in page]
+
+    def test_ordered_by_pk(self):
+        self.assertEqual(
+            list(TimeOrderedPost.objects.order_by('pk').values_list('title', flat=True)),
+            ['Post {0}'.format(i) for i in range(5)],
+        )
+
+    def test_seek(self):
+        with self.assertNumQueries(1) as queries:
+            page = TimeOrderedPost.objects.seek(size=3)
+        self.assertNotIn('created_at', queries.captured_queries[0]['sql'].split('ORDER BY')[1])
+        self.assertEqual(self.get_titles(page), ['Post 0', 'Post 1', 'Post 2'])
+        page = TimeOrderedPost.objects.seek(after=page.next_cursor, size=3)
+        self.assertEqual(self.get_titles(page), ['Post 3', 'Post 4'])
+
+        page = TimeOrderedPost.objects.seek(size=3, descending=True)
+        page = TimeOrderedPost.objects.seek(after=page.next_cursor, size=3, descending=True)
+        self.assertEqual(self.get_titles(page), ['Post 1', 'Post 0'])
+
+    def test_soft_delete_batches(self):
+        TimeOrderedPost.objects.filter(title__in=['Post 1', 'Post 3']).delete(batch_size=1)
+        self.assertEqual(
+            list(TimeOrderedPost.objects.deleted().order_by('pk').values_list('title', flat=True)),
+            ['Post 1', 'Post 3'],
+        )
+        TimeOrderedPost.objects.deleted().undelete(batch_size=1)
+        self.assertEqual(TimeOrderedPost.objects.actives().count(), 5)
+
+    def test_populate_time_ordered_ids(self):
+        now = timezone.now()
+        for i, days in enumerate([3, 1, 2]):
+            post = LegacyPost.objects.create(title='Post {0}'.format(i))
+            LegacyPost.objects.filter(pk=post.pk).update(created_at=now - datetime.timedelta(days=days))
+
+        operation = PopulateTimeOrderedIds('legacypost', 'time_ordered_id', batch_size=2)
+        model_state = ModelState.from_model(LegacyPost)
+        # operations skip unmanaged models...
+        model_state.options['managed'] = True
+        state = ProjectState()
+        state.add_model(model_state)
+        with connections['default'].schema_editor() as schema_editor:
+            operation.database_forwards('baseapp', schema_editor, state, state)
+
+        posts = list(LegacyPost.objects.order_by('time_ordered_id'))
+        self.assertEqual([post.title for post in posts], ['Post 0', 'Post 2', 'Post 1'])
+        for post in posts:
+            self.assertEqual(uuid7_datetime(post.time_ordered_id).date(), post.created_at.date())
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command('benchmark_primary_keys', rows=20, batch_size=8, stdout=out)
+        self.assertEqual([line.split()[0] for line in out.getvalue().splitlines()], ['integer', 'uuid4', 'uuid7'])
@@ -0,0 +1,141 @@
+import multiprocessing
+import os
+import tempfile
+import threading
+from unittest import mock
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections, transaction
+from django.test import SimpleTestCase, TransactionTestCase
+
+from ..models.snapshots import snapshots
+from ..utils.invalidation import (
+    FileTransport,
+    InvalidationBus,
+    MemoryTransport,
+    get_invalidation_bus,
+)
+from .base_models import Tag
+
+
+def publish_from_worker(path, label, pk_list):
+    InvalidationBus(FileTransport(path, max_size=200)).publish(label, pk_list=pk_list)
+
+
+class FileTransportTestCase(SimpleTestCase):
+    """Unit tests of the shared file invalidation transport"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'invalidation.log')
+        self.events = []
+        self.bus = InvalidationBus(FileTransport(self.path, max_size=200))
+        self.bus.subscribe(lambda label, pk: self.events.append((label, pk)))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def run_workers(self, *jobs):
+        context = multiprocessing.get_context('fork')
+        workers = [context.Process(target=publish_from_worker, args=(self.path,) + job) for job in jobs]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+    def test_events_of_other_workers(self):
+        self.bus.drain()
+        self.assertEqual(self.events, [])
+
+        self.run_workers(('blog.post', [1, 2]), ('blog.category', None))
+        self.bus.drain()
+        self.assertEqual(sorted(self.events), [('blog.category', None), ('blog.post', '1'), ('blog.post', '2')])
+
+        # own events are delivered on publish, not on drain...
+        self.events.clear()
+        self.bus.publish('blog.post', [3])
+        self.bus.drain()
+        self.assertEqual(self.events, [('blog.post', '3')])
+
+    def test_lost_events_on_rotation(self):
+        self.run_workers(('blog.post', [1]))
+        self.bus.drain()
+        self.events.clear()
+
+        self.run_workers(('blog.post', list(range(20))))
+        self.bus.drain()
+        self.assertEqual(self.events, [(None, None)])
+
+        self.events.clear()
+        self.run_workers(('blog.post', [1]))
+        self.bus.drain()
+        self.assertEqual(self.events, [('blog.post', '1')])
+
+    def test_default_path_is_private(self):
+        with mock.patch.object(tempfile, 'gettempdir', return_value=self.directory.name):
+            directory = os.path.dirname(FileTransport().path)
+            self.assertEqual(os.stat(directory).st_mode & 0o777, 0o700)
+
+            # others can write events...
+            os.chmod(directory, 0o777)
+            with self.assertRaises(ImproperlyConfigured):
+                FileTransport()
+
+    def test_receive_holds_lock(self):
+        transport = FileTransport(self.path)
+        FileTransport(self.path).publish([('blog.post', '1')])
+        received = []
+
+        with transport.lock:
+            thread = threading.Thread(target=lambda: received.extend(transport.receive()))
+            thread.start()
+            # another thread of the process is reading...
+            thread.join(0.1)
+            self.assertTrue(thread.is_alive())
+            self.assertEqual(received, [])
+        thread.join()
+        self.assertEqual(received, [('blog.post', '1')])
+        self.assertEqual(transport.receive(), [])
+
+
+class InvalidationBusTestCase(TransactionTestCase):
+    """Unit tests of invalidation events of BaseModel writes"""
+
+    def setUp(self):
+        with connections['default'].schema_editor() as schema_editor:
+            schema_editor.create_model(Tag)
+        self.bus = get_invalidation_bus()
+        self.transport = self.bus.transport
+        self.bus.transport = MemoryTransport()
+
+    def tearDown(self):
+        self.bus.transport = self.transport
+        with connections['default'].schema_editor() as schema_editor:
+            schema_editor.delete_model(Tag)
+
+    def test_published_on_commit(self):
+        with transaction.atomic():
+            tag = Tag.objects.create(slug='python', title='Python')
+            Tag.objects.create(slug='django', title='Django')
+            Tag.objects.filter(pk=tag.pk).update(title='Changed')
+            self.assertEqual(self.bus.transport.events, [])
+
+        pid = os.getpid()
+        self.assertEqual(
+            self.bus.transport.receive(),
+            [(pid, 'baseapp.tag', str(tag.pk)), (pid, 'baseapp.tag', str(tag.pk + 1)), (pid, 'baseapp.tag', None)],
+        )
+
+        with transaction.atomic():
+            tag.delete()
+            transaction.set_rollback(True)
+        self.assertEqual(self.bus.transport.receive(), [])
+
+    def test_drops_snapshots(self):
+        Tag.objects.create(slug='python', title='Python')
+        Tag.objects.snapshot()
+        self.assertIn(Tag, snapshots.snapshots)
+
+        self.bus.transport.publish([(0, 'baseapp.tag', None)])
+        self.bus.drain()
+        self.assertNotIn(Tag, snapshots.snapshots)
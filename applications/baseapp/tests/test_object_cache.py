@@ -0,0 +1,169 @@
+import copy
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections, transaction
+from django.db.models import QuerySet
+from django.test import TransactionTestCase
+
+from .base_models import (
+    CachedCategory,
+    CachedPost,
+    Post,
+    Product,
+)
+
+
+class ObjectCacheTestCase(TransactionTestCase):
+    """Unit tests of cached_get / cached_get_many"""
+
+    # cache is invalidated on commit, TestCase never commits...
+
+    def setUp(self):
+        with connections['default'].schema_editor() as schema_editor:
+            schema_editor.create_model(CachedCategory)
+            schema_editor.create_model(CachedPost)
+        cache.clear()
+
+        self.category = CachedCategory.objects.create(title='Python')
+        self.posts = [CachedPost.objects.create(category=self.category, title='Post {0}'.format(i)) for i in range(3)]
+
+    def tearDown(self):
+        with connections['default'].schema_editor() as schema_editor:
+            schema_editor.delete_model(CachedPost)
+            schema_editor.delete_model(CachedCategory)
+
+    def test_cached_get(self):
+        pk = self.posts[0].pk
+        with self.assertNumQueries(1):
+            CachedPost.objects.cached_get(pk=pk)
+        with self.assertNumQueries(0):
+            post = CachedPost.objects.cached_get(pk=str(pk))
+        self.assertEqual(post.title, 'Post 0')
+
+        post.title = 'Changed'
+        post.save(update_fields=['title'])
+        with self.assertNumQueries(1):
+            self.assertEqual(CachedPost.objects.cached_get(pk=pk).title, 'Changed')
+
+        with self.assertRaises(CachedPost.DoesNotExist):
+            CachedPost.objects.cached_get(pk=0)
+        with self.assertRaises(ImproperlyConfigured):
+            Post.objects.cached_get(pk=pk)
+
+    def test_cached_get_many(self):
+        pk_list = [post.pk for post in reversed(self.posts)]
+        CachedPost.objects.cached_get(pk=pk_list[0])
+
+        with self.assertNumQueries(1):
+            posts = CachedPost.objects.cached_get_many(pk_list + [0])
+        self.assertEqual(list(posts), pk_list)
+        with self.assertNumQueries(0):
+            posts = CachedPost.objects.cached_get_many(pk_list)
+        self.assertEqual([post.title for post in posts.values()], ['Post 2', 'Post 1', 'Post 0'])
+
+    def test_invalidated_on_delete_and_undelete(self):
+        pk_list = [post.pk for post in self.posts]
+        CachedPost.objects.cached_get_many(pk_list)
+        CachedCategory.objects.cached_get(pk=self.category.pk)
+
+        self.category.delete()
+        posts = CachedPost.objects.cached_get_many(pk_list)
+        self.assertEqual({post.status for post in posts.values()}, {CachedPost.STATUS_DELETED})
+        self.assertEqual(CachedCategory.objects.cached_get(pk=self.category.pk).status, CachedCategory.STATUS_DELETED)
+
+        CachedCategory.objects.get(pk=self.category.pk).undelete()
+        posts = CachedPost.objects.cached_get_many(pk_list)
+        self.assertEqual({post.status for post in posts.values()}, {CachedPost.STATUS_ONLINE})
+
+        CachedCategory.objects.get(pk=self.category.pk).hard_delete()
+        self.assertEqual(CachedPost.objects.cached_get_many(pk_list), {})
+
+    def test_invalidated_on_commit(self):
+        pk = self.posts[0].pk
+        CachedPost.objects.cached_get(pk=pk)
+
+        with transaction.atomic():
+            CachedPost.objects.filter(pk=pk).get().delete()
+            with self.assertNumQueries(0):
+                self.assertEqual(CachedPost.objects.cached_get(pk=pk).status, CachedPost.STATUS_ONLINE)
+        self.assertEqual(CachedPost.objects.cached_get(pk=pk).status, CachedPost.STATUS_DELETED)
+
+        post = CachedPost.objects.get(pk=self.posts[1].pk)
+        CachedPost.objects.cached_get(pk=post.pk)
+        post.title = 'Changed'
+        CachedPost.objects.bulk_update([post], ['title'])
+        self.assertEqual(CachedPost.objects.cached_get(pk=post.pk).title, 'Changed')
+
+    def test_invalidated_on_update_and_upsert(self):
+        pk = self.posts[0].pk
+        CachedPost.objects.cached_get(pk=pk)
+        CachedPost.objects.filter(pk=pk).update(title='Changed')
+        self.assertEqual(CachedPost.objects.cached_get(pk=pk).title, 'Changed')
+
+        with connections['default'].schema_editor() as schema_editor:
+            schema_editor.create_model(Product)
+        try:
+            with mock.patch.object(Product, 'object_cache', True):
+                product = Product.objects.create(sku='sku-1', title='Product 1')
+                Product.objects.cached_get(pk=product.pk)
+                Product.objects.bulk_upsert([Product(sku='sku-1', title='Changed')], unique_fields=['sku'])
+                self.assertEqual(Product.objects.cached_get(pk=product.pk).title, 'Changed')
+        finally:
+            with connections['default'].schema_editor() as schema_editor:
+                schema_editor.delete_model(Product)
+
+    def test_late_refill_is_not_served(self):
+        pk = self.posts[0].pk
+        get = QuerySet.get
+
+        def get_then_write(queryset, *args, **kwargs):
+            # reader fetches the row, a writer commits before the refill...
+            obj = get(queryset, *args, **kwargs)
+            changed = copy.copy(obj)
+            changed.title = 'Changed'
+            changed.save(update_fields=['title'])
+            return obj
+
+        with mock.patch.object(QuerySet, 'get', get_then_write):
+            self.assertEqual(CachedPost.objects.cached_get(pk=pk).title, 'Post 0')
+        self.assertEqual(CachedPost.objects.cached_get(pk=pk).title, 'Changed')
+
+    def test_cached_queryset(self):
+        queryset = CachedCategory.objects.actives().order_by('pk')
+        with self.assertNumQueries(1):
+            self.assertEqual(queryset.cached(), [self.category])
+        with self.assertNumQueries(0):
+            self.assertEqual(queryset.cached(), [self.category])
+        with self.assertNumQueries(1):
+            self.assertEqual(CachedCategory.objects.all().values_list('title', flat=True).cached(), ['Python'])
+
+        category = CachedCategory.objects.create(title='Django')
+        with self.assertNumQueries(1):
+            self.assertEqual(queryset.cached(), [self.category, category])
+
+        category.delete()
+        self.assertEqual(queryset.cached(), [self.category])
+        category.undelete()
+        self.assertEqual(queryset.cached(), [self.category, category])
+        CachedCategory.objects.filter(pk=category.pk).update(status=CachedCategory.STATUS_OFFLINE)
+        self.assertEqual(queryset.cached(), [self.category])
+
+        with self.assertRaises(ImproperlyConfigured):
+            Post.objects.all().cached()
+
+    def test_cached_queryset_joins(self):
+        queryset = CachedPost.objects.filter(category__title='Python').order_by('pk')
+        self.assertEqual(len(queryset.cached()), 3)
+
+        CachedCategory.objects.filter(pk=self.category.pk).update(title='Go')
+        with self.assertNumQueries(1):
+            self.assertEqual(queryset.cached(), [])
+
+        with transaction.atomic():
+            CachedCategory.objects.filter(pk=self.category.pk).update(title='Python')
+            with self.assertNumQueries(1):
+                self.assertEqual(len(queryset.cached()), 3)
+        with self.assertNumQueries(1):
+            self.assertEqual(len(queryset.cached()), 3)
@@ -0,0 +1,133 @@
+import datetime
+import json
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections, transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from ..models import ChangeRecord, read_changes
+from ..models.outbox import latest_change_id, prune_changes
+from .base_models import FeedCategory, FeedPost
+
+
+class ChangeFeedTestCase(TestCase):
+    """Unit tests of the change feed (outbox)"""
+
+    @classmethod
+    def setUpTestData(cls):  # noqa: N802
+        with connections['default'].schema_editor() as schema_editor:
+            schema_editor.create_model(FeedCategory)
+            schema_editor.create_model(FeedPost)
+
+    def setUp(self):
+        # seen gaps...
+        cache.clear()
+        self.category = FeedCategory.objects.create(title='Python')
+        self.posts = [FeedPost.objects.create(category=self.category, title='Post {0}'.format(i)) for i in range(3)]
+        self.cursor = latest_change_id()
+
+    def get_changes(self):
+        records, self.cursor = read_changes(after=self.cursor)
+        return [(record.model_label, record.object_pk, record.action) for record in records]
+
+    def test_save_and_update(self):
+        self.category.title = 'Django'
+        self.category.save()
+        FeedPost.objects.filter(pk__in=[self.posts[0].pk, self.posts[1].pk]).update(title='Changed')
+        self.posts[2].title = 'Changed'
+        FeedPost.objects.bulk_update([self.posts[2]], ['title'])
+
+        self.assertEqual(
+            self.get_changes(),
+            [
+                ('baseapp.FeedCategory', str(self.category.pk), ChangeRecord.ACTION_SAVE),
+                ('baseapp.FeedPost', str(self.posts[0].pk), ChangeRecord.ACTION_SAVE),
+                ('baseapp.FeedPost', str(self.posts[1].pk), ChangeRecord.ACTION_SAVE),
+                ('baseapp.FeedPost', str(self.posts[2].pk), ChangeRecord.ACTION_SAVE),
+            ],
+        )
+        self.assertEqual(FeedPost.objects.filter(title='Changed').count(), 3)
+
+        with transaction.atomic():
+            self.category.save()
+            transaction.set_rollback(True)
+        self.assertEqual(self.get_changes(), [])
+
+    def test_soft_delete_and_undelete(self):
+        pk_list = [str(post.pk) for post in self.posts]
+        self.category.delete()
+        self.assertEqual(
+            sorted(self.get_changes()),
+            [('baseapp.FeedCategory', str(self.category.pk), ChangeRecord.ACTION_DELETE)]
+            + [('baseapp.FeedPost', pk, ChangeRecord.ACTION_DELETE) for pk in pk_list],
+        )
+
+        FeedCategory.objects.deleted().undelete()
+        self.assertEqual(
+            {action for __, __, action in self.get_changes()}, {ChangeRecord.ACTION_UNDELETE},
+        )
+
+        self.posts[0].delete(batch_size=1)
+        self.assertEqual(self.get_changes(), [('baseapp.FeedPost', pk_list[0], ChangeRecord.ACTION_DELETE)])
+
+        FeedCategory.objects.get(pk=self.category.pk).hard_delete()
+        changes = self.get_changes()
+        self.assertEqual(len(changes), 4)
+        self.assertEqual({action for __, __, action in changes}, {ChangeRecord.ACTION_HARD_DELETE})
+
+    def test_read_changes(self):
+        FeedCategory.objects.create(title='Go')
+        FeedPost.objects.filter(category=self.category).update(status=FeedPost.STATUS_OFFLINE)
+
+        records, cursor = read_changes(after=self.cursor, limit=2)
+        self.assertEqual(len(records), 2)
+        records, cursor = read_changes(after=cursor, limit=10, model_labels=['baseapp.FeedCategory'])
+        self.assertEqual(records, [])
+        self.assertEqual(cursor, latest_change_id())
+
+        # a gap may be filled by an open transaction, until it settles...
+        ChangeRecord.objects.create(
+            id=cursor + 3, model_label='baseapp.FeedPost', object_pk='1', action=ChangeRecord.ACTION_SAVE
+        )
+        self.assertEqual(read_changes(after=cursor), ([], cursor))
+        with override_settings(CHANGE_FEED_SETTLE_TIME=3600):
+            self.assertEqual(read_changes(after=cursor, settle_time=datetime.timedelta(0))[1], cursor + 3)
+            self.assertEqual(read_changes(after=cursor), ([], cursor))
+        with override_settings(CHANGE_FEED_SETTLE_TIME=0):
+            records, cursor = read_changes(after=cursor)
+        self.assertEqual([record.id for record in records], [cursor])
+
+        count = ChangeRecord.objects.count()
+        self.assertEqual(prune_changes(cursor), count)
+        self.assertFalse(ChangeRecord.objects.exists())
+
+    def test_read_changes_gap_of_long_transaction(self):
+        """Test gaps settle by the clock of the reader"""
+
+        # records behind the gap are old, the transaction of the gap is too...
+        ChangeRecord.objects.create(
+            id=self.cursor + 2,
+            model_label='baseapp.FeedPost',
+            object_pk='1',
+            action=ChangeRecord.ACTION_SAVE,
+            created_at=timezone.now() - datetime.timedelta(hours=1),
+        )
+        self.assertEqual(read_changes(after=self.cursor), ([], self.cursor))
+        ChangeRecord.objects.create(
+            id=self.cursor + 1, model_label='baseapp.FeedPost', object_pk='2', action=ChangeRecord.ACTION_SAVE
+        )
+        records, __ = read_changes(after=self.cursor)
+        self.assertEqual([record.object_pk for record in records], ['2', '1'])
+
+    def test_tail_changes(self):
+        self.category.save()
+        out, err = StringIO(), StringIO()
+        call_command('tail_changes', after=self.cursor, models=['baseapp.FeedCategory'], stdout=out, stderr=err)
+        line = json.loads(out.getvalue())
+        self.assertEqual(
+            (line['model'], line['pk'], line['action']), ('baseapp.FeedCategory', str(self.category.pk), 'save')
+        )
+        self.assertEqual(err.getvalue().strip(), 'cursor: {0}'.format(latest_change_id()))
@@ -0,0 +1,95 @@
+import datetime
+
+from django.db import connections
+from django.http import Http404
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.views.generic import TemplateView
+
+from ..mixins import SeekPaginationMixin
+from ..models.pagination import InvalidCursor
+from .base_models import Category, Post
+
+
+class PostListView(SeekPaginationMixin, TemplateView):
+    template_name = 'baseapp/index.html'
+    seek_queryset = Post.objects.all()
+    seek_size = 2
+
+
+class SeekPaginationTestCase(TestCase):
+    """Unit tests of keyset pagination"""
+
+    @classmethod
+    def setUpTestData(cls):  # noqa: N802
+        with connections['default'].schema_editor() as schema_editor:
+            schema_editor.create_model(Category)
+            schema_editor.create_model(Post)
+
+        category = Category.objects.create(title='Python')
+        for i in range(5):
+            Post.objects.create(category=category, title='Post {0}'.format(i))
+
+        # same created_at for post 1 and 2, pk breaks the tie...
+        created_at = timezone.now() - datetime.timedelta(days=1)
+        for i, minutes in enumerate([0, 1, 1, 2, 3]):
+            Post.objects.filter(title='Post {0}'.format(i)).update(
+                created_at=created_at + datetime.timedelta(minutes=minutes)
+            )
+        Post.objects.filter(title='Post 3').delete()
+
+    def get_titles(self, page):
+        return [post.title for post in page]
+
+    def test_seek(self):
+        page = Post.objects.all().seek(size=2)
+        self.assertEqual(self.get_titles(page), ['Post 0', 'Post 1'])
+        self.assertTrue(page.has_next)
+
+        page = Post.objects.all().seek(after=page.next_cursor, size=2)
+        self.assertEqual(self.get_titles(page), ['Post 2', 'Post 4'])
+        self.assertFalse(page.has_next)
+        self.assertIsNone(page.next_cursor)
+
+        page = Post.objects.seek(size=3, descending=True)
+        self.assertEqual(self.get_titles(page), ['Post 4', 'Post 3', 'Post 2'])
+        page = Post.objects.seek(after=page.next_cursor, size=3, descending=True)
+        self.assertEqual(self.get_titles(page), ['Post 1', 'Post 0'])
+
+    def test_seek_number_of_queries(self):
+        page = Post.objects.all().seek(size=1)
+        with self.assertNumQueries(1):
+            Post.objects.all().seek(after=page.next_cursor, size=1)
+
+    def test_seek_range_predicate(self):
+        # the OR of the tie break is ANDed with a range the index can seek...
+        page = Post.objects.all().seek(size=1)
+        for descending, operator in [(False, '>='), (True, '<=')]:
+            with CaptureQueriesContext(connections['default']) as context:
+                Post.objects.all().seek(after=page.next_cursor, size=1, descending=descending)
+            where = context.captured_queries[0]['sql'].split(' WHERE ')[1]
+            self.assertIn('"created_at" {0} '.format(operator), where.split(' OR ')[0])
+
+    def test_seek_invalid_cursor(self):
+        page = Post.objects.all().seek(size=1)
+        with self.assertRaises(InvalidCursor):
+            Post.objects.all().seek(after=page.next_cursor + 'x')
+        with self.assertRaises(InvalidCursor):
+            Post.objects.all().seek(after='not-a-cursor')
+
+    def test_seek_pagination_mixin(self):
+        view = PostListView()
+        view.setup(RequestFactory().get('/', {'q': 'python'}))
+        context = view.get_context_data()
+        self.assertEqual(self.get_titles(context['object_list']), ['Post 0', 'Post 1'])
+        self.assertTrue(context['next_page_url'].startswith('?q=python&after='))
+
+        view.setup(RequestFactory().get('/' + context['next_page_url']))
+        context = view.get_context_data()
+        self.assertEqual(self.get_titles(context['page']), ['Post 2', 'Post 4'])
+        self.assertIsNone(context['next_page_url'])
+
+        view.setup(RequestFactory().get('/', {'after': 'tampered'}))
+        with self.assertRaises(Http404):
+            view.get_context_data()
@@ -0,0 +1,100 @@
+import shutil
+import tempfile
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import (
+    request_finished,
+    request_started,
+)
+from django.db import connections, transaction
+from django.test import (
+    TransactionTestCase,
+    override_settings,
+)
+
+from ..checks import check_object_cache
+from ..models.snapshots import snapshots
+from .base_models import Category, Tag
+
+
+class SnapshotsTestCase(TransactionTestCase):
+    """Unit tests of process-local snapshots"""
+
+    def setUp(self):
+        with connections['default'].schema_editor() as schema_editor:
+            schema_editor.create_model(Tag)
+        cache.clear()
+        snapshots.clear()
+
+        self.python = Tag.objects.create(slug='python', title='Python')
+        self.django = Tag.objects.create(slug='django', title='Django')
+        Tag.objects.create(slug='draft', title='Draft', status=Tag.STATUS_DRAFT)
+
+    def tearDown(self):
+        with connections['default'].schema_editor() as schema_editor:
+            schema_editor.delete_model(Tag)
+
+    def test_snapshot(self):
+        with self.assertNumQueries(1):
+            snapshot = Tag.objects.snapshot()
+        self.assertEqual(list(snapshot), [self.python, self.django])
+        self.assertEqual(snapshot.get(pk=str(self.python.pk)).title, 'Python')
+        self.assertEqual(snapshot.get(slug='django'), self.django)
+        with self.assertRaises(Tag.DoesNotExist):
+            snapshot.get(slug='draft')
+        with self.assertRaises(ValueError):
+            snapshot.get(title='Python')
+
+        with self.assertNumQueries(0):
+            self.assertIs(Tag.objects.snapshot(), snapshot)
+        with self.assertRaises(ImproperlyConfigured):
+            Category.objects.snapshot()
+
+    def test_reloaded_on_change(self):
+        snapshot = Tag.objects.snapshot()
+
+        self.django.delete()
+        self.assertEqual(list(Tag.objects.snapshot()), [self.python])
+        self.django.undelete()
+        self.assertEqual(list(Tag.objects.snapshot()), [self.python, self.django])
+
+        # changed by another process...
+        Tag.objects.filter(pk=self.python.pk).update(title='Changed')
+        snapshots.snapshots[Tag] = snapshot
+        self.assertEqual(Tag.objects.snapshot().get(slug='python').title, 'Changed')
+
+        with transaction.atomic():
+            Tag.objects.create(slug='go', title='Go')
+            self.assertEqual(len(Tag.objects.snapshot()), 3)
+            self.assertEqual(len(snapshots.snapshots[Tag]), 2)
+        self.assertEqual(len(Tag.objects.snapshot()), 3)
+
+    def test_checked_once_per_request(self):
+        Tag.objects.snapshot()
+        request_started.send(sender=self.__class__)
+        try:
+            with self.assertNumQueries(0):
+                snapshot = Tag.objects.snapshot()
+            # changed by another process, seen by the next request...
+            cache.delete('baseapp.generation:baseapp.tag')
+            self.assertIs(Tag.objects.snapshot(), snapshot)
+        finally:
+            request_finished.send(sender=self.__class__)
+
+        self.assertIsNot(Tag.objects.snapshot(), snapshot)
+
+    def test_check_object_cache(self):
+        app_configs = [apps.get_app_config('baseapp')]
+        warnings = check_object_cache(app_configs=app_configs)
+        self.assertTrue(warnings)
+        self.assertEqual({warning.id for warning in warnings}, {'baseapp.W002'})
+        self.assertIn(Tag, [warning.obj for warning in warnings])
+
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        shared = {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': directory}
+        with override_settings(CACHES=dict(settings.CACHES, shared=shared), OBJECT_CACHE_ALIAS='shared'):
+            self.assertEqual(check_object_cache(app_configs=app_configs), [])
@@ -0,0 +1,134 @@
+from io import StringIO
+
+from django.contrib.admin import site
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections
+from django.test import RequestFactory, TestCase
+
+from ..admin import CustomBaseModelAdminWithSoftDelete
+from ..models import StatusCounter, User
+from .base_models import CountedCategory, CountedPost
+
+
+class StatusCountersTestCase(TestCase):
+    """Unit tests of materialized status counters"""
+
+    @classmethod
+    def setUpTestData(cls):  # noqa: N802
+        with connections['default'].schema_editor() as schema_editor:
+            schema_editor.create_model(CountedCategory)
+            schema_editor.create_model(CountedPost)
+
+        cls.category = CountedCategory.objects.create(title='Python')
+        cls.posts = [
+            CountedPost.objects.create(category=cls.category, title='Python post 1'),
+            CountedPost.objects.create(category=cls.category, title='Python post 2', status=CountedPost.STATUS_DRAFT),
+        ]
+
+    def test_counts_on_create_and_save(self):
+        self.assertEqual(CountedPost.objects.status_counts(), {0: 0, 1: 1, 2: 0, 3: 1})
+
+        post = CountedPost.objects.get(title='Python post 2')
+        post.status = CountedPost.STATUS_OFFLINE
+        post.save()
+        post.save(update_fields=['title'])
+        self.assertEqual(CountedPost.objects.status_counts(), {0: 1, 1: 1, 2: 0, 3: 0})
+
+        with self.assertNumQueries(1):
+            CountedPost.objects.status_counts()
+
+    def test_counts_on_soft_delete_and_undelete(self):
+        category = CountedCategory.objects.get(title='Python')
+        category.delete()
+        self.assertEqual(CountedCategory.objects.status_counts(), {0: 0, 1: 0, 2: 1, 3: 0})
+        self.assertEqual(CountedPost.objects.status_counts(), {0: 0, 1: 0, 2: 2, 3: 0})
+
+        category.undelete()
+        self.assertEqual(CountedCategory.objects.status_counts(), {0: 0, 1: 1, 2: 0, 3: 0})
+        self.assertEqual(CountedPost.objects.status_counts(), {0: 0, 1: 2, 2: 0, 3: 0})
+
+    def test_counts_on_status_change(self):
+        category = CountedCategory.objects.get(title='Python')
+        category.status = CountedCategory.STATUS_DELETED
+        category.save()
+        category.save()
+        self.assertEqual(CountedCategory.objects.status_counts(), {0: 0, 1: 0, 2: 1, 3: 0})
+        self.assertEqual(CountedPost.objects.status_counts(), {0: 0, 1: 0, 2: 2, 3: 0})
+
+    def test_counts_on_hard_delete(self):
+        CountedPost.objects.filter(title='Python post 1').hard_delete()
+        self.assertEqual(CountedPost.objects.status_counts(), {0: 0, 1: 0, 2: 0, 3: 1})
+
+        CountedCategory.objects.get(title='Python').hard_delete()
+        self.assertEqual(CountedCategory.objects.status_counts(), {0: 0, 1: 0, 2: 0, 3: 0})
+        self.assertEqual(CountedPost.objects.status_counts(), {0: 0, 1: 0, 2: 0, 3: 0})
+
+    def test_reconcile_command(self):
+        CountedPost.objects.update(status=CountedPost.STATUS_OFFLINE)
+        self.assertEqual(CountedPost.objects.status_counts(), {0: 0, 1: 1, 2: 0, 3: 1})
+
+        out = StringIO()
+        call_command('reconcile_status_counts', 'baseapp.CountedPost', stdout=out)
+        self.assertIn('baseapp.CountedPost: fixed', out.getvalue())
+        self.assertEqual(CountedPost.objects.status_counts(), {0: 2, 1: 0, 2: 0, 3: 0})
+        self.assertEqual(StatusCounter.objects.get(model_label='baseapp.CountedPost', status=0).count, 2)
+
+        out = StringIO()
+        call_command('reconcile_status_counts', 'baseapp.CountedPost', stdout=out)
+        self.assertIn('baseapp.CountedPost: ok', out.getvalue())
+
+    def test_admin_status_filter(self):
+        request = RequestFactory().get('/')
+        request.user = User(is_active=True, is_staff=True, is_superuser=True)
+        model_admin = CustomBaseModelAdminWithSoftDelete(CountedPost, site)
+
+        changelist = model_admin.get_changelist_instance(request)
+        status_filter = changelist.filter_specs[0]
+        self.assertEqual(
+            [str(choice['display']) for choice in status_filter.choices(changelist)],
+            ['All', 'offline (0)', 'online (1)', 'deleted (0)', 'draft (1)'],
+        )
+
+        model_admin.show_status_counts = False
+        changelist = model_admin.get_changelist_instance(request)
+        self.assertEqual(
+            [str(choice['display']) for choice in changelist.filter_specs[0].choices(changelist)],
+            ['All', 'offline', 'online', 'deleted', 'draft'],
+        )
+
+    def test_admin_status_filter_follows_other_filters(self):
+        cache.clear()
+        other_category = CountedCategory.objects.create(title='Django')
+        CountedPost.objects.create(category=other_category, title='Django post', status=CountedPost.STATUS_OFFLINE)
+        model_admin = CustomBaseModelAdminWithSoftDelete(CountedPost, site)
+        model_admin.list_filter = ('category',)
+        model_admin.search_fields = ('title',)
+
+        def get_choices(**params):
+            request = RequestFactory().get('/', params)
+            request.user = User(is_active=True, is_staff=True, is_superuser=True)
+            changelist = model_admin.get_changelist_instance(request)
+            return [str(choice['display']) for choice in changelist.filter_specs[0].choices(changelist)]
+
+        self.assertEqual(
+            get_choices(category__id__exact=self.category.pk),
+            ['All', 'offline (0)', 'online (1)', 'deleted (0)', 'draft (1)'],
+        )
+        # selected status doesn't change the counts...
+        self.assertEqual(
+            get_choices(category__id__exact=other_category.pk, status__exact=CountedPost.STATUS_ONLINE),
+            ['All', 'offline (1)', 'online (0)', 'deleted (0)', 'draft (0)'],
+        )
+        self.assertEqual(
+            get_choices(q='Python post 2'), ['All', 'offline (0)', 'online (0)', 'deleted (0)', 'draft (1)']
+        )
+
+        # cached per filter combination...
+        CountedPost.objects.filter(title='Python post 2').update(status=CountedPost.STATUS_ONLINE)
+        self.assertEqual(
+            get_choices(q='Python post 2'), ['All', 'offline (0)', 'online (0)', 'deleted (0)', 'draft (1)']
+        )
+        self.assertEqual(
+            get_choices(q='Python post'), ['All', 'offline (0)', 'online (2)', 'deleted (0)', 'draft (0)']
+        )
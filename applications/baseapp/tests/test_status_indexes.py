@@ -0,0 +1,70 @@
+from unittest import mock
+
+from django.apps import apps
+from django.db import connections
+from django.test import TestCase, override_settings
+
+from ..checks import check_status_indexes
+from ..models import get_status_indexes
+from .base_models import BasicPost, Category, IndexedPost
+
+
+class StatusIndexesTestCase(TestCase):
+    """Unit tests of status indexes"""
+
+    @classmethod
+    def setUpTestData(cls):  # noqa: N802
+        with connections['default'].schema_editor() as schema_editor:
+            # indexes are created only for managed models...
+            with mock.patch.object(IndexedPost._meta, 'managed', True):
+                schema_editor.create_model(IndexedPost)
+            schema_editor.create_model(Category)
+
+        Category.objects.create(title='Python')
+
+    def tearDown(self):
+        # statistics of PostgreSQL are dropped with the tables of the class...
+        connection = connections['default']
+        if connection.vendor != 'sqlite':
+            return
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name FROM sqlite_master WHERE name = 'sqlite_stat1'")
+            if cursor.fetchone():
+                cursor.execute('DELETE FROM sqlite_stat1')
+
+    def test_status_indexes(self):
+        self.assertEqual(
+            [(index.fields, str(index.condition)) for index in get_status_indexes(IndexedPost)],
+            [
+                (['status', 'created_at', 'id'], 'None'),
+                (['created_at', 'id'], "(AND: ('deleted_at__isnull', True), (NOT (AND: ('status', 2))))"),
+                (['deleted_at'], "(AND: ('status', 2))"),
+            ],
+        )
+        self.assertEqual(len(get_status_indexes(BasicPost)), 1)
+
+        index_names = [index.name for index in IndexedPost._meta.indexes]
+        self.assertEqual(index_names, [index.name for index in get_status_indexes(IndexedPost)])
+        self.assertEqual(len(set(index_names)), 3)
+        self.assertEqual(Category._meta.indexes, [])
+
+        with connections['default'].cursor() as cursor:
+            constraints = connections['default'].introspection.get_constraints(cursor, IndexedPost._meta.db_table)
+        for name in index_names:
+            self.assertIn(name, constraints)
+
+    @override_settings(STATUS_INDEXES_WARNING_ROWS=1)
+    def test_check_status_indexes(self):
+        app_configs = [apps.get_app_config('baseapp')]
+        with mock.patch.object(Category._meta, 'managed', True):
+            # no statistics, not counted...
+            with self.assertNumQueries(1):
+                self.assertEqual(check_status_indexes(app_configs=app_configs), [])
+            with connections['default'].cursor() as cursor:
+                cursor.execute('ANALYZE')
+            warnings = check_status_indexes(app_configs=app_configs)
+        self.assertEqual([warning.id for warning in warnings], ['baseapp.W001'])
+        self.assertEqual(warnings[0].obj, Category)
+
+        with mock.patch.object(IndexedPost._meta, 'managed', True):
+            self.assertEqual(check_status_indexes(app_configs=app_configs), [])
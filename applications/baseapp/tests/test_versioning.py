@@ -0,0 +1,130 @@
+from django.contrib.admin import site
+from django.db import connections, transaction
+from django.test import RequestFactory, TestCase
+
+from ..admin import CustomBaseModelAdminWithSoftDelete
+from ..models import (
+    User,
+    VersionConflict,
+    retry_on_conflict,
+)
+from .base_models import (
+    VersionedCategory,
+    VersionedPost,
+    VersionedProduct,
+)
+
+
+class OptimisticLockingTestCase(TestCase):
+    """Unit tests of optimistic concurrency control"""
+
+    @classmethod
+    def setUpTestData(cls):  # noqa: N802
+        with connections['default'].schema_editor() as schema_editor:
+            schema_editor.create_model(VersionedCategory)
+            schema_editor.create_model(VersionedPost)
+            schema_editor.create_model(VersionedProduct)
+
+        category = VersionedCategory.objects.create(title='Python')
+        for i in range(2):
+            VersionedPost.objects.create(category=category, title='Post {0}'.format(i))
+
+    def setUp(self):
+        self.category = VersionedCategory.objects.get(title='Python')
+
+    def test_save(self):
+        self.assertEqual(self.category.version, 1)
+        stale = VersionedCategory.objects.get(pk=self.category.pk)
+
+        self.category.title = 'Django'
+        with self.assertNumQueries(1):
+            self.category.save()
+        self.assertEqual(self.category.version, 2)
+        self.category.save(update_fields=['title'])
+        self.assertEqual(self.category.version, 3)
+
+        # like IntegrityError, the conflict breaks the current transaction...
+        stale.title = 'Go'
+        with self.assertRaises(VersionConflict), transaction.atomic():
+            stale.save()
+        with self.assertRaises(VersionConflict), transaction.atomic():
+            stale.save(update_fields=['title'])
+        self.category.refresh_from_db()
+        self.assertEqual((self.category.title, self.category.version), ('Django', 3))
+
+        VersionedCategory.objects.filter(pk=self.category.pk).update(title='Rust')
+        self.category.refresh_from_db()
+        self.assertEqual(self.category.version, 4)
+
+    def test_soft_delete(self):
+        stale = VersionedCategory.objects.get(pk=self.category.pk)
+        self.category.save()
+
+        with self.assertRaises(VersionConflict), transaction.atomic():
+            stale.delete()
+        self.assertEqual(VersionedPost.objects.deleted().count(), 0)
+
+        self.category.delete()
+        self.assertEqual(self.category.version, 3)
+        self.assertEqual(
+            list(VersionedPost.objects.deleted().values_list('version', flat=True).distinct()), [2],
+        )
+
+        self.category.undelete()
+        self.assertEqual(VersionedCategory.objects.get(pk=self.category.pk).version, 4)
+        self.assertEqual(list(VersionedPost.objects.values_list('version', flat=True).distinct()), [3])
+
+    def test_bulk_upsert(self):
+        product = VersionedProduct.objects.create(sku='sku-1', title='Product 1')
+        VersionedProduct.objects.bulk_upsert(
+            [VersionedProduct(sku='sku-1', title='New 1'), VersionedProduct(sku='sku-2', title='Product 2')],
+            unique_fields=['sku'],
+        )
+        self.assertEqual(
+            list(VersionedProduct.objects.order_by('sku').values_list('title', 'version')),
+            [('New 1', 2), ('Product 2', 1)],
+        )
+
+        # a stale copy conflicts after the upsert...
+        product.title = 'Stale'
+        with self.assertRaises(VersionConflict), transaction.atomic():
+            product.save()
+
+    def test_retry_on_conflict(self):
+        attempts = []
+        stale = VersionedCategory.objects.get(pk=self.category.pk)
+        self.category.save()
+
+        @retry_on_conflict(attempts=2, delay=0)
+        def rename(title):
+            category = stale if not attempts else VersionedCategory.objects.get(pk=self.category.pk)
+            attempts.append(category.version)
+            category.title = title
+            category.save()
+            return category
+
+        self.assertEqual(rename('Django').version, 3)
+        self.assertEqual(attempts, [1, 2])
+
+    def test_admin_stale_form(self):
+        request = RequestFactory().get('/')
+        request.user = User(is_active=True, is_staff=True, is_superuser=True)
+        model_admin = CustomBaseModelAdminWithSoftDelete(VersionedCategory, site)
+
+        self.assertIn('version', model_admin.get_fieldsets(request, self.category)[0][1]['fields'])
+        model_admin.fieldsets = ((None, {'fields': ('title', 'status')}),)
+        self.assertEqual(
+            model_admin.get_fieldsets(request, self.category)[0][1]['fields'], ['title', 'status', 'version']
+        )
+
+        form_class = model_admin.get_form(request, self.category, change=True)
+        form = form_class(instance=self.category)
+        self.assertEqual(form['version'].value(), 1)
+
+        data = dict(title='Django', status=VersionedCategory.STATUS_ONLINE, version=1)
+        self.assertTrue(form_class(data, instance=VersionedCategory.objects.get(pk=self.category.pk)).is_valid())
+
+        self.category.save()
+        form = form_class(data, instance=VersionedCategory.objects.get(pk=self.category.pk))
+        self.assertFalse(form.is_valid())
+        self.assertTrue(form.has_error('__all__', code='stale'))
@@ -0,0 +1,262 @@
+# pylint: disable=R0201
+
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from functools import partial
+from stat import S_ISDIR
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import request_started
+from django.db import connections, transaction
+from django.utils.module_loading import import_string
+
+from .console import console
+
+__all__ = ['BaseTransport', 'FileTransport', 'InvalidationBus', 'MemoryTransport', 'get_invalidation_bus']
+
+console = console(source=__name__)
+logger = logging.getLogger('app')
+
+INVALIDATION_FILE_MAX_SIZE = 1024 * 1024
+
+
+class BaseTransport:
+    """
+    Carries invalidation events between processes. Events are
+    `(pid, label, pk)` tuples, `pk` is a string or `None` (whole model).
+
+    - `publish(events)`: sends events to every process
+    - `receive()`: returns events which are published after the previous
+      call, `None` if some events are lost (subscribers drop everything)
+
+    """
+
+    def publish(self, events):
+        raise NotImplementedError('subclasses of BaseTransport must provide a publish() method')
+
+    def receive(self):
+        raise NotImplementedError('subclasses of BaseTransport must provide a receive() method')
+
+
+class MemoryTransport(BaseTransport):
+    """
+    Keeps events in memory, for a single process (and tests).
+    """
+
+    def __init__(self):
+        self.events = []
+
+    def publish(self, events):
+        self.events.extend(events)
+
+    def receive(self):
+        events, self.events = self.events, []
+        return events
+
+
+def get_private_directory():
+    """
+    Returns `baseapp-<uid>` directory of the temp directory, created with
+    `0700`. Raises `ImproperlyConfigured` if somebody else owns it or can
+    write to it, events of a shared directory could be injected.
+    """
+
+    directory = os.path.join(tempfile.gettempdir(), 'baseapp-{0}'.format(os.getuid()))
+    try:
+        os.mkdir(directory, 0o700)
+    except FileExistsError:
+        pass
+    stat = os.lstat(directory)
+    if not S_ISDIR(stat.st_mode) or stat.st_uid != os.getuid() or stat.st_mode & 0o077:
+        raise ImproperlyConfigured('%s is not a private directory, set `path` of INVALIDATION_BUS OPTIONS' % directory)
+    return directory
+
+
+def get_default_path():
+    project = hashlib.md5(str(getattr(settings, 'BASE_DIR', '')).encode()).hexdigest()[:8]
+    return os.path.join(get_private_directory(), 'invalidation-{0}.log'.format(project))
+
+
+class FileTransport(BaseTransport):
+    """
+    Appends events to a shared file as JSON lines, every process reads the
+    new lines. `path` defaults to a file of a private (`0700`) directory
+    in the temp directory, see `get_private_directory()`. Checking for events costs one `stat()` call. Writers hold an
+    exclusive lock, the file is rotated after `max_size` bytes. Readers
+    which see a new file report lost events. Threads of a process share
+    the read position, `receive()` holds a lock.
+    """
+
+    def __init__(self, path=None, max_size=INVALIDATION_FILE_MAX_SIZE):
+        self.path = path or get_default_path()
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self.inode, self.offset = self.get_position()
+
+    def get_position(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None, 0
+        return stat.st_ino, stat.st_size
+
+    def publish(self, events):
+        data = ''.join(json.dumps(list(event)) + '\n' for event in events).encode()
+        with open('{0}.lock'.format(self.path), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+                try:
+                    os.write(fd, data)
+                    size = os.fstat(fd).st_size
+                finally:
+                    os.close(fd)
+                if size > self.max_size:
+                    os.replace(self.path, '{0}.1'.format(self.path))
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def receive(self):
+        with self.lock:
+            return self._receive()
+
+    def _receive(self):
+        inode, size = self.get_position()
+        if inode != self.inode:
+            # rotated (or created), events of the old file may be lost...
+            lost = self.inode is not None or inode is None
+            self.inode, self.offset = inode, 0
+            if lost:
+                self.offset = size
+                return None
+        if size <= self.offset:
+            return []
+
+        with open(self.path, 'rb') as events_file:
+            events_file.seek(self.offset)
+            data = events_file.read(size - self.offset)
+        # a line which is still being written is read next time...
+        data = data[: data.rfind(b'\n') + 1]
+        self.offset += len(data)
+        return [tuple(json.loads(line)) for line in data.decode().splitlines()]
+
+
+class InvalidationBus:
+    """
+    Sends invalidation events of in-process caches to every worker:
+
+        bus = get_invalidation_bus()
+
+        @bus.subscribe
+        def drop_permissions(label, pk):
+            if label is None or label == 'auth.permission':
+                permission_cache.clear()
+
+        bus.publish('auth.permission', ['1', '2'])
+
+    Events are published when the current transaction commits. Local
+    subscribers are called right away, other processes run them when they
+    drain the bus (on every request start). `label` and `pk` are `None`
+    when events are lost, `pk` is `None` when the whole model changed.
+    """
+
+    def __init__(self, transport):
+        self.transport = transport
+        self.subscribers = []
+
+    def subscribe(self, callback):
+        self.subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        self.subscribers.remove(callback)
+
+    def publish(self, label, pk_list=None, using=None):
+        pid = os.getpid()
+        if pk_list is None:
+            events = [(pid, label, None)]
+        else:
+            events = [(pid, label, str(pk)) for pk in pk_list]
+        if not events:
+            return
+
+        if using is None:
+            self.send(events)
+            return
+
+        # one publish per transaction...
+        connection = connections[using]
+        pending = getattr(connection, 'pending_invalidations', None)
+        if connection.in_atomic_block and pending is not None and pending[0] is connection.run_on_commit:
+            pending[1].extend(events)
+            return
+        transaction.on_commit(partial(self.send, events), using=using)
+        if connection.in_atomic_block:
+            connection.pending_invalidations = (connection.run_on_commit, events)
+
+    def send(self, events):
+        try:
+            self.transport.publish(events)
+        except OSError:
+            logger.exception('Invalidation events are not published')
+        for __, label, pk in dict.fromkeys(events):
+            self.notify(label, pk)
+
+    def drain(self):
+        """
+        Runs subscribers for events of other processes.
+        """
+
+        try:
+            events = self.transport.receive()
+        except (OSError, ValueError):
+            logger.exception('Invalidation events are not received')
+            events = None
+
+        if events is None:
+            self.notify(None, None)
+            return
+        pid = os.getpid()
+        for __, label, pk in dict.fromkeys(event for event in events if event[0] != pid):
+            self.notify(label, pk)
+
+    def notify(self, label, pk):
+        for callback in self.subscribers:
+            callback(label, pk)
+
+
+invalidation_bus = None
+
+
+def get_invalidation_bus():
+    """
+    Returns the process' bus. Transport is set by `INVALIDATION_BUS`
+    setting, defaults to `FileTransport`:
+
+        INVALIDATION_BUS = {
+            'TRANSPORT': 'baseapp.utils.invalidation.FileTransport',
+            'OPTIONS': {'path': '/run/myproject/invalidation.log'},
+        }
+
+    """
+
+    global invalidation_bus  # pylint: disable=W0603
+    if invalidation_bus is None:
+        config = getattr(settings, 'INVALIDATION_BUS', {})
+        transport_class = import_string(config.get('TRANSPORT', 'baseapp.utils.invalidation.FileTransport'))
+        invalidation_bus = InvalidationBus(transport_class(**config.get('OPTIONS', {})))
+    return invalidation_bus
+
+
+def drain_invalidation_bus(sender, **kwargs):  # pylint: disable=W0613
+    if invalidation_bus is not None and invalidation_bus.subscribers:
+        invalidation_bus.drain()
+
+
+request_started.connect(drain_invalidation_bus, dispatch_uid='invalidation_bus')
@@ -12,3 +12,9 @@ PASSWORD_HASHERS = ('django.contrib.auth.hashers.MD5PasswordHasher',)
 
 # fix here! this is only for testing BaseModel, BaseModelWithSoftDelete
 MIGRATION_MODULES = {'baseapp': None, 'auth': None, 'contenttypes': None}
+
+# test models of baseapp are cached in the local memory cache...
+SILENCED_SYSTEM_CHECKS = ['baseapp.W002']
+
+# events of test processes stay in the process, not in a shared file...
+INVALIDATION_BUS = {'TRANSPORT': 'baseapp.utils.invalidation.MemoryTransport'}